@@ -0,0 +1,383 @@
+"""The model and get_stats of the app before the shiftbuilder package (the baseline commit).
+
+The "before" of bench_build and bench_stats, and what tests/ check the
+package against.  get_stats() is the app's function as it was, for the
+three 新宿店 staff and their shift codes.  build_model() sets the names
+the app read from its widgets from a ShiftProblem of the default roster
+and runs the app's code as it was; the only change is the number of 応援
+'D' days, which was fixed at 8 (one month).  The early/late ranges are
+the same for everybody there, so they are taken from ono, the mid range
+from miya.
+"""
+from datetime import datetime, timedelta
+from itertools import groupby
+
+import pulp as lp
+
+
+def extract_shift(vars, days_count, persons, shifts):
+    shift = {}
+    for d in range(days_count):
+        shift[d] = {}
+        for p in persons:
+            for s in shifts[p]:
+                if lp.value(vars[d][p][s]) == 1:
+                    shift[d][p] = '' if s == 'off' else s
+                    break
+    return shift
+
+
+def get_stats(shift, days_count, persons, prev_off, prev_early, prev_late):
+    def get_streak_counts(work_arr):
+        # 統計時は前日連続を無視して期間内だけで計算
+        four_consec_work = 0
+        three_consec_rest = 0
+        current_work = 0  # 前日を考慮せず0からスタート
+        current_rest = 0  # 同上
+        for a in work_arr:
+            if a == 1:
+                current_work += 1
+                if current_rest >= 3:
+                    three_consec_rest += 1
+                current_rest = 0
+            else:
+                current_rest += 1
+                if current_work >= 4:
+                    four_consec_work += 1
+                current_work = 0
+        if current_work >= 4:
+            four_consec_work += 1
+        if current_rest >= 3:
+            three_consec_rest += 1
+        return four_consec_work, three_consec_rest
+
+    stats = {}
+    for p in ['ono', 'miya', 'hiro']:
+        off_days = 0
+        work_arr = []
+        early = 0
+        late = 0
+        mid = 0
+        rest_before_early = 0
+        rest_before_count = 0
+        rest_after_late = 0
+        rest_after_count = 0
+        one_kin = 0
+        for d in range(days_count):
+            s = shift[d][p]
+            is_off = s == ''
+            off_days += 1 if is_off else 0
+            work_arr.append(1 if not is_off else 0)
+            if not is_off:
+                if s in ['As', 'A']:
+                    early += 1
+                elif s in ['E', 'F']:
+                    late += 1
+                elif s in ['C', 'D']:
+                    mid += 1
+        # 期間内だけの最大連続
+        max_consec_rest = max((len(list(g)) for k, g in groupby(work_arr) if k == 0), default=0)
+        max_consec_duty = max((len(list(g)) for k, g in groupby(work_arr) if k == 1), default=0)
+        four_consec_work, three_consec_rest = get_streak_counts(work_arr)
+
+        # 1勤計算: 期間内だけで、開始日のprev_off無視、終了日のnext_is_offをFalse扱い（翌日考慮なし）
+        for i in range(days_count):
+            if work_arr[i] == 1:
+                prev_is_off = (i > 0 and work_arr[i-1] == 0)  # 開始日のprev_off無視
+                next_is_off = (i < days_count - 1 and work_arr[i+1] == 0)  # 終了日のnext_is_off無視
+                if prev_is_off and next_is_off:
+                    one_kin += 1
+
+        # 休み前/後: 期間内だけ（小数点以下切り捨て）
+        for d in range(days_count):
+            if shift[d][p] == '':
+                if d > 0 and shift[d-1][p] != '':
+                    rest_before_count += 1
+                    if shift[d-1][p] in ['As', 'A']:
+                        rest_before_early += 1
+                if d < days_count - 1 and shift[d+1][p] != '':
+                    rest_after_count += 1
+                    if shift[d+1][p] in ['E', 'F']:
+                        rest_after_late += 1
+        before_rate = int(rest_before_early / rest_before_count * 100) if rest_before_count > 0 else 0
+        after_rate = int(rest_after_late / rest_after_count * 100) if rest_after_count > 0 else 0
+
+        stats[p] = {
+            '休日数': off_days,
+            '最大連続休み': max_consec_rest,
+            '最大連続勤務': max_consec_duty,
+            '早番数': early,
+            '遅番数': late,
+            '中番数': mid,
+            '4連勤数': four_consec_work,
+            '3連休数': three_consec_rest,
+            '1勤数': one_kin,
+            '休み前シフト (早番率%)': before_rate,
+            '休み後シフト (遅番率%)': after_rate
+        }
+    return stats
+
+
+def build_model(problem):
+    """(LpProblem, vars, persons, shifts) of the baseline app; vars[d][p][s] are its binaries."""
+    def joined(dates):
+        return ",".join(d.strftime('%Y-%m-%d') for d in dates)
+
+    start_date_str, end_date_str = problem.start.strftime('%Y-%m-%d'), problem.end.strftime('%Y-%m-%d')
+    ono_prev, miya_prev, hiro_prev = (problem.prev_shift[p] for p in ('ono', 'miya', 'hiro'))
+    ono_prev_consec_work, miya_prev_consec_work, hiro_prev_consec_work = (
+        problem.prev_consec_work[p] for p in ('ono', 'miya', 'hiro'))
+    ono_prev_consec_rest, miya_prev_consec_rest, hiro_prev_consec_rest = (
+        problem.prev_consec_rest[p] for p in ('ono', 'miya', 'hiro'))
+    ono_rest, miya_rest, hiro_rest = (problem.rest_days[p] for p in ('ono', 'miya', 'hiro'))
+    ono_1kin_max, miya_1kin_max, hiro_1kin_max = (problem.onekin_max[p] for p in ('ono', 'miya', 'hiro'))
+    ono_must_off, miya_must_off, hiro_must_off = (joined(problem.must_off[p]) for p in ('ono', 'miya', 'hiro'))
+    cheer_days_str = joined(problem.cheer_days)
+    campaign_days_str = joined(problem.campaign_days)
+    three_person_priority_str = joined(problem.three_person_priority)
+    holidays_str = joined(problem.holidays)
+    early_min, early_max = problem.early_min['ono'], problem.early_max['ono']
+    late_min, late_max = problem.late_min['ono'], problem.late_max['ono']
+    mid_min, mid_max = problem.mid_min['miya'], problem.mid_max['miya']
+    support_d_days = problem.support_d_days
+
+    # From here on the app's code
+    start = datetime.strptime(start_date_str, '%Y-%m-%d')
+    end = datetime.strptime(end_date_str, '%Y-%m-%d')
+    days_count = (end - start).days + 1
+    days = [start + timedelta(days=i) for i in range(days_count)]
+
+    prev_shift = {'ono': ono_prev, 'miya': miya_prev, 'hiro': hiro_prev}
+    prev_off = {p: 1 if prev_shift[p] == '' else 0 for p in ['ono', 'miya', 'hiro']}
+    prev_early = {p: 1 if (p=='ono' and prev_shift[p]=='As') or (p!='ono' and prev_shift[p]=='A') else 0 for p in ['ono', 'miya', 'hiro']}
+    prev_late = {p: 1 if prev_shift[p] in ['E', 'F'] else 0 for p in ['ono', 'miya', 'hiro']}
+    prev_consec_work = {'ono': ono_prev_consec_work, 'miya': miya_prev_consec_work, 'hiro': hiro_prev_consec_work}
+    prev_consec_rest = {'ono': ono_prev_consec_rest, 'miya': miya_prev_consec_rest, 'hiro': hiro_prev_consec_rest}
+
+    rest_days = {'ono': ono_rest, 'miya': miya_rest, 'hiro': hiro_rest}
+    onekin_max = {'ono': ono_1kin_max, 'miya': miya_1kin_max, 'hiro': hiro_1kin_max}
+
+    ono_off = [datetime.strptime(d.strip(), '%Y-%m-%d') for d in ono_must_off.split(',') if d.strip()]
+    miya_off = [datetime.strptime(d.strip(), '%Y-%m-%d') for d in miya_must_off.split(',') if d.strip()]
+    hiro_off = [datetime.strptime(d.strip(), '%Y-%m-%d') for d in hiro_must_off.split(',') if d.strip()]
+
+    cheer_days = [datetime.strptime(d.strip(), '%Y-%m-%d') for d in cheer_days_str.split(',') if d.strip()]
+    campaign_days = [datetime.strptime(d.strip(), '%Y-%m-%d') for d in campaign_days_str.split(',') if d.strip()]
+    holidays = [datetime.strptime(d.strip(), '%Y-%m-%d') for d in holidays_str.split(',') if d.strip()]
+    three_person_priority = [datetime.strptime(d.strip(), '%Y-%m-%d') for d in three_person_priority_str.split(',') if d.strip()]
+
+    is_special_late = [(days[i].weekday() == 6 or days[i] in holidays) for i in range(days_count)]
+    cheer_indices = [days.index(d) for d in cheer_days if d in days]
+    campaign_indices = [days.index(d) for d in campaign_days if d in days]
+    three_priority_indices = [days.index(d) for d in three_person_priority if d in days]
+
+    persons = ['ono', 'miya', 'hiro', 'support']
+    shifts = {
+        'ono': ['As', 'E', 'F', 'off'],
+        'miya': ['A', 'C', 'E', 'F', 'off'],
+        'hiro': ['A', 'C', 'E', 'F', 'off'],
+        'support': ['D', 'E', 'F', 'off']
+    }
+
+    vars = {}
+    for d in range(days_count):
+        vars[d] = {}
+        for p in persons:
+            vars[d][p] = lp.LpVariable.dicts(f"v_{d}_{p}", shifts[p], cat='Binary')
+
+    prob = lp.LpProblem("Shift", lp.LpMaximize)
+
+    # Define workers
+    workers = {}
+    for d in range(days_count):
+        workers[d] = lp.lpSum(lp.lpSum(vars[d][p][s] for s in shifts[p] if s != 'off') for p in ['ono', 'miya', 'hiro', 'support'])
+
+    # Objective: maximize workers on priority days
+    prob += lp.lpSum(workers[d] for d in three_priority_indices)
+
+    # Each person each day one shift
+    for d in range(days_count):
+        for p in persons:
+            prob += lp.lpSum(vars[d][p][s] for s in shifts[p]) == 1
+
+    # Specific offs
+    ono_off_indices = [days.index(d) for d in ono_off if d in days]
+    for d in ono_off_indices:
+        prob += vars[d]['ono']['off'] == 1
+
+    miya_off_indices = [days.index(d) for d in miya_off if d in days]
+    for d in miya_off_indices:
+        prob += vars[d]['miya']['off'] == 1
+
+    hiro_off_indices = [days.index(d) for d in hiro_off if d in days]
+    for d in hiro_off_indices:
+        prob += vars[d]['hiro']['off'] == 1
+
+    # Total offs
+    for p in ['ono', 'miya', 'hiro']:
+        prob += lp.lpSum(vars[d][p]['off'] for d in range(days_count)) == rest_days[p]
+
+    # Cheer configuration
+    for d in range(days_count):
+        if d in cheer_indices:
+            prob += lp.lpSum(vars[d]['support'][s] for s in ['D', 'E', 'F']) == 1
+        else:
+            prob += vars[d]['support']['off'] == 1
+
+    prob += lp.lpSum(vars[d]['support']['D'] for d in range(days_count)) == support_d_days  # 8 in the app
+
+    # Ono As on cheer days
+    for d in cheer_indices:
+        prob += vars[d]['ono']['As'] == 1
+
+    # Late type
+    for d in range(days_count):
+        for p in persons:
+            if 'E' in shifts[p]:
+                if not is_special_late[d]:
+                    prob += vars[d][p]['E'] == 0
+            if 'F' in shifts[p]:
+                if is_special_late[d]:
+                    prob += vars[d][p]['F'] == 0
+
+    # Cheer day configuration
+    for d in range(days_count):
+        miya_work = lp.lpSum(vars[d]['miya'][s] for s in shifts['miya'] if s != 'off')
+        hiro_work = lp.lpSum(vars[d]['hiro'][s] for s in shifts['hiro'] if s != 'off')
+        if d in cheer_indices:
+            prob += miya_work + hiro_work == vars[d]['support']['D']
+        prob += vars[d]['miya']['A'] + vars[d]['miya']['C'] <= 1 - vars[d]['support']['D']
+        prob += vars[d]['hiro']['A'] + vars[d]['hiro']['C'] <= 1 - vars[d]['support']['D']
+
+    # Early, mid, late constraints
+    for d in range(days_count):
+        early = vars[d]['ono']['As'] + vars[d]['miya']['A'] + vars[d]['hiro']['A']
+        late = lp.lpSum(vars[d][p][s] for p in persons for s in ['E', 'F'] if s in shifts[p])
+        mid = vars[d]['miya']['C'] + vars[d]['hiro']['C'] + vars[d]['support']['D']
+
+        prob += early >= 1
+        prob += late >= 1
+        prob += mid >= workers[d] - 2
+        prob += early <= 1
+        prob += late <= 1
+        prob += mid <= 1
+        prob += workers[d] >= 2
+        prob += workers[d] <= 3
+
+    # Balance
+    for p in ['ono', 'miya', 'hiro']:
+        if p == 'ono':
+            early_sum = lp.lpSum(vars[d][p]['As'] for d in range(days_count))
+            late_sum = lp.lpSum(vars[d][p][s] for d in range(days_count) for s in ['E', 'F'])
+        else:
+            early_sum = lp.lpSum(vars[d][p]['A'] for d in range(days_count))
+            late_sum = lp.lpSum(vars[d][p][s] for d in range(days_count) for s in ['E', 'F'])
+            mid_sum = lp.lpSum(vars[d][p]['C'] for d in range(days_count))
+            prob += mid_sum >= mid_min
+            prob += mid_sum <= mid_max
+        prob += early_sum >= early_min
+        prob += early_sum <= early_max
+        prob += late_sum >= late_min
+        prob += late_sum <= late_max
+
+    # Continuous constraints
+    for p in ['ono', 'miya', 'hiro']:
+        # Max work 4 (prevent 5 consecutive work)
+        consec_work = prev_consec_work[p]
+        if consec_work >= 5:
+            raise ValueError(f"{p}の前日連続勤務が5以上です。ルール違反。")
+        if consec_work > 0 and days_count > 0:
+            init_window = min(days_count, 5 - consec_work)
+            prob += lp.lpSum(vars[d][p]['off'] for d in range(init_window)) >= 1
+        for i in range(days_count - 4):
+            prob += lp.lpSum(vars[i+j][p]['off'] for j in range(5)) >= 1
+
+        # Max rest 3 (prevent 4 consecutive rest)
+        consec_rest = prev_consec_rest[p]
+        if consec_rest >= 4:
+            raise ValueError(f"{p}の前日連続休みが4以上です。ルール違反。")
+        if consec_rest > 0 and days_count > 0:
+            init_window = min(days_count, 4 - consec_rest)
+            prob += lp.lpSum(vars[d][p]['off'] for d in range(init_window)) <= init_window - 1
+        for i in range(days_count - 3):
+            prob += lp.lpSum(vars[i+j][p]['off'] for j in range(4)) <= 3
+
+        # Mix for 3+ duty
+        if prev_off[p] == 0 and days_count >= 2:
+            sum_off = vars[0][p]['off'] + vars[1][p]['off']
+            if p == 'ono':
+                early0 = vars[0][p]['As']
+                early1 = vars[1][p]['As']
+                late0 = lp.lpSum(vars[0][p][s] for s in ['E', 'F'])
+                late1 = lp.lpSum(vars[1][p][s] for s in ['E', 'F'])
+            else:
+                early0 = vars[0][p]['A']
+                early1 = vars[1][p]['A']
+                late0 = lp.lpSum(vars[0][p][s] for s in ['E', 'F'])
+                late1 = lp.lpSum(vars[1][p][s] for s in ['E', 'F'])
+            sum_early = prev_early[p] + early0 + early1
+            sum_late = prev_late[p] + late0 + late1
+            prob += sum_early >= 1 - sum_off
+            if p != 'ono':
+                prob += sum_late >= 1 - sum_off
+
+        for i in range(days_count - 2):
+            off1 = vars[i][p]['off']
+            off2 = vars[i+1][p]['off']
+            off3 = vars[i+2][p]['off']
+            sum_off = off1 + off2 + off3
+            if p == 'ono':
+                sum_early = vars[i][p]['As'] + vars[i+1][p]['As'] + vars[i+2][p]['As']
+                sum_late = lp.lpSum(vars[i+j][p][s] for j in range(3) for s in ['E', 'F'])
+            else:
+                sum_early = vars[i][p]['A'] + vars[i+1][p]['A'] + vars[i+2][p]['A']
+                sum_late = lp.lpSum(vars[i+j][p][s] for j in range(3) for s in ['E', 'F'])
+            prob += sum_early >= 1 - sum_off
+            if p != 'ono':
+                prob += sum_late >= 1 - sum_off
+
+        # 1kin
+        is_1kin_list = []
+        if days_count > 1:
+            # Start: prev_off考慮（入力時のみ）
+            work = 1 - vars[0][p]['off']
+            off_next = vars[1][p]['off']
+            is_1kin = lp.LpVariable(f"is_1kin_{p}_0", cat='Binary')
+            prob += is_1kin <= work
+            prob += is_1kin <= off_next
+            if prev_shift[p] != '':  # 前日入力時のみprev_off考慮
+                prob += is_1kin <= prev_off[p]
+                prob += is_1kin >= work + off_next + prev_off[p] - 2
+            else:  # 無入力時: prev_off考慮せず
+                prob += is_1kin >= work + off_next - 1
+            is_1kin_list.append(is_1kin)
+
+            # Middle
+            for i in range(1, days_count - 1):
+                work = 1 - vars[i][p]['off']
+                off_prev = vars[i-1][p]['off']
+                off_next = vars[i+1][p]['off']
+                is_1kin = lp.LpVariable(f"is_1kin_{p}_{i}", cat='Binary')
+                prob += is_1kin <= work
+                prob += is_1kin <= off_prev
+                prob += is_1kin <= off_next
+                prob += is_1kin >= work + off_prev + off_next - 2
+                is_1kin_list.append(is_1kin)
+
+            # End: 終了日の1kinを考慮せず（翌日無視、is_1kin=0固定）
+            # 終了日のis_1kinを追加せず、リストに含めない
+
+        prob += lp.lpSum(is_1kin_list) <= onekin_max[p]
+
+    # Campaign Saturday constraints
+    is_two = {}
+    for d in campaign_indices:
+        is_two[d] = lp.LpVariable(f"is_two_{d}", cat='Binary')
+        prob += is_two[d] == 3 - workers[d]
+        prob += vars[d]['ono']['F'] >= is_two[d]
+        miya_work = lp.lpSum(vars[d]['miya'][s] for s in shifts['miya'] if s != 'off')
+        hiro_work = lp.lpSum(vars[d]['hiro'][s] for s in shifts['hiro'] if s != 'off')
+        prob += vars[d]['miya']['A'] >= miya_work - (1 - is_two[d])
+        prob += vars[d]['hiro']['A'] >= hiro_work - (1 - is_two[d])
+
+    return prob, vars, persons, shifts
@@ -0,0 +1,39 @@
+"""Throughput of solve_batch() vs. number of worker processes.
+
+    python -m benchmarks.bench_batch [--months 3] [--scenarios 8] [--workers 1 2 4]
+
+Every scenario is one solver run, so with at least as many scenarios as
+workers the wall time should drop close to 1/workers up to the number of
+physical cores.
+"""
+import argparse
+import os
+import time
+
+from benchmarks.scenarios import make_problem
+from shiftbuilder.batch import solve_batch
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--months', type=int, default=3)
+    parser.add_argument('--scenarios', type=int, default=8)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--backend', default='cbc')
+    args = parser.parse_args()
+
+    # Different seeds move the must-off days, so every scenario is a separate solve.
+    problems = [make_problem(args.months, seed=seed) for seed in range(args.scenarios)]
+    print(f"cpus: {os.cpu_count()}, scenarios: {len(problems)}, months: {args.months}")
+    print(f"{'workers':>7} {'wall s':>7} {'speedup':>8} {'optimal':>7}")
+    base = None
+    for workers in args.workers:
+        t0 = time.perf_counter()
+        results = solve_batch(problems, workers=workers, use_cache=False, backend=args.backend)
+        wall = time.perf_counter() - t0
+        base = base or wall
+        print(f"{workers:>7} {wall:>7.2f} {base / wall:>7.2f}x {sum(r.optimal for r in results):>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""A year as chained monthly solves vs. one solve over the whole horizon.
+
+    python -m benchmarks.bench_chain [--months 3 6 12] [--backend cbc]
+
+'chain' is solve_chain() over consecutive make_problem(1) months, each
+starting from the state the month before left (carry_over); 'retries' is
+the number of months solved again with end_slack so that the next one
+could start.  'horizon' is make_problem(months), the same rules with the
+totals scaled to the whole period, as a single model.  'check' verifies
+that every month's prev_* equals the state its predecessor's schedule
+ends in.
+
+One run on a single core:
+
+    months       mode   solve s retries check
+         3      chain      0.33       0 ok
+         3    horizon      0.33       - -
+         6      chain      0.80       1 ok
+         6    horizon      1.51       - -
+        12      chain      1.54       2 ok
+        12    horizon      6.73       - -
+
+Each chained month takes about a tenth of a second, so the time grows
+linearly with the months; the single model grows faster.  The chain does
+not optimize across month boundaries, and a month that cannot start
+from the state it is left gets one retry of the month before.
+"""
+import argparse
+import time
+from datetime import timedelta
+
+from benchmarks.scenarios import make_problem
+from shiftbuilder import solve
+from shiftbuilder.chain import solve_chain, trailing_state
+
+
+def months_from(start, count):
+    problems = []
+    for k in range(count):
+        problem = make_problem(1, start=start, seed=k)
+        problems.append(problem)
+        start = problem.end + timedelta(days=1)
+    return problems
+
+
+def check(periods):
+    for (a, ra), (b, _) in zip(periods, periods[1:]):
+        state = trailing_state(ra.shift, a.staff, a)
+        if any(state[name] != getattr(b, name) for name in state):
+            return f'FAIL ({b.start})'
+    return 'ok' if all(r.optimal for _, r in periods) else 'no schedule'
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--months', type=int, nargs='+', default=[3, 6, 12])
+    parser.add_argument('--backend', default='cbc')
+    parser.add_argument('--time-limit', type=int, default=300)
+    args = parser.parse_args()
+
+    print(f"{'months':>6} {'mode':>10} {'solve s':>9} {'retries':>7} check")
+    for months in args.months:
+        problems = months_from(make_problem(1).start, months)
+        t0 = time.perf_counter()
+        periods = solve_chain(problems, backend=args.backend, time_limit=args.time_limit, use_cache=False)
+        chain_s = time.perf_counter() - t0
+        retries = sum(p.end_slack > 0 for p, _ in periods)
+        print(f"{months:>6} {'chain':>10} {chain_s:>9.2f} {retries:>7} {check(periods)}")
+        t0 = time.perf_counter()
+        solve(make_problem(months), backend=args.backend, time_limit=args.time_limit, use_cache=False)
+        print(f"{months:>6} {'horizon':>10} {time.perf_counter() - t0:>9.2f} {'-':>7} -")
+
+
+if __name__ == '__main__':
+    main()
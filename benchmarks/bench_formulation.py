@@ -0,0 +1,60 @@
+"""Solve time of the default vs. the strengthened formulation (ShiftProblem.strengthen).
+
+    python -m benchmarks.bench_formulation [--months 3 6 12] [--backend cbc highs]
+
+'default' is the app's August-September input; 'symmetric' scenarios have
+no must-off days, so 宮村/廣内 are interchangeable and symmetry breaking
+applies.  Both formulations must reach the same objective.
+
+One run on a single core (columns/rows/seconds as default->strengthened):
+
+    scenario               backend        int cols          rows         solve s     objective
+    default                    cbc     652->558       1188->921       0.13->0.11      26.0/26.0
+    default                  highs     652->558       1188->921       0.26->0.09      26.0/26.0
+    3 months                   cbc    1936->1656      3540->2724      0.49->0.38      78.0/78.0
+    3 months                 highs    1936->1656      3540->2724      3.25->1.92      78.0/78.0
+    3 months symmetric         cbc    1936->1656      3531->2716      0.48->0.52      79.0/79.0
+    3 months symmetric       highs    1936->1656      3531->2716      3.92->2.56      79.0/79.0
+    6 months                   cbc    3854->3294      7069->5434      2.83->1.68     155.0/155.0
+    6 months                 highs    3854->3294      7069->5434      2.02->2.04     155.0/155.0
+    6 months symmetric         cbc    3854->3294      7051->5417      2.09->1.56     157.0/157.0
+    6 months symmetric       highs    3854->3294      7051->5417      7.50->4.71     157.0/157.0
+    12 months                  cbc    7710->6588     14165->10883    10.54->4.26     314.0/314.0
+    12 months                highs    7710->6588     14165->10883     5.91->5.57     314.0/314.0
+    12 months symmetric        cbc    7710->6588     14129->10848     5.27->6.08     316.0/316.0
+    12 months symmetric      highs    7710->6588     14129->10848     9.90->10.50    316.0/316.0
+"""
+import argparse
+import dataclasses
+
+from benchmarks.scenarios import default_problem, make_problem
+from shiftbuilder import solve
+from shiftbuilder.model import build_matrix
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--months', type=int, nargs='+', default=[3, 6, 12])
+    parser.add_argument('--backend', nargs='+', default=['cbc', 'highs'])
+    parser.add_argument('--time-limit', type=int, default=300)
+    args = parser.parse_args()
+
+    scenarios = [('default', default_problem())]
+    for months in args.months:
+        scenarios.append((f'{months} months', make_problem(months)))
+        scenarios.append((f'{months} months symmetric', make_problem(months, must_off_per_month=0)))
+
+    print(f"{'scenario':<22} {'backend':>7} {'int cols':>15} {'rows':>13} {'solve s':>15} {'objective':>13}")
+    for name, problem in scenarios:
+        strong = dataclasses.replace(problem, strengthen=True)
+        m, ms = build_matrix(problem), build_matrix(strong)
+        for backend in args.backend:
+            a = solve(problem, time_limit=args.time_limit, use_cache=False, backend=backend)
+            b = solve(strong, time_limit=args.time_limit, use_cache=False, backend=backend)
+            print(f"{name:<22} {backend:>7} {int(m.integrality().sum()):>7}->{int(ms.integrality().sum()):<7} "
+                  f"{m.num_rows:>6}->{ms.num_rows:<6} {a.solve_time:>7.2f}->{b.solve_time:<7.2f} "
+                  f"{a.objective!s:>6}/{b.objective!s:<6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""PDF export time and size vs. roster size and period.
+
+    python -m benchmarks.bench_pdf [--staff 3 100] [--months 1 3]
+
+Random schedules (codes of make_roster(), ~30% off) written with the
+bundled DejaVu Sans, which is subset to the glyphs used:
+
+    staff months  days  stats pages     KB   time s
+        3      1    30     no     1   11.2     0.07
+        3      1    30    yes     1   13.9     0.08
+        3      3    92     no     2   14.4     0.09
+        3      3    92    yes     2   17.1     0.10
+      100      1    30     no     4   36.3     0.24
+      100      1    30    yes     6   49.9     0.39
+      100      3    92     no    10   88.0     0.61
+      100      3    92    yes    12  101.9     0.70
+
+About 60 ms of every export is fpdf2 reading the 720 KB font file.
+"""
+import argparse
+import io
+import random
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from benchmarks.scenarios import make_roster
+from shiftbuilder import Schedule, ShiftProblem, ShiftResult, write_pdf
+from shiftbuilder.schedule import CODES
+
+
+def random_result(n, months, start=date(2025, 8, 16), seed=0):
+    rnd = random.Random(seed)
+    roster = make_roster(n, seed)
+    problem = ShiftProblem(start=start, end=start + timedelta(days=round(months * 30.5) - 1), roster=roster)
+    codes = [[0 if rnd.random() < 0.3 else CODES.index(rnd.choice(roster[p].shifts[:-1]))
+              for _ in range(problem.days_count)] for p in problem.persons]
+    return problem, ShiftResult(status='Optimal', shift=Schedule(np.array(codes), problem.persons), days=problem.days)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--staff', type=int, nargs='+', default=[3, 100])
+    parser.add_argument('--months', type=int, nargs='+', default=[1, 3])
+    args = parser.parse_args()
+
+    write_pdf(*random_result(3, 1), io.BytesIO())  # load fpdf and the font once before timing
+    print(f"{'staff':>5} {'months':>6} {'days':>5} {'stats':>6} {'pages':>5} {'KB':>6} {'time s':>8}")
+    for n in args.staff:
+        for months in args.months:
+            problem, result = random_result(n, months)
+            for with_stats in (False, True):
+                out = io.BytesIO()
+                t0 = time.perf_counter()
+                pages = write_pdf(problem, result, out, with_stats)
+                elapsed = time.perf_counter() - t0
+                print(f"{n:>5} {months:>6} {problem.days_count:>5} {'yes' if with_stats else 'no':>6} {pages:>5} "
+                      f"{len(out.getvalue()) / 1024:>6.1f} {elapsed:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
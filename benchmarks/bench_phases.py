@@ -0,0 +1,167 @@
+"""Time every phase of one scheduling run and write the results as JSON.
+
+    python -m benchmarks.bench_phases [--months 1 3 6 12] [--rosters default 20]
+                                      [--density low normal high] [--backend cbc] [--out phases.json]
+
+Phases, in seconds:
+
+    parse      scenario JSON text -> ShiftProblem
+    build      build_matrix() (the rules as row blocks)
+    translate  the matrix handed to the backend (PuLP problem / HighsLp)
+    solve      the solver run
+    extract    one read of the column values, decoded to a Schedule
+    stats      get_stats()
+    export     each file of shiftbuilder.exports (CSVs; PDFs with fpdf2)
+
+The JSON holds the machine, the package versions and the git commit next to
+one record per scenario, so runs from different commits can be compared;
+--baseline old.json prints every phase as a ratio to the same scenario
+there (> 1: slower now).  Infeasible or unsolved scenarios have no
+extract/stats/export times.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime
+from importlib import metadata
+
+import numpy as np
+import pulp as lp
+
+from benchmarks.scenarios import make_scenario
+from shiftbuilder import ShiftProblem, ShiftResult, get_stats, pdf_available
+from shiftbuilder.exports import BUILDERS, DOWNLOADS
+from shiftbuilder.model import build_matrix
+from shiftbuilder.solver import decode, highs_model, to_pulp
+
+
+class Timer:
+    def __init__(self):
+        self.phases = {}
+
+    def __call__(self, phase, run):
+        t0 = time.perf_counter()
+        value = run()
+        self.phases[phase] = round(time.perf_counter() - t0, 6)
+        return value
+
+
+def run_cbc(timer, m, time_limit):
+    prob, cols = timer('translate', lambda: to_pulp(m))
+    status = timer('solve', lambda: prob.solve(lp.PULP_CBC_CMD(msg=0, timeLimit=time_limit)))
+    if status != lp.LpStatusOptimal:
+        return lp.LpStatus[status], None, None
+    return 'Optimal', lambda: np.array([v.varValue or 0.0 for v in cols]), lp.value(prob.objective)
+
+
+def run_highs(timer, m, time_limit):
+    h = timer('translate', lambda: highs_model(m))
+    h.setOptionValue('time_limit', float(time_limit))
+    timer('solve', h.run)
+    if h.getInfo().primal_solution_status != 2:
+        return h.modelStatusToString(h.getModelStatus()), None, None
+    return 'Optimal', lambda: np.asarray(h.getSolution().col_value), h.getInfo().objective_function_value
+
+
+RUNS = {'cbc': run_cbc, 'highs': run_highs}
+
+
+def run_scenario(problem, backend, time_limit):
+    timer = Timer()
+    text = json.dumps(problem.to_dict(), ensure_ascii=False)
+    problem = timer('parse', lambda: ShiftProblem.from_dict(json.loads(text)))
+    m = timer('build', lambda: build_matrix(problem))
+    status, values, objective = RUNS[backend](timer, m, time_limit)
+    record = {'days': problem.days_count, 'persons': len(problem.persons), 'cols': m.num_cols, 'rows': m.num_rows,
+              'nnz': len(m.csr()[1]), 'status': status, 'objective': objective}
+    if values is not None:
+        schedule = timer('extract', lambda: decode(m, values()))
+        result = ShiftResult(status='Optimal', shift=schedule, days=problem.days, key=problem.key())
+        timer('stats', lambda: get_stats(schedule, problem.days_count, problem.persons,
+                                         problem.prev_off, problem.prev_early, problem.prev_late))
+        for kind in DOWNLOADS:
+            if pdf_available() or not kind.startswith('pdf'):
+                timer(f'export_{kind}', lambda: BUILDERS[kind](problem, result))
+    record['phases'] = timer.phases
+    return record
+
+
+def scenario_key(record):
+    return record['roster'], record['months'], record['density'], record['backend']
+
+
+def compare(runs, baseline):
+    """Lines with every phase of runs as a ratio to the same scenario in baseline."""
+    before = {scenario_key(r): r['phases'] for r in baseline['runs']}
+    lines = []
+    for record in runs:
+        old = before.get(scenario_key(record))
+        if old is None:
+            continue
+        ratios = ' '.join(f"{k}={v / old[k]:.2f}" for k, v in record['phases'].items() if old.get(k))
+        lines.append(f"{' '.join(map(str, scenario_key(record)))}: {ratios}")
+    return lines
+
+
+def environment():
+    def version(distribution):
+        try:
+            return metadata.version(distribution)
+        except metadata.PackageNotFoundError:
+            return None
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'time': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'versions': {d: version(d) for d in ('numpy', 'PuLP', 'highspy', 'fpdf2')},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--months', type=int, nargs='+', default=[1, 3, 6, 12])
+    parser.add_argument('--rosters', nargs='+', default=['default', '20'],
+                        help="'default' (新宿店) or a number of staff")
+    parser.add_argument('--density', nargs='+', default=['normal'], choices=['low', 'normal', 'high'])
+    parser.add_argument('--backend', default='cbc', choices=sorted(RUNS))
+    parser.add_argument('--time-limit', type=int, default=120)
+    parser.add_argument('--out', help="JSON file (default: stdout only)")
+    parser.add_argument('--baseline', help="earlier JSON output to compare with")
+    args = parser.parse_args()
+
+    runs = []
+    print(f"{'roster':>7} {'months':>6} {'density':>7} {'status':>10}  phases s")
+    for roster in args.rosters:
+        for months in args.months:
+            for density in args.density:
+                staff = None if roster == 'default' else int(roster)
+                record = run_scenario(make_scenario(months, staff, density), args.backend, args.time_limit)
+                record.update(roster=roster, months=months, density=density, backend=args.backend)
+                runs.append(record)
+                phases = ' '.join(f"{k}={v:.3f}" for k, v in record['phases'].items())
+                print(f"{roster:>7} {months:>6} {density:>7} {record['status']:>10}  {phases}")
+
+    report = {'environment': environment(), 'time_limit': args.time_limit, 'runs': runs}
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=1)
+    else:
+        print(json.dumps(report, ensure_ascii=False))
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            print('\n'.join(['', 'vs. baseline (time now / time then)'] + compare(runs, json.load(f))))
+
+
+if __name__ == '__main__':
+    main()
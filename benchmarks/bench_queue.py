@@ -0,0 +1,115 @@
+"""Month-end rush: many sessions solving at once, each in its own thread vs. through the JobQueue.
+
+    python -m benchmarks.bench_queue [--users 4 8 16] [--scenarios 6] [--workers 1] [--spread 0]
+
+Every simulated user submits one scenario out of --scenarios distinct ones
+(so some users ask for the same one) at a random time within --spread
+seconds, then waits for it.  'threads' is how the app served them before:
+a SolveJob per session, all running at once.  'queue' submits them to a
+JobQueue with --workers processes (default: CPU count), whose pool is
+started before the clock runs as it is on a server.  'latency' is from a
+user's submission to their result, 'solves' the solver runs and
+'proven' the users who got a proven optimum within --time-limit.
+
+One run on a single core, team scenarios of 20 staff (1-3 s each alone):
+
+   users     mode  wall s  jobs/min  mean s   p90 s   max s  solves  proven
+       4  threads    5.08      47.2    4.94    5.03    5.04       4       4
+       4    queue    3.01      79.7    2.31    3.01    3.01       3       4
+       8  threads   11.84      40.5    9.19   10.23   11.56       8       8
+       8    queue    7.28      65.9    2.97    5.06    7.27       5       8
+      16  threads   25.37      37.8   16.58   22.67   25.02      16      16
+      16    queue    8.67     110.7    5.25    7.98    8.64       6      16
+
+Sharing the core between all sessions makes every user wait about as long
+as the whole rush; the queue serves them one after the other and never
+solves a scenario twice while it is in flight.  CBC counts its time limit
+in CPU seconds, so every thread still proves its optimum, but with
+--time-limit 5 the 16 users wait 22.8 s on average (queue: 3.8 s).
+"""
+import argparse
+import random
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.scenarios import default_problem, make_team_problem
+from shiftbuilder import JobQueue, SolveJob, clear_cache, set_store
+
+
+def users(count, scenarios, spread, seed=0):
+    """[(arrival seconds, problem)] for count users picking from the scenarios."""
+    rnd = random.Random(seed)
+    return sorted(((rnd.uniform(0, spread), rnd.choice(scenarios)) for _ in range(count)), key=lambda u: u[0])
+
+
+def run_threads(arrivals, options):
+    def user(problem):
+        return SolveJob(problem, **options).start().wait()
+
+    return _rush(arrivals, user)
+
+
+def run_queue(arrivals, options, workers):
+    queue = JobQueue(workers)
+    queue.submit(default_problem(), **options).wait()  # start the pool, as on a running server
+    clear_cache()
+    out = _rush(arrivals, lambda problem: queue.submit(problem, **options).wait())
+    queue.shutdown()
+    return out
+
+
+def _rush(arrivals, user):
+    """[(latency, result)] of user(problem) for every arrival, run by one thread each."""
+    out = [None] * len(arrivals)
+    t0 = time.perf_counter()
+
+    def run(i, arrival, problem):
+        time.sleep(max(arrival - (time.perf_counter() - t0), 0))
+        submitted = time.perf_counter()
+        result = user(problem)
+        out[i] = (time.perf_counter() - submitted, result)
+
+    threads = [threading.Thread(target=run, args=(i, *a)) for i, a in enumerate(arrivals)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return out, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--users', type=int, nargs='+', default=[4, 8, 16])
+    parser.add_argument('--scenarios', type=int, default=6)
+    parser.add_argument('--staff', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--spread', type=float, default=0.0, help="arrivals within this many seconds")
+    parser.add_argument('--backend', default='cbc')
+    parser.add_argument('--time-limit', type=int, default=300)
+    args = parser.parse_args()
+
+    set_store(None)
+    scenarios = [make_team_problem(args.staff, seed=k) for k in range(args.scenarios)]
+    options = dict(backend=args.backend, time_limit=args.time_limit)
+    print(f"{'users':>7} {'mode':>8} {'wall s':>7} {'jobs/min':>9} {'mean s':>7} {'p90 s':>7} {'max s':>7} "
+          f"{'solves':>7} {'proven':>7}")
+    for count in args.users:
+        arrivals = users(count, scenarios, args.spread)
+        for mode in ('threads', 'queue'):
+            clear_cache()
+            if mode == 'threads':
+                out, wall = run_threads(arrivals, options)
+            else:
+                out, wall = run_queue(arrivals, options, args.workers)
+            # users of a shared job or a cache hit get the very same result object
+            solves = len({id(r) for _, r in out})
+            latency = np.array([t for t, _ in out])
+            proven = sum(r.proven for _, r in out)
+            print(f"{count:>7} {mode:>8} {wall:>7.2f} {count / wall * 60:>9.1f} {latency.mean():>7.2f} "
+                  f"{np.percentile(latency, 90):>7.2f} {latency.max():>7.2f} {solves:>7} {proven:>7}")
+
+
+if __name__ == '__main__':
+    main()
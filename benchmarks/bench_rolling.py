@@ -0,0 +1,39 @@
+"""Monolithic vs. rolling-horizon solve time per horizon.
+
+    python -m benchmarks.bench_rolling [--months 3 6 12 24] [--backend highs]
+"""
+import argparse
+import time
+
+from benchmarks.scenarios import make_problem
+from shiftbuilder import solve
+from shiftbuilder.rolling import solve_rolling
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--months', type=int, nargs='+', default=[3, 6, 12, 24])
+    parser.add_argument('--backend', default='highs')
+    parser.add_argument('--commit', type=int, default=14)
+    parser.add_argument('--lookahead', type=int, default=7)
+    parser.add_argument('--time-limit', type=int, default=300)
+    parser.add_argument('--skip-monolithic', action='store_true')
+    args = parser.parse_args()
+
+    print(f"{'months':>6} {'days':>5} {'mode':>10} {'time s':>8} {'objective':>9} status")
+    for months in args.months:
+        problem = make_problem(months)
+        runs = [('rolling', lambda: solve_rolling(problem, args.commit, args.lookahead, backend=args.backend,
+                                                  time_limit=args.time_limit, use_cache=False))]
+        if not args.skip_monolithic:
+            runs.append(('monolithic', lambda: solve(problem, backend=args.backend,
+                                                     time_limit=args.time_limit, use_cache=False)))
+        for mode, run in runs:
+            t0 = time.perf_counter()
+            result = run()
+            print(f"{months:>6} {problem.days_count:>5} {mode:>10} {time.perf_counter() - t0:>8.2f} "
+                  f"{result.objective if result.objective is not None else '-':>9} {result.status}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""Model size, build time and solve time vs. roster size.
+
+    python -m benchmarks.bench_roster [--staff 10 50 100] [--backend highs]
+
+build_matrix() adds every rule as one block of rows for all persons at once,
+so the model grows linearly with the number of staff (~180 columns and ~300
+rows per person and month) and build time stays far below solve time:
+
+    staff   cols   rows     nnz  matrix s backend  solve s status
+       10   1788   3064   15220    0.0051   highs     3.86 Optimal
+       50   8940  14824   76100    0.0104   highs    20.36 Optimal
+      100  17880  29524  152200    0.0280   highs    41.72 Optimal
+"""
+import argparse
+import time
+
+from benchmarks.scenarios import make_team_problem
+from shiftbuilder import solve
+from shiftbuilder.model import build_matrix
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--staff', type=int, nargs='+', default=[10, 50, 100])
+    parser.add_argument('--backend', nargs='+', default=['highs'])
+    parser.add_argument('--time-limit', type=int, default=300)
+    args = parser.parse_args()
+
+    print(f"{'staff':>5} {'cols':>6} {'rows':>6} {'nnz':>7} {'matrix s':>9} {'backend':>7} {'solve s':>8} status")
+    for n in args.staff:
+        problem = make_team_problem(n)
+        t0 = time.perf_counter()
+        m = build_matrix(problem)
+        t_matrix = time.perf_counter() - t0
+        nnz = len(m.csr()[1])
+        for backend in args.backend:
+            result = solve(problem, time_limit=args.time_limit, use_cache=False, backend=backend)
+            print(f"{n:>5} {m.num_cols:>6} {m.num_rows:>6} {nnz:>7} {t_matrix:>9.4f} {backend:>7} "
+                  f"{result.solve_time:>8.2f} {result.status}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""Shared support pool: Lagrangian decomposition by site vs. number of sites.
+
+    python -m benchmarks.bench_sites [--sites 4 8 16 32] [--workers 4] [--backend cbc]
+
+Sites are make_sites(n): 新宿店 variants whose 応援 Sundays compete for a
+pool of ceil(0.6 n) 'D' shifts.  'solves' counts site solves, repairs
+included; 'gap' is against the Lagrangian bound.
+
+One run on a single core, CBC:
+
+    sites iterations  solves   time s  objective    bound     gap status
+        4          1       4     0.48      101.0    101.0   0.00% Optimal
+        8         13     155    16.95      200.0    200.0   0.00% Optimal
+       16         20     455    50.47      400.0    404.0   1.00% Optimal
+
+With 4 sites the pool (3) covers every Sunday without prices.  The joint
+MIP of the 4 sites of examples/sites.json gives the same 100.0 as
+solve_sites().
+"""
+import argparse
+
+from benchmarks.scenarios import make_sites
+from shiftbuilder.sites import solve_sites
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sites', type=int, nargs='+', default=[4, 8, 16, 32])
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--backend', default='cbc')
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--time-limit', type=int, default=300)
+    args = parser.parse_args()
+
+    print(f"{'sites':>5} {'iterations':>10} {'solves':>7} {'time s':>8} {'objective':>10} {'bound':>8} {'gap':>7} status")
+    for n in args.sites:
+        sites, capacity = make_sites(n)
+        result = solve_sites(sites, capacity, backend=args.backend, time_limit=args.time_limit,
+                             workers=args.workers, iterations=args.iterations)
+        gap = f"{result.gap:.2%}" if result.gap is not None else '-'
+        print(f"{n:>5} {result.iterations:>10} {result.solves:>7} "
+              f"{result.solve_time:>8.2f} {result.objective!s:>10} {result.bound!s:>8} {gap:>7} {result.status}")
+
+
+if __name__ == '__main__':
+    main()
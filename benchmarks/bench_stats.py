@@ -0,0 +1,77 @@
+"""Vectorized get_stats vs. the app's per-person, per-day loop.
+
+    python -m benchmarks.bench_stats [--days 31 365 3650 36500] [--repeat 5]
+
+'loop' is benchmarks.baseline.get_stats(), the function as it was in the
+app, which knows only the three 新宿店 staff; so the schedules are random
+ones of the default roster (its codes, ~30% off, 応援 on 'D' or off) of a
+growing number of days.  tests/test_stats.py checks that both return the
+same dict.  From shift dicts most of the time is reading them into the
+kind array (encode); a Schedule (what solve() returns) is already an
+array, so get_stats on it is little more than the metrics.
+
+Best of 5 on a single core:
+
+     days   loop s  array s  speedup encode s metrics s Schedule s
+       31   0.0001   0.0001      0.6   0.0000    0.0001     0.0001
+      365   0.0005   0.0002      2.6   0.0001    0.0001     0.0001
+     3650   0.0050   0.0011      4.5   0.0007    0.0003     0.0003
+    36500   0.0516   0.0119      4.3   0.0082    0.0030     0.0036
+
+For one month of three people the loop is quicker than setting up the
+arrays; both take a fraction of a millisecond.  From a year on the array
+version is 2.5-4.5 times faster, and about 15 times on a Schedule.
+"""
+import argparse
+import random
+import time
+
+from benchmarks import baseline
+from shiftbuilder import default_roster
+from shiftbuilder.schedule import Schedule
+from shiftbuilder.stats import get_stats, kind_array, kind_stats
+
+
+def random_schedule(days_count, seed=0):
+    """(shift dicts, persons) of days_count random days of the default 新宿店 roster."""
+    rnd = random.Random(seed)
+    roster = default_roster()
+    shift = [{p: '' if rnd.random() < 0.3 else rnd.choice(roster[p].shifts[:-1]) for p in roster.staff}
+             for _ in range(days_count)]
+    for day in shift:
+        day['support'] = rnd.choice(['D', ''])
+    return shift, roster.staff + ['support']
+
+
+def best_of(repeat, run):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        value = run()
+        times.append(time.perf_counter() - t0)
+    return min(times), value
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--days', type=int, nargs='+', default=[31, 365, 3650, 36500])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'days':>5} {'loop s':>8} {'array s':>8} {'speedup':>8} {'encode s':>8} {'metrics s':>9} {'Schedule s':>10}")
+    for days_count in args.days:
+        shift, persons = random_schedule(days_count)
+        staff = persons[:-1]
+        prev = {p: 0 for p in staff}
+        t_loop, _ = best_of(args.repeat, lambda: baseline.get_stats(shift, days_count, persons, prev, prev, prev))
+        t_array, _ = best_of(args.repeat, lambda: get_stats(shift, days_count, persons, prev, prev, prev))
+        t_encode, kinds = best_of(args.repeat, lambda: kind_array(shift, days_count, staff))
+        t_metrics, _ = best_of(args.repeat, lambda: kind_stats(kinds))
+        schedule = Schedule.from_dict(shift, days_count, persons)
+        t_schedule, _ = best_of(args.repeat, lambda: get_stats(schedule, days_count, persons, prev, prev, prev))
+        print(f"{days_count:>5} {t_loop:>8.4f} {t_array:>8.4f} {t_loop / t_array:>8.1f} "
+              f"{t_encode:>8.4f} {t_metrics:>9.4f} {t_schedule:>10.4f}")
+
+
+if __name__ == '__main__':
+    main()
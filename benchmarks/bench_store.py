@@ -0,0 +1,61 @@
+"""Solve vs. answer from the solution store, as another worker process would see it.
+
+    python -m benchmarks.bench_store [--months 1 3 12] [--staff 3 20]
+
+'solve' is the cold solve(profile=True) that also writes the store;
+'hit' reads the result back through a fresh SolutionStore with the
+in-process cache cleared, and the schedule and profile must come back
+unchanged; 'row bytes' is what the store keeps for it (codes, problem,
+stats, profile).
+
+One run on a single core:
+
+       scenario   solve s    hit ms  row bytes
+      1 m,  3 p      0.09       3.5       4264
+      3 m,  3 p      0.30       2.1       5074
+     12 m,  3 p      7.30       1.7       8727
+      1 m, 20 p      3.31       1.3      14515
+      3 m, 20 p      3.25       1.7      16687
+     12 m, 20 p     59.87       4.2      26034
+
+A hit costs a few milliseconds whatever the size of the problem.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.scenarios import make_problem, make_team_problem
+from shiftbuilder import SolutionStore, set_store, solve
+from shiftbuilder.solver import cached, clear_cache
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--months', type=int, nargs='+', default=[1, 3, 12])
+    parser.add_argument('--staff', type=int, nargs='+', default=[3, 20])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'shifts.db')
+        print(f"{'scenario':>15} {'solve s':>9} {'hit ms':>9} {'row bytes':>10}")
+        for staff in args.staff:
+            for months in args.months:
+                problem = make_problem(months) if staff == 3 else make_team_problem(staff, months=months)
+                set_store(path)
+                result = solve(problem, profile=True)
+                key = problem.key()
+                clear_cache()
+                set_store(SolutionStore(path))  # as opened by another worker
+                t0 = time.perf_counter()
+                hit = cached(key)
+                hit_ms = (time.perf_counter() - t0) * 1000
+                assert hit is not None and hit.shift == result.shift and hit.profile == result.profile
+                size = SolutionStore(path).size
+                print(f"{f'{months:>2} m, {staff:>2} p':>15} {result.solve_time:>9.2f} {hit_ms:>9.1f} {size:>10}")
+                SolutionStore(path).clear()
+        set_store(None)
+
+
+if __name__ == '__main__':
+    main()
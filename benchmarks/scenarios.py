@@ -0,0 +1,129 @@
+"""Generated ShiftProblem instances for the benchmark scripts.
+
+The per-month numbers of the default 新宿店 scenario (9 offs, 8-13 early/late,
+2-4 mid, 8 support 'D' days per ~31 days) are scaled to the horizon.
+make_team_problem() builds a floor of n staff with the same per-person rules.
+"""
+import math
+import random
+from datetime import date, timedelta
+
+from shiftbuilder import Person, Roster, ShiftProblem
+from shiftbuilder.problem import PERSON_FIELDS
+
+
+def scaled(value, days_count):
+    return int(round(value * days_count / 31))
+
+
+def make_problem(months=1, start=date(2025, 8, 16), seed=0, must_off_per_month=1, cheer_weeks=2, campaign_every=2):
+    rnd = random.Random(seed)
+    end = start + timedelta(days=round(months * 30.5) - 1)
+    days_count = (end - start).days + 1
+    days = [start + timedelta(days=i) for i in range(days_count)]
+    saturdays = [d for d in days if d.weekday() == 5]
+    weekends = [d for d in days if d.weekday() >= 5]
+    # 応援: weekends of cheer_weeks weeks out of three, 'D' on all but two of them
+    cheer_days = [d for d in weekends if ((d - start).days // 7) % 3 < cheer_weeks]
+    support_d = max(len(cheer_days) - 2, 0)
+    # 必須休み: mid-week days away from the 応援 weekends
+    quiet = [d for d in days if d.weekday() in (1, 2, 3)]
+    # at most one person off per day, two staff are needed on non-応援 days
+    picks = rnd.sample(quiet, min(len(quiet), 3 * must_off_per_month * months))
+    must_off = {p: sorted(picks[i::3]) for i, p in enumerate(['ono', 'miya', 'hiro'])}
+    return ShiftProblem(
+        start=start,
+        end=end,
+        rest_days={p: scaled(9, days_count) for p in ['ono', 'miya', 'hiro']},
+        onekin_max={'ono': scaled(1, days_count), 'miya': scaled(2, days_count), 'hiro': scaled(2, days_count)},
+        must_off=must_off,
+        cheer_days=cheer_days,
+        campaign_days=saturdays[::campaign_every],
+        three_person_priority=weekends,
+        early_min=scaled(8, days_count), early_max=scaled(13, days_count),
+        late_min=scaled(8, days_count), late_max=scaled(13, days_count),
+        mid_min=scaled(2, days_count), mid_max=scaled(4, days_count),
+        support_d_days=support_d,
+    )
+
+
+def default_problem(**changes):
+    """The app's default inputs: 新宿店, 2025-08-16 to 2025-09-15."""
+    args = dict(
+        start='2025-08-16',
+        end='2025-09-15',
+        must_off={'ono': ['2025-08-31', '2025-09-15'], 'miya': ['2025-08-17', '2025-09-07'], 'hiro': ['2025-08-20']},
+        cheer_days=['2025-08-16', '2025-08-17', '2025-08-23', '2025-08-24', '2025-09-05', '2025-09-06',
+                    '2025-09-07', '2025-09-10', '2025-09-13', '2025-09-14'],
+        campaign_days=['2025-08-16', '2025-08-23', '2025-09-06', '2025-09-13'],
+        three_person_priority=['2025-08-16', '2025-08-17', '2025-08-23', '2025-08-24', '2025-09-06',
+                               '2025-09-07', '2025-09-13', '2025-09-14', '2025-09-15'],
+        holidays=['2025-09-15'],
+    )
+    args.update(changes)
+    return ShiftProblem(**args)
+
+
+def make_roster(n, seed=0):
+    """n staff: every fifth one early/late only (like 小野), the rest A/C/E/F; coverage scaled to n."""
+    rnd = random.Random(seed)
+    persons = []
+    for i in range(n):
+        if i % 5 == 0:
+            persons.append(Person(f"s{i:03d}", shifts=['As', 'E', 'F', 'off'], mid_min=0, mid_max=0,
+                                  onekin_max=1, mix_late=False))
+        else:
+            persons.append(Person(f"s{i:03d}", shifts=['A', 'C', 'E', 'F', 'off'], onekin_max=rnd.choice([1, 2])))
+    return Roster(
+        persons=persons,
+        early=(round(0.25 * n), round(0.45 * n)),
+        late=(round(0.25 * n), round(0.45 * n)),
+        mid=(0, n),
+        workers=(round(0.6 * n), round(0.8 * n)),
+    )
+
+
+def make_team_problem(n, start=date(2025, 8, 16), seed=0, months=1, must_off_per_month=1):
+    """31 days per month for a floor of n staff; each person gets mid-week must-off days."""
+    rnd = random.Random(seed)
+    roster = make_roster(n, seed)
+    days = [start + timedelta(days=i) for i in range(31 * months)]
+    quiet = [d for d in days if d.weekday() in (1, 2, 3)]
+    # the roster's per-person totals are per month
+    totals = {name: {p: scaled(getattr(roster[p], name), len(days)) for p in roster.staff} for name in PERSON_FIELDS}
+    return ShiftProblem(
+        **totals,
+        start=start,
+        end=days[-1],
+        roster=roster,
+        must_off={p: [rnd.choice(quiet) for _ in range(must_off_per_month * months)] for p in roster.staff},
+        three_person_priority=[d for d in days if d.weekday() >= 5],
+    )
+
+
+# Constraint density of the 新宿店 scenario: 応援 weeks out of three, every n-th Saturday a
+# キャンペーン day, must-off days per person and month (two per month make it infeasible).
+DENSITY = {
+    'low': dict(cheer_weeks=1, campaign_every=4, must_off_per_month=0),
+    'normal': dict(cheer_weeks=2, campaign_every=2, must_off_per_month=1),
+    'high': dict(cheer_weeks=2, campaign_every=1, must_off_per_month=1),
+}
+# The team roster has no 応援 or キャンペーン persons; density only sets its must-off days.
+TEAM_MUST_OFF = {'low': 0, 'normal': 1, 'high': 2}
+
+
+def make_scenario(months=1, staff=None, density='normal', seed=0):
+    """make_problem() for the 新宿店 roster (staff=None), else make_team_problem() for n staff."""
+    if staff is None:
+        return make_problem(months, seed=seed, **DENSITY[density])
+    return make_team_problem(staff, seed=seed, months=months, must_off_per_month=TEAM_MUST_OFF[density])
+
+
+def make_sites(n, share=0.6):
+    """n 新宿店-like sites (must-off days, offs and 'D' days vary) and a pool that covers
+    share of them with a 'D' on 応援 Sundays; other days are unlimited."""
+    variants = [dict(must_off={}), dict(support_d_days=7, rest_days=10), dict(support_d_days=6, rest_days=10),
+                dict(support_d_days=6, rest_days=10, must_off={})]
+    sites = {f"site{i:02d}": default_problem(**variants[i % len(variants)]) for i in range(n)}
+    sundays = [d for d in next(iter(sites.values())).cheer_days if d.weekday() == 6]
+    return sites, {d: math.ceil(share * n) for d in sundays}
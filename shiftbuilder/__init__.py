@@ -0,0 +1,58 @@
+"""The public names of the submodules, each imported on first use.
+
+`import shiftbuilder` loads none of the submodules, so a command or a
+worker process only pays for the solvers and libraries it touches
+(the job queue's multiprocessing, OR-Tools, fpdf2, ...).
+"""
+import importlib
+import sys
+import types
+
+_EXPORTS = {
+    'alternatives': ['alternatives', 'compare_alternatives'],
+    'anytime': ['Progress', 'SolveJob'],
+    'chain': ['carry_over', 'carry_over_stored', 'read_shift_csv', 'solve_chain', 'split_periods', 'trailing_state'],
+    'diagnose': ['Conflict', 'Diagnosis', 'diagnose'],
+    'exports': ['DOWNLOADS', 'cached_export', 'clear_exports', 'export'],
+    'incremental': ['edited_days', 'resolve'],
+    'jobs': ['JobQueue', 'Ticket', 'default_queue'],
+    'model': ['MatrixModel', 'build_matrix'],
+    'pdf': ['pdf_available', 'write_pdf'],
+    'problem': ['PERSONS', 'SHIFTS', 'STAFF', 'ShiftProblem', 'parse_dates'],
+    'profile': ['Profile'],
+    'rolling': ['solve_rolling'],
+    'roster': ['SHIFT_KINDS', 'Person', 'Roster', 'default_roster', 'load_roster'],
+    'schedule': ['CODES', 'Schedule'],
+    'sites': ['SitesResult', 'solve_sites'],
+    'soft': ['SoftSession', 'solve_soft'],
+    'solver': ['ShiftResult', 'clear_cache', 'solve'],
+    'stats': ['get_stats'],
+    'store': ['SolutionStore', 'default_store', 'set_store'],
+    'tables': ['shift_rows', 'stats_rows'],
+}
+_MODULES = {name: module for module, names in _EXPORTS.items() for name in names}
+__all__ = sorted(_MODULES)
+
+
+def __getattr__(name):
+    module = _MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_MODULES))
+
+
+class _Package(types.ModuleType):
+    def __setattr__(self, name, value):
+        # Importing a submodule sets it on the package: shiftbuilder.alternatives and
+        # shiftbuilder.diagnose stay the functions of the same name.
+        if not (isinstance(value, types.ModuleType) and name in _MODULES):
+            super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
@@ -0,0 +1,148 @@
+"""Command line entry point, no Streamlit needed.
+
+    python -m shiftbuilder solve --config scenario.json --out shift.csv [--stats stats.csv] [--pdf shift.pdf]
+                                 [--profile] [--store shifts.db] [--previous august.csv] [--months 1]
+                                 [--soft mid=2 one_kin]
+    python -m shiftbuilder batch scenarios.json --workers 4 --out compare.csv
+    python -m shiftbuilder sites sites.json --workers 4 --out shifts.csv
+
+scenario.json holds ShiftProblem fields ("roster" may be a roster file
+path relative to the JSON file); see examples/scenario.json.  The CSVs are
+the same shift and stats tables the app offers for download.  With a
+solution store (--store or $SHIFTBUILDER_STORE, see shiftbuilder.store) a
+scenario solved before is read back instead of solved, and a new period
+is warm-started from the stored one before it.  --previous takes the
+state of the day before the start (prev_shift, prev_consec_*) from the
+previous period's shift CSV or the store; --months solves the period as
+consecutive periods of that many months, each carrying over the last
+(see shiftbuilder.chain).  --soft adds to the scenario's "soft" weights:
+those rules may be broken at that cost (see shiftbuilder.soft).  Exit code 0: schedule written, 1: no schedule
+(the conflicting rules go to stderr).
+"""
+import argparse
+import dataclasses
+import json
+import logging
+import os
+import sys
+
+from .chain import carry_over, carry_over_stored, read_shift_csv, solve_chain, split_periods
+from .diagnose import diagnose
+from .pdf import write_pdf
+from .problem import ShiftProblem
+from .rolling import solve_rolling
+from .solver import available_backends, solve
+from .store import default_store, set_store
+from .tables import shift_rows, stats_rows, to_csv
+
+
+def _write(text, path):
+    if path in (None, '-'):
+        sys.stdout.write(text)
+    else:
+        with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+            f.write(text)
+
+
+def _weight(item):
+    rule, _, weight = item.partition('=')
+    try:
+        return rule, float(weight or 1)
+    except ValueError:
+        raise SystemExit(f"--soft {item}: 重みが数値ではありません。") from None
+
+
+def solve_command(args):
+    with open(args.config, encoding='utf-8') as f:
+        problem = ShiftProblem.from_dict(json.load(f), os.path.dirname(args.config))
+    if args.soft:
+        problem = dataclasses.replace(problem, soft={**problem.soft, **dict(_weight(item) for item in args.soft)})
+    if args.store:
+        set_store(args.store)
+    store = default_store()
+    kwargs = dict(backend=args.backend, time_limit=args.time_limit, gap=args.gap, use_cache=store is not None,
+                  profile=args.profile)
+    if args.profile:
+        logging.basicConfig(stream=sys.stderr, format='%(message)s')
+        logging.getLogger('shiftbuilder.profile').setLevel(logging.INFO)
+    if args.previous == 'store':
+        problem = carry_over_stored(problem)
+    elif args.previous:
+        problem = carry_over(problem, read_shift_csv(args.previous, problem.roster, problem.start))
+    if args.months:
+        periods = solve_chain(split_periods(problem, args.months), **kwargs)
+    elif args.rolling:
+        periods = [(problem, solve_rolling(problem, **kwargs))]
+    else:
+        periods = [(problem, solve(problem, warm_start=store.seed(problem) if store is not None else None, **kwargs))]
+    problem, result = periods[-1]
+    if not result.optimal:
+        print(f"シフト作成不可 ({result.status}, {problem.start}-{problem.end})", file=sys.stderr)
+        for conflict in diagnose(problem, backend=args.backend).conflicts:
+            print(f"- {conflict.description}", file=sys.stderr)
+        return 1
+
+    _write(to_csv([row for p, r in periods for row in shift_rows(p, r)]), args.out)
+    if len(periods) == 1:
+        stats = to_csv(stats_rows(problem, result))
+    else:
+        stats = to_csv([{'期間': f"{p.start}-{p.end}", **row} for p, r in periods for row in stats_rows(p, r)])
+    if args.stats:
+        _write(stats, args.stats)
+    elif args.out in (None, '-'):
+        _write('\n' + stats, None)
+    else:
+        _write(stats, os.path.splitext(args.out)[0] + '_stats.csv')
+    if args.pdf:
+        for p, r in periods:
+            # one file per period: shift_2025-08-16.pdf, ...
+            path = args.pdf if len(periods) == 1 else f"{os.path.splitext(args.pdf)[0]}_{p.start}.pdf"
+            with open(path, 'wb') as f:
+                write_pdf(p, r, f, with_stats=True)
+    solve_time = sum(r.solve_time for _, r in periods)
+    print(f"{result.status}: objective {sum(r.objective for _, r in periods)}, {len(periods)} period(s), "
+          f"{solve_time:.2f}s", file=sys.stderr)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m shiftbuilder')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    p = commands.add_parser('solve', help="1つの条件でシフトを作成")
+    p.add_argument('--config', required=True, help="scenario JSON")
+    p.add_argument('--out', help="shift table CSV (default: stdout)")
+    p.add_argument('--stats', help="stats CSV (default: <out>_stats.csv, or stdout after the shift table)")
+    p.add_argument('--pdf', help="shift + stats PDF (needs fpdf2)")
+    p.add_argument('--backend', default='cbc', choices=available_backends())
+    p.add_argument('--time-limit', type=int, default=300)
+    p.add_argument('--gap', type=float, default=None, help="stop at this relative gap, e.g. 0.01")
+    p.add_argument('--rolling', action='store_true', help="14日確定 + 7日先読みで順に作成")
+    p.add_argument('--months', type=int, default=None,
+                   help="split into periods of this many months, each starting from the one before (連続期間)")
+    p.add_argument('--previous',
+                   help="shift CSV of the period before the start, or 'store': read the prev_* inputs from it")
+    p.add_argument('--profile', action='store_true',
+                   help="rule group sizes/build times and solver statistics to stderr, one JSON line per solve")
+    p.add_argument('--soft', nargs='+', metavar='RULE[=WEIGHT]',
+                   help="rules allowed to be violated at this cost per unit (default 1), e.g. mid=2 one_kin")
+    p.add_argument('--store', help="solution store file (default: $SHIFTBUILDER_STORE)")
+
+    commands.add_parser('batch', help="複数シナリオを並列に計算 (python -m shiftbuilder batch -h)", add_help=False)
+    commands.add_parser('sites', help="複数店舗を共有応援枠で計算 (python -m shiftbuilder sites -h)", add_help=False)
+
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ['batch']:
+        from .batch import main as batch_main
+
+        return batch_main(argv[1:])
+    if argv[:1] == ['sites']:
+        from .sites import main as sites_main
+
+        return sites_main(argv[1:])
+    args = parser.parse_args(argv)
+    return solve_command(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
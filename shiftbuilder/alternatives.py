@@ -0,0 +1,146 @@
+"""Several schedules with the same optimal objective, for the manager to choose from.
+
+    results = alternatives(problem, k=3, min_distance=10)
+    table = compare_alternatives(problem, results)      # get_stats side by side
+
+The model is built and handed to the solver once.  After the optimal
+schedule, the objective is held at its value by one extra row, and every
+schedule found adds a no-good row: the next one must differ from it in at
+least min_distance person-days (Hamming distance over the shift cells).
+The solver keeps its model between the runs and only gets the new rows --
+CBC the LpProblem, HiGHS the Highs instance, CP-SAT the CpModel.
+"""
+import dataclasses
+import time
+
+import numpy as np
+import pulp as lp
+
+from .batch import compare
+from .model import build_matrix, shift_values
+from .solver import cbc_result, cpsat_result, highs_model, highs_result, to_pulp
+
+
+class _Cbc:
+    def __init__(self, problem, m):
+        self.problem, self.m = problem, m
+        self.prob, self.cols = to_pulp(m, "Alternatives")
+
+    def add_row(self, name, cols, coefs, lo, hi):
+        expr = lp.LpAffineExpression([(self.cols[j], v) for j, v in zip(cols.tolist(), coefs.tolist())])
+        if np.isfinite(lo):
+            self.prob.addConstraint(lp.LpConstraint(expr, lp.LpConstraintGE, name + '_lo', lo))
+        if np.isfinite(hi):
+            self.prob.addConstraint(lp.LpConstraint(expr, lp.LpConstraintLE, name + '_hi', hi))
+
+    def solve(self, time_limit):
+        t0 = time.perf_counter()
+        status = self.prob.solve(lp.PULP_CBC_CMD(msg=0, timeLimit=time_limit))
+        return cbc_result(self.problem, self.m, self.prob, self.cols, status, time.perf_counter() - t0)
+
+
+class _Highs:
+    def __init__(self, problem, m):
+        self.problem, self.m = problem, m
+        self.h = highs_model(m)
+
+    def add_row(self, name, cols, coefs, lo, hi):
+        import highspy
+
+        self.h.addRow(lo if np.isfinite(lo) else -highspy.kHighsInf, hi if np.isfinite(hi) else highspy.kHighsInf,
+                      len(cols), cols.astype(np.int32), coefs.astype(float))
+
+    def solve(self, time_limit):
+        self.h.setOptionValue('time_limit', float(time_limit))
+        t0 = time.perf_counter()
+        self.h.run()
+        return highs_result(self.problem, self.m, self.h, time.perf_counter() - t0)
+
+
+class _Cpsat:
+    def __init__(self, problem, m, automata=True):
+        from .cpsat import cpsat_model
+
+        self.problem, self.m = problem, m
+        self.model, self.var = cpsat_model(problem, m, automata=automata)
+
+    def add_row(self, name, cols, coefs, lo, hi):
+        from .cpsat import load_cp_model
+
+        cp_model = load_cp_model()
+
+        # CP-SAT rows take integers: fractional costs (soft weights, site prices) are scaled up
+        scale = _integer_scale(coefs)
+        expr = cp_model.LinearExpr.weighted_sum(
+            [self.model.get_int_var_from_proto_index(int(self.var[j])) for j in cols.tolist()],
+            np.round(coefs * scale).astype(np.int64).tolist())
+        if np.isfinite(lo):
+            self.model.add(expr >= int(np.ceil(lo * scale)))
+        if np.isfinite(hi):
+            self.model.add(expr <= int(np.floor(hi * scale)))
+
+    def solve(self, time_limit):
+        from .cpsat import load_cp_model
+
+        cp_model = load_cp_model()
+
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = float(time_limit)
+        t0 = time.perf_counter()
+        status = solver.solve(self.model)
+        return cpsat_result(self.problem, self.m, solver, status, self.var, time.perf_counter() - t0)
+
+
+def _integer_scale(coefs, limit=10 ** 5):
+    """Smallest power of ten that makes coefs integer; ValueError beyond limit."""
+    scale = 1
+    while not np.allclose(coefs * scale, np.round(coefs * scale), rtol=0, atol=1e-9):
+        scale *= 10
+        if scale > limit:
+            raise ValueError("CP-SAT needs integer coefficients")
+    return scale
+
+
+SESSIONS = {'cbc': _Cbc, 'highs': _Highs, 'cpsat': _Cpsat,
+            'cpsat_rows': lambda problem, m: _Cpsat(problem, m, automata=False)}
+
+
+def alternatives(problem, k=3, min_distance=None, backend='cbc', time_limit=300, first=None):
+    """Up to k schedules with the optimal objective, pairwise min_distance person-days apart.
+
+    min_distance defaults to the number of days.  first is a proven optimal
+    ShiftResult of problem that is taken as the first schedule instead of
+    solving for it (one that is not proven is solved again).  Fewer than k
+    results: no other schedule keeps the objective at that distance (or a
+    run hit the time limit).
+    """
+    if min_distance is None:
+        min_distance = problem.days_count
+    m = build_matrix(problem)
+    session = SESSIONS[backend](problem, m)
+    if first is None or not first.proven:
+        first = session.solve(time_limit)
+        if not first.optimal:
+            return []
+    # a copy: first may be the caller's (cached) result
+    results = [dataclasses.replace(first, key=problem.key())]
+    cost = m.cost()
+    objective = np.flatnonzero(cost)
+    best = results[0].objective
+    session.add_row('optimal', objective, cost[objective],
+                    best - 1e-6 if m.sense < 0 else -np.inf, best + 1e-6 if m.sense > 0 else np.inf)
+    while len(results) < k:
+        cols, values = shift_values(m, problem, results[-1].by_date())
+        chosen = cols[values == 1]
+        session.add_row(f'distance_{len(results)}', chosen, np.ones(len(chosen)), -np.inf, len(chosen) - min_distance)
+        result = session.solve(time_limit)
+        if not result.optimal:
+            break
+        result.key = problem.key()
+        results.append(result)
+    return results
+
+
+def compare_alternatives(problem, results):
+    """get_stats table of the alternatives side by side, 'シナリオ' 案1, 案2, ..."""
+    return compare([(f"案{i + 1}", problem) for i in range(len(results))], results)
@@ -0,0 +1,262 @@
+"""Solve in the background with progress reports and early stop.
+
+    job = SolveJob(problem, backend='highs', time_limit=300, gap=0.01).start()
+    while job.running:
+        print(job.latest)          # incumbent objective, bound, gap
+        ...                        # job.stop(): keep the best schedule so far
+    result = job.wait()            # job.cancel(): give up, result.status 'Cancelled'
+
+HiGHS reports through its callbacks and is interrupted from them; CBC runs
+as its own process whose log is read line by line and which is stopped
+with SIGINT, after which it still writes its best solution.  CP-SAT reports
+every improving solution and is stopped with stop_search().
+"""
+import os
+import re
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pulp as lp
+
+from .model import build_matrix
+from .profile import Profile
+from .solver import (ShiftResult, cpsat_result, decode, finish_profile, highs_model, highs_result, remember, to_pulp,
+                     watch_cpsat, watch_highs)
+
+
+@dataclass
+class Progress:
+    elapsed: float
+    objective: float = None  # best schedule so far
+    bound: float = None  # best possible objective
+
+    @property
+    def gap(self):
+        if self.objective is None or self.bound is None:
+            return None
+        return abs(self.bound - self.objective) / max(abs(self.objective), 1.0)
+
+
+class SolveJob:
+    """One solve() run in a daemon thread; see the module docstring."""
+
+    def __init__(self, problem, backend='cbc', time_limit=300, gap=None, profile=False, threads=None):
+        self.problem = problem
+        self.backend = backend
+        self.time_limit = time_limit
+        self.gap = gap
+        self.profile = profile
+        self.threads = threads  # solver threads, None: the solver's default (CP-SAT and HiGHS use all cores)
+        self.probe = None
+        self.progress = []
+        self.result = None
+        self.error = None
+        self._stop = threading.Event()
+        self._cancelled = False
+        self._thread = None
+        self._t0 = None
+
+    def start(self):
+        self._t0 = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def latest(self):
+        return self.progress[-1] if self.progress else Progress(self.elapsed)
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self._t0 if self._t0 is not None else 0.0
+
+    def stop(self):
+        """Finish now with the best schedule found so far."""
+        self._stop.set()
+
+    def cancel(self):
+        """Finish now and discard the schedule."""
+        self._cancelled = True
+        self._stop.set()
+
+    def wait(self, timeout=None):
+        self._thread.join(timeout)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def _report(self, objective=None, bound=None):
+        last = self.latest
+        objective = last.objective if objective is None else objective
+        bound = last.bound if bound is None else bound
+        if (objective, bound) != (last.objective, last.bound):
+            self.progress.append(Progress(self.elapsed, objective, bound))
+
+    def _run(self):
+        try:
+            t0 = time.perf_counter()
+            m = build_matrix(self.problem)
+            if self.profile:
+                self.probe = Profile(self.backend, build_time=time.perf_counter() - t0)
+            result = RUNNERS[self.backend](self, m)
+            result.key = self.problem.key()
+            if self.probe is not None:
+                finish_profile(self.probe, m, result)
+            if self._cancelled:
+                result = ShiftResult(status='Cancelled', days=self.problem.days, solve_time=result.solve_time,
+                                     key=result.key, profile=result.profile)
+            elif not self._stop.is_set():
+                remember(result, self.backend, self.problem)
+            self.result = result
+        except Exception as e:
+            self.error = e
+
+
+def _run_highs(job, m):
+    import highspy
+
+    h = highs_model(m)
+    h.setOptionValue('time_limit', float(job.time_limit))
+    if job.gap is not None:
+        h.setOptionValue('mip_rel_gap', float(job.gap))
+    if job.threads is not None:
+        h.setOptionValue('threads', int(job.threads))
+    kind = highspy.cb.HighsCallbackType
+
+    def callback(callback_type, out, data_in):
+        if job.probe is not None:
+            job.probe.observe_highs(callback_type, out)
+        if callback_type == kind.kCallbackMipImprovingSolution:
+            job._report(out.objective_function_value)
+        elif callback_type == kind.kCallbackMipInterrupt:
+            if np.isfinite(out.mip_dual_bound):
+                job._report(bound=out.mip_dual_bound)
+            if job._stop.is_set():
+                data_in.user_interrupt = True
+
+    watch_highs(h, callback)
+    t0 = time.perf_counter()
+    h.run()
+    if job.probe is not None:
+        job.probe.read_highs(h)
+    return highs_result(job.problem, m, h, time.perf_counter() - t0, job.gap)
+
+
+# CBC log lines, objective in CBC's minimization sense
+_CBC_SOLUTION = re.compile(r'(?:Integer solution of|Solution found of|best objective) (-?[\d.e+]+)')
+_CBC_BOUND = re.compile(r'best possible (-?[\d.e+]+)')
+
+
+def _run_cbc(job, m):
+    prob, cols = to_pulp(m)
+    cmd = lp.PULP_CBC_CMD()
+    sign = -1 if m.sense < 0 else 1
+    with tempfile.TemporaryDirectory() as tmp:
+        mps, sol = os.path.join(tmp, 'shift.mps'), os.path.join(tmp, 'shift.sol')
+        vs, names, _, _ = prob.writeMPS(mps, rename=1)
+        args = [cmd.path, mps] + (['-max'] if m.sense < 0 else []) + ['-sec', str(job.time_limit)]
+        if job.gap is not None:
+            args += ['-ratio', str(job.gap)]
+        if job.threads is not None:
+            args += ['-threads', str(job.threads)]
+        args += ['-solve', '-printingOptions', 'all', '-solution', sol]
+        t0 = time.perf_counter()
+        proc = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL,
+                                text=True)
+
+        log = []
+
+        def read_log():
+            for line in proc.stdout:
+                log.append(line)
+                found, bound = _CBC_SOLUTION.search(line), _CBC_BOUND.search(line)
+                job._report(sign * float(found.group(1)) if found else None,
+                            sign * float(bound.group(1)) if bound else None)
+
+        reader = threading.Thread(target=read_log, daemon=True)
+        reader.start()
+        while proc.poll() is None:
+            if job._stop.wait(0.2):
+                # CBC stops gracefully on Ctrl-C and still writes its incumbent
+                if os.name == 'nt':
+                    proc.terminate()
+                else:
+                    proc.send_signal(signal.SIGINT)
+                proc.wait()
+        reader.join()
+        if job.probe is not None:
+            job.probe.read_cbc(log, sign)
+        result = ShiftResult(status='Not Solved', days=job.problem.days, solve_time=time.perf_counter() - t0)
+        if not os.path.exists(sol):
+            return result
+        status, sol_status = cmd.get_status(sol)
+        values = np.zeros(m.num_cols)
+        column = {names[v.name]: j for j, v in enumerate(cols)}
+        with open(sol) as f:
+            next(f)
+            for line in f:
+                parts = line.replace('**', '').split()
+                if len(parts) >= 3 and parts[1] in column:
+                    values[column[parts[1]]] = float(parts[2])
+    result.proven = (sol_status == lp.LpSolutionInfeasible
+                     or sol_status == lp.LpSolutionOptimal and not job.gap and not job._stop.is_set())
+    if sol_status in (lp.LpSolutionOptimal, lp.LpSolutionIntegerFeasible):
+        result.status = 'Optimal'
+        result.shift = decode(m, values)
+        result.objective = float(m.cost() @ values)
+    else:
+        result.status = lp.LpStatus[status]
+    return result
+
+
+def _run_cpsat(job, m, automata=True):
+    from .cpsat import cpsat_model, load_cp_model
+
+    cp_model = load_cp_model()
+
+    model, var = cpsat_model(job.problem, m, automata=automata)
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = float(job.time_limit)
+    if job.gap is not None:
+        solver.parameters.relative_gap_limit = float(job.gap)
+    if job.threads is not None:
+        solver.parameters.num_workers = int(job.threads)
+
+    def callback(solution):
+        if job.probe is not None:
+            job.probe.observe_cpsat(solution)
+        job._report(solution.objective_value, solution.best_objective_bound)
+
+    finished = threading.Event()
+
+    def stopper():
+        # ends with the solve, so that a long-lived worker does not collect waiting threads
+        while not finished.is_set():
+            if job._stop.wait(0.2):
+                solver.stop_search()
+                return
+
+    threading.Thread(target=stopper, daemon=True).start()
+    t0 = time.perf_counter()
+    try:
+        status = solver.solve(model, watch_cpsat(callback))
+    finally:
+        finished.set()
+    if job.probe is not None:
+        job.probe.read_cpsat(solver)
+    result = cpsat_result(job.problem, m, solver, status, var, time.perf_counter() - t0, job.gap)
+    result.proven = result.proven and not job._stop.is_set()
+    return result
+
+
+RUNNERS = {'cbc': _run_cbc, 'highs': _run_highs, 'cpsat': _run_cpsat,
+           'cpsat_rows': lambda job, m: _run_cpsat(job, m, automata=False)}
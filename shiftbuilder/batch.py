@@ -0,0 +1,126 @@
+"""Solve several variants of one problem side by side.
+
+    python -m shiftbuilder batch scenarios.json [--workers 4] [--out compare.csv]
+
+scenarios.json holds the common inputs and one entry per variant, each with
+a name and the ShiftProblem fields it changes:
+
+    {"base": {"start": "2025-08-16", "end": "2025-09-15", "rest_days": 9, ...},
+     "scenarios": [{"name": "休日9"}, {"name": "休日10", "rest_days": 10},
+                   {"name": "早番広め", "early_min": 6, "early_max": 15}]}
+
+"roster" may be a roster dict or the path of a roster CSV/JSON file.
+"""
+import argparse
+import dataclasses
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from .problem import ShiftProblem
+from .solver import available_backends, cached, remember, solve
+from .store import set_store
+from .stats import get_stats
+
+
+def scenario_problems(base, scenarios):
+    """[(name, ShiftProblem)] for base with every scenario's fields replaced."""
+    problems = []
+    for i, scenario in enumerate(scenarios):
+        overrides = dict(scenario)
+        name = str(overrides.pop('name', i + 1))
+        problems.append((name, dataclasses.replace(base, **overrides)))
+    return problems
+
+
+def _solve_one(problem, kwargs):
+    # Each worker runs its own solver process/instance; its cache would die with it.
+    return solve(problem, use_cache=False, **kwargs)
+
+
+def solve_batch(problems, workers=None, use_cache=True, **kwargs):
+    """Solve the problems in parallel processes, results in the same order.
+
+    workers defaults to the number of CPUs; workers=1 solves in this process.
+    Cached problems are not sent to the pool and proven results are cached.
+    kwargs go to solve() (time_limit, backend).
+    """
+    backend = kwargs.get('backend', 'cbc')
+    results = [cached(p.key(), backend) if use_cache else None for p in problems]
+    todo = [i for i, r in enumerate(results) if r is None]
+    workers = min(workers or os.cpu_count() or 1, len(todo)) if todo else 0
+    if workers == 1:
+        for i in todo:
+            results[i] = _solve_one(problems[i], kwargs)
+    elif workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {i: pool.submit(_solve_one, problems[i], kwargs) for i in todo}
+            for i, future in futures.items():
+                results[i] = future.result()
+    if use_cache:
+        for i in todo:
+            remember(results[i], backend, problems[i])
+    return results
+
+
+def compare(named_problems, results):
+    """Comparison table: one row per scenario and staff member with the get_stats metrics."""
+    import pandas as pd
+
+    rows = []
+    for (name, problem), result in zip(named_problems, results):
+        head = {'シナリオ': name, '状態': result.status, '目的関数': result.objective,
+                '計算時間': round(result.solve_time, 3)}
+        if not result.optimal:
+            rows.append(head)
+            continue
+        stats = get_stats(result.shift, problem.days_count, problem.persons,
+                          problem.prev_off, problem.prev_early, problem.prev_late)
+        for p, values in stats.items():
+            rows.append({**head, '人': p, **values})
+    table = pd.DataFrame(rows)
+    # Infeasible scenarios leave the metrics empty; keep the others integer.
+    metrics = [c for c in table.columns if c not in ('シナリオ', '状態', '目的関数', '計算時間', '人')]
+    table[metrics] = table[metrics].astype('Int64')
+    return table
+
+
+def run_batch(base, scenarios, workers=None, **kwargs):
+    """Solve every scenario of base in parallel; returns (comparison table, results)."""
+    named = scenario_problems(base, scenarios)
+    results = solve_batch([p for _, p in named], workers=workers, **kwargs)
+    return compare(named, results), results
+
+
+def load_scenarios(path):
+    """(base ShiftProblem, scenario list) from a scenarios JSON file."""
+    with open(path, encoding='utf-8') as f:
+        config = json.load(f)
+    base = ShiftProblem.from_dict(config.get('base', {}), os.path.dirname(path))
+    return base, config.get('scenarios', [{}])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m shiftbuilder batch', description="シナリオ一括計算")
+    parser.add_argument('config', help="scenarios JSON")
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: CPU count)")
+    parser.add_argument('--backend', default='cbc', choices=available_backends())
+    parser.add_argument('--time-limit', type=int, default=300)
+    parser.add_argument('--out', help="write the comparison table as CSV")
+    parser.add_argument('--store', help="solution store file (default: $SHIFTBUILDER_STORE)")
+    args = parser.parse_args(argv)
+
+    if args.store:
+        set_store(args.store)
+
+    base, scenarios = load_scenarios(args.config)
+    table, _ = run_batch(base, scenarios, workers=args.workers, backend=args.backend, time_limit=args.time_limit)
+    if args.out:
+        table.to_csv(args.out, index=False, encoding='utf-8-sig')
+    else:
+        table.to_csv(sys.stdout, index=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+"""Chained periods: the prev_* inputs of a period read from the schedule before it.
+
+    problem = carry_over(problem, previous_result, previous_problem)
+    problem = carry_over(problem, read_shift_csv('august.csv', roster, problem.start))
+    problem = carry_over_stored(problem)             # from the solution store
+    periods = solve_chain(split_periods(year_problem, months=1))   # [(ShiftProblem, ShiftResult), ...]
+
+The state is what the model needs of the day before the start: that day's
+shift and the streak of work or rest it ends.  It is read from the
+schedule codes for all persons at once; a streak that fills the whole
+previous period continues the one that period started from.  solve_chain
+plans a year as consecutive periods (12 months: 12 solves), each from the
+state the one before it left, warm-started from its last weeks.
+"""
+import csv
+import dataclasses
+from datetime import timedelta
+
+import numpy as np
+
+from .problem import to_date
+from .schedule import CODES, Schedule
+from .solver import ShiftResult, solve
+from .store import default_store, weekly_seed
+
+
+def trailing_state(schedule, persons, previous=None):
+    """{'prev_shift', 'prev_consec_work', 'prev_consec_rest'} after the last day of schedule.
+
+    previous is the ShiftProblem the schedule was solved for; its prev_*
+    streaks are added where a streak runs through the whole schedule.
+    Persons not in the schedule start fresh ('' and 0).
+    """
+    known = [p for p in persons if p in schedule.persons]
+    codes = schedule.rows(known)
+    work = codes != 0
+    changed = work != work[:, -1:]
+    n = codes.shape[1]
+    # days since the last change of work/rest, n if there is none
+    run = np.where(changed.any(axis=1), np.argmax(changed[:, ::-1], axis=1), n)
+    state = {'prev_shift': {}, 'prev_consec_work': {}, 'prev_consec_rest': {}}
+    for p, code, working, streak in zip(known, codes[:, -1].tolist(), work[:, -1].tolist(), run.tolist()):
+        if streak == n and previous is not None and p in previous.prev_shift:
+            if working and previous.prev_shift[p] != '':
+                streak += previous.prev_consec_work[p]
+            elif not working and previous.prev_shift[p] == '':
+                streak += previous.prev_consec_rest[p]
+        state['prev_shift'][p] = CODES[code]
+        state['prev_consec_work'][p] = streak if working else 0
+        state['prev_consec_rest'][p] = 0 if working else streak
+    return state
+
+
+def carry_over(problem, result, previous=None):
+    """problem with prev_* taken from result, the schedule of the days just before it.
+
+    previous is the ShiftProblem of result, if known (see trailing_state).
+    """
+    if not result.shift:
+        raise ValueError("前期間のシフトがありません。")
+    if result.days[-1] != problem.start - timedelta(days=1):
+        raise ValueError(f"前期間の最終日 {result.days[-1]} が開始日 {problem.start} の前日ではありません。")
+    return dataclasses.replace(problem, **trailing_state(result.shift, problem.staff, previous))
+
+
+def carry_over_stored(problem, store=None):
+    """carry_over() from the stored period that ends the day before problem (store.previous());
+    problem unchanged if there is none."""
+    store = store if store is not None else default_store()
+    found = store.previous(problem) if store is not None else None
+    if found is None:
+        return problem
+    previous, result = found
+    return carry_over(problem, result, previous)
+
+
+def read_shift_csv(file, roster, start):
+    """ShiftResult of a shift CSV exported by the app or CLI for the period that ends the day before start.
+
+    file is a path or a file object; the columns are 日付 ('MM/DD (Day)'),
+    one per person under the roster's names, and 人数.  Persons missing
+    from the file are left out of the schedule.
+    """
+    if hasattr(file, 'read'):
+        text = file.read()
+    else:
+        with open(file, encoding='utf-8-sig') as f:
+            text = f.read()
+    if isinstance(text, bytes):
+        text = text.decode('utf-8-sig')
+    # the shift table ends at the first blank line (the CLI may write the stats after it)
+    text = text.lstrip('\ufeff').replace('\r\n', '\n').split('\n\n', 1)[0]
+    rows = [row for row in csv.DictReader(text.splitlines()) if row.get('日付')]
+    if not rows:
+        raise ValueError("シフトCSVに日付の行がありません。")
+    last = to_date(start) - timedelta(days=1)
+    days = [last - timedelta(days=len(rows) - 1 - d) for d in range(len(rows))]
+    if rows[-1]['日付'][:5] != last.strftime('%m/%d'):
+        raise ValueError(f"シフトCSVの最終日 {rows[-1]['日付']} が開始日の前日 {last} ではありません。")
+    ids = {name: p for p, name in roster.names.items()}
+    persons = [ids[name] for name in rows[0] if name in ids]
+    index = {s: i for i, s in enumerate(CODES)}
+    try:
+        codes = np.array([[index[row[roster.names[p]] or ''] for row in rows] for p in persons], dtype=np.int8)
+    except KeyError as e:
+        raise ValueError(f"シフトCSVに不明なシフト {e.args[0]!r} があります。") from None
+    return ShiftResult(status='Optimal', shift=Schedule(codes.reshape(len(persons), len(rows)), persons), days=days)
+
+
+def add_months(day, months):
+    """The same day `months` months later, clamped to the end of the month."""
+    month = day.month - 1 + months
+    year, month = day.year + month // 12, month % 12 + 1
+    for d in range(day.day, 0, -1):
+        try:
+            return day.replace(year=year, month=month, day=d)
+        except ValueError:
+            continue
+
+
+def split_periods(problem, months=1):
+    """problem as consecutive periods of `months` months (the last one may be shorter).
+
+    Each keeps problem's inputs and only its own dates; the per-person
+    totals and support_d_days are taken as they are, i.e. per period.
+    """
+    periods = []
+    k = 0
+    while add_months(problem.start, k * months) <= problem.end:
+        start = add_months(problem.start, k * months)
+        k += 1
+        end = min(add_months(problem.start, k * months) - timedelta(days=1), problem.end)
+        periods.append(dataclasses.replace(problem, start=start, end=end))
+    return periods
+
+
+def solve_chain(problems, max_slack=2, **kwargs):
+    """Solve consecutive periods in order, each from the state the one before left.
+
+    problems are ShiftProblems each starting the day after the previous one
+    ends (e.g. split_periods()); the first keeps its own prev_*.  The
+    others get theirs from carry_over() and are warm-started with
+    weekly_seed().  A period that cannot start from the state it is left
+    is retried after solving the one before again with end_slack 1, 2, ...
+    max_slack.  Stops after the first period without a schedule.
+    Returns [(ShiftProblem as solved, ShiftResult)]; kwargs go to solve().
+    """
+    periods = []
+    for period in problems:
+        if not periods:
+            periods.append((period, solve(period, **kwargs)))
+        else:
+            periods.append(_solve_next(periods, period, max_slack, kwargs))
+        if not periods[-1][1].optimal:
+            break
+    return periods
+
+
+def _solve_next(periods, period, max_slack, kwargs):
+    """(period from the state periods[-1] leaves, its result); may replace periods[-1] with a re-solve."""
+    previous, result = periods[-1]
+    before = periods[-2][1] if len(periods) > 1 else None
+    for slack in range(previous.end_slack, max_slack + 1):
+        if slack > previous.end_slack:
+            previous = dataclasses.replace(previous, end_slack=slack)
+            warm_start = weekly_seed(previous, before) if before is not None else None
+            result = solve(previous, warm_start=warm_start, **kwargs)
+            if not result.optimal:
+                break
+            periods[-1] = (previous, result)
+        current = carry_over(period, result, previous)
+        current_result = solve(current, warm_start=weekly_seed(current, result), **kwargs)
+        if current_result.status != 'Infeasible':
+            break
+    return current, current_result
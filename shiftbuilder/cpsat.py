@@ -0,0 +1,187 @@
+"""CP-SAT model of a MatrixModel with the streak rules as one automaton per staff member.
+
+    result = solve(problem, backend='cpsat')      # needs ortools
+
+The rules about runs of days -- at most max_consec_work work days and
+max_consec_rest days off in a row, an early (and a late) shift in every 3
+consecutive work days, the 1kin count -- are checked by a small automaton
+over the shift kind of every day, started from prev_shift,
+prev_consec_work and prev_consec_rest.  It replaces their O(days x window)
+sliding-window rows and the is_1kin columns; all other rows of the
+MatrixModel are passed to CP-SAT as they are.
+
+backend='cpsat_rows' passes all rows, the sliding windows included, with
+no automaton; on the benchmark scenarios it is the faster of the two (see
+benchmarks/bench_cpsat.py).
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from .roster import SHIFT_KINDS
+
+KIND_VALUES = {'off': 0, 'early': 1, 'mid': 2, 'late': 3}
+MIX = 3  # every MIX consecutive work days need an early (and a late)
+ONEKIN = len(KIND_VALUES)  # added to the label of a day off that ends a 1kin
+
+
+def load_cp_model():
+    """ortools.sat.python.cp_model; ImportError with a hint if OR-Tools cannot be loaded."""
+    try:
+        from ortools.sat.python import cp_model
+    except ImportError as e:
+        # OR-Tools and highspy bundle HiGHS; unless their versions match (requirements.txt pins a pair
+        # that does) only the first one loaded works, and PuLP loads highspy when it is installed.
+        raise ImportError("OR-Tools (CP-SAT) を読み込めません。highspy と版が合わない可能性があります"
+                          f"（requirements.txt の版を入れてください）: {e}") from e
+    return cp_model
+
+
+def replaced(key, commit=0):
+    """True for the rows of row_keys() that the automaton checks instead.
+
+    The 'init' rows of max_work/max_rest are kept: on a period shorter than
+    the window they ask for more than the run length does.  Of the 1kin rows
+    only the links of the first `commit` days stay, for the pro-rata
+    'commit' row of a rolling block.
+    """
+    group, label, _, day = key
+    if group in ('max_work', 'max_rest'):
+        return label != 'init'
+    if group == 'mix':
+        return True
+    if group == 'one_kin':
+        return not (label == 'link' and 0 <= day < commit)
+    return False
+
+
+@lru_cache(maxsize=None)
+def streak_automaton(start, max_work, max_rest, mix_late=True):
+    """Transitions (state, label, next state) reachable from start; state 0 is start.
+
+    A state is (off, run, days since an early, days since a late, single):
+    run counts the days off or at work, single marks a work day right after
+    a day off.  The label of a day is its kind value, plus ONEKIN on the day
+    off that ends a 1kin (a single work day), so that the 1kin flags of a
+    person are fixed by the automaton and only their sum is a linear row.
+    """
+    ids = {start: 0}
+    transitions = []
+    todo = [start]
+    while todo:
+        state = todo.pop()
+        off, run, no_early, no_late, single = state
+        for value in KIND_VALUES.values():
+            if value == 0:
+                following = (True, run + 1 if off else 1, 0, 0, False)
+                if following[1] > max_rest:
+                    continue
+                label = value + ONEKIN * single
+            else:
+                following = (False, 1 if off else run + 1,
+                             0 if value == KIND_VALUES['early'] else no_early + 1,
+                             0 if value == KIND_VALUES['late'] or not mix_late else no_late + 1,
+                             off)
+                if following[1] > max_work or max(following[2], following[3]) >= MIX:
+                    continue
+                label = value
+            if following not in ids:
+                ids[following] = len(ids)
+                todo.append(following)
+            transitions.append((ids[state], label, ids[following]))
+    return transitions, len(ids)
+
+
+def start_state(prev_shift, consec_work, consec_rest, mix_late=True):
+    """Automaton state of the day before the period."""
+    kind = SHIFT_KINDS['off' if prev_shift == '' else prev_shift]
+    if kind == 'off':
+        return True, consec_rest, 0, 0, False
+    return (False, consec_work, 0 if kind == 'early' else 1,
+            0 if kind == 'late' or not mix_late else 1, False)
+
+
+def cpsat_model(problem, m, start=None, automata=True):
+    """(CpModel, CP-SAT variable index of every matrix column, -1 where unused).
+
+    automata=False keeps the streak rows instead of the automata.
+    """
+    cp_model = load_cp_model()
+
+    D = problem.days_count
+    commit = problem.commit_days if 0 < problem.commit_days < D else 0
+    keep = np.array([not (automata and replaced(key, commit)) for key in m.row_keys()], dtype=bool)
+    indptr, index, value, lo, hi = m.subset(keep).csr()
+    cost = m.cost()
+
+    used = np.zeros(m.num_cols, dtype=bool)
+    used[index] = True
+    used[np.flatnonzero(cost)] = True
+    for X in m.X.values():
+        used[X[X >= 0]] = True
+    var = np.full(m.num_cols, -1, dtype=np.int64)
+    var[used] = np.arange(np.count_nonzero(used))
+    lower, upper = m.bounds()
+
+    model = cp_model.CpModel()
+    cols = [model.new_int_var(int(lower[j]), int(upper[j]), m.col_names[j]) for j in np.flatnonzero(used).tolist()]
+
+    # Rows as linear constraints; infinite sides become the row's range over the column bounds
+    if not np.array_equal(value, np.round(value)):
+        raise ValueError("CP-SAT needs integer coefficients")
+    row_of = np.repeat(np.arange(len(lo)), np.diff(indptr))
+    reach = value * upper[index]
+    low = np.where(np.isfinite(lo), np.ceil(lo), np.bincount(row_of, np.minimum(reach, 0), len(lo)))
+    high = np.where(np.isfinite(hi), np.floor(hi), np.bincount(row_of, np.maximum(reach, 0), len(hi)))
+    proto = model.Proto()
+    indptr, index, value = indptr.tolist(), var[index].tolist(), value.astype(np.int64).tolist()
+    for r, (a, b) in enumerate(zip(low.astype(np.int64).tolist(), high.astype(np.int64).tolist())):
+        linear = proto.constraints.add().linear
+        linear.vars.extend(index[indptr[r]:indptr[r + 1]])
+        linear.coeffs.extend(value[indptr[r]:indptr[r + 1]])
+        linear.domain.extend([a, b])
+
+    objective = np.flatnonzero(cost)
+    weights = cost[objective]
+    if np.array_equal(weights, np.round(weights)):
+        weights = weights.astype(np.int64)
+    expr = cp_model.LinearExpr.weighted_sum([cols[var[j]] for j in objective.tolist()], weights.tolist())
+    if m.sense < 0:
+        model.maximize(expr)
+    else:
+        model.minimize(expr)
+
+    roster = problem.roster
+    # a soft 1kin limit keeps the slack column of its 'total' row (the 'commit' row stays a row)
+    soft_onekin = {p: j for _, key, slack, persons, _, _ in m.slack if key == ('one_kin', 'total')
+                   for j, p in zip(slack.tolist(), persons.tolist())}
+    for person in roster.persons if automata else ():
+        if person.role != 'staff':
+            continue
+        p = person.id
+        works = [s for s in person.shifts if s != 'off']
+        labels, ends = [], []
+        for d in range(D):
+            label = model.new_int_var(0, 2 * ONEKIN - 1, f"label_{d}_{p}")
+            end = model.new_bool_var(f"ends_1kin_{d}_{p}")
+            model.add(label == cp_model.LinearExpr.weighted_sum(
+                [cols[var[m.x[p][s][d]]] for s in works] + [end],
+                [KIND_VALUES[SHIFT_KINDS[s]] for s in works] + [ONEKIN]))
+            labels.append(label)
+            ends.append(end)
+        first = start_state(problem.prev_shift[p], problem.prev_consec_work[p], problem.prev_consec_rest[p],
+                            person.mix_late)
+        transitions, states = streak_automaton(first, roster.max_consec_work, roster.max_consec_rest,
+                                               person.mix_late)
+        if D:
+            model.add_automaton(labels, 0, list(range(states)), transitions)
+            if p in soft_onekin:
+                model.add(sum(ends) - cols[var[soft_onekin[p]]] <= problem.onekin_max[p])
+            else:
+                model.add(sum(ends) <= problem.onekin_max[p])
+
+    if start is not None:
+        for j, v in zip(start[0].tolist(), start[1].tolist()):
+            if var[j] >= 0:
+                model.add_hint(cols[var[j]], int(round(v)))
+    return model, var
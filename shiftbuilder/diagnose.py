@@ -0,0 +1,162 @@
+"""Explain an infeasible ShiftProblem by a minimal set of conflicting rules.
+
+Every row of the model carries (group, label, person, day).  diagnose()
+switches whole rule groups off and asks the solver for feasibility only
+(no objective, presolve usually decides in well under a second):
+
+1. deletion filter over coarse groups, e.g. "休日数 (宮村)" or "最大連続休み
+   (廣内)", dropping halves, quarters, ... before single groups;
+2. the groups left are split by day and filtered again while the other
+   groups stay on, e.g. "応援日の構成 休み (応援) 09/06, 09/07".
+
+The result is irreducible: dropping any one of the returned groups makes
+the problem feasible.
+"""
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pulp as lp
+
+from .model import build_matrix
+from .solver import highs_model, to_pulp
+
+GROUP_TITLES = {
+    'one_shift': '1日1シフト',
+    'must_off': '必須休み',
+    'total_off': '休日数',
+    'cheer': '応援日の構成',
+    'support_d': '応援D日数',
+    'late_type': '遅番の種類',
+    'daily': '1日の配置',
+    'balance': 'シフト数の範囲',
+    'commit': '確定期間の配分',
+    'max_work': '最大連続勤務',
+    'max_rest': '最大連続休み',
+    'end': '期間末の連続',
+    'mix': '3連勤の早遅混在',
+    'one_kin': '1勤',
+    'campaign': 'キャンペーン土曜',
+}
+LABEL_TITLES = {
+    'early': '早番', 'late': '遅番', 'mid': '中番', 'workers': '出勤人数', 'off': '休み', 'on': '出勤',
+    'fixed': '固定シフト', 'staff': 'スタッフ出勤', 'no_mid': '早中番なし', 'init': '前日から',
+    'init_early': '前日から早番', 'init_late': '前日から遅番', 'total': '上限', 'D': 'D', 'one_kin': '1勤',
+    'work': '勤務', 'rest': '休み',
+}
+# Rows that only define auxiliary variables or break symmetry; they cannot conflict on their own.
+DEFINITIONS = {('one_shift', None), ('one_kin', 'work'), ('one_kin', 'next_off'), ('one_kin', 'prev_off'),
+               ('one_kin', 'link'), ('campaign', 'two'), ('symmetry', 'order')}
+
+
+@dataclass
+class Conflict:
+    group: str
+    label: str = None
+    person: str = None
+    days: list = None  # dates of the conflicting rows, empty for rules over the whole period
+    description: str = ''
+
+
+@dataclass
+class Diagnosis:
+    conflicts: list
+    checks: int = 0
+    time: float = 0.0
+
+    @property
+    def infeasible(self):
+        return bool(self.conflicts)
+
+
+def is_infeasible(m, backend='cbc', time_limit=10):
+    """True only if the solver proves that m has no feasible point."""
+    if backend == 'highs':
+        import highspy
+
+        h = highs_model(m)
+        h.setOptionValue('time_limit', float(time_limit))
+        h.run()
+        return h.getModelStatus() == highspy.HighsModelStatus.kInfeasible
+    prob, _ = to_pulp(m)
+    status = prob.solve(lp.PULP_CBC_CMD(msg=0, timeLimit=time_limit))
+    return status == lp.LpStatusInfeasible
+
+
+def _deletion_filter(units, base, check):
+    """Minimal sublist of units (row masks) that is infeasible together with the base mask."""
+    def union(masks):
+        return np.logical_or.reduce([base] + [mask for _, mask in masks])
+
+    keep = list(units)
+    chunk = max(len(keep) // 2, 1)
+    while True:
+        i = 0
+        while i < len(keep):
+            trial = keep[:i] + keep[i + chunk:]
+            if check(union(trial)):
+                keep = trial
+            else:
+                i += chunk
+        if chunk == 1:
+            return keep
+        chunk = max(chunk // 2, 1)
+
+
+def describe(problem, group, label=None, person=None, days=()):
+    parts = [GROUP_TITLES.get(group, group)]
+    if label is not None:
+        parts.append(LABEL_TITLES.get(label, label))
+    if person is not None:
+        parts.append(f"({problem.roster.names.get(person, person)})")
+    if days:
+        shown = ', '.join(d.strftime('%m/%d') for d in days[:5])
+        parts.append(shown if len(days) <= 5 else f"{shown} 他{len(days) - 5}日")
+    return ' '.join(parts)
+
+
+def diagnose(problem, backend='cbc', time_limit=10):
+    """Minimal conflicting rule groups of an infeasible problem (empty if it is feasible).
+
+    time_limit bounds every single feasibility check; a check that runs out
+    of time counts as feasible, so the groups returned are always in conflict.
+    """
+    t0 = time.perf_counter()
+    m = build_matrix(problem)
+    keys = m.row_keys()
+    checks = 0
+
+    def check(mask):
+        nonlocal checks
+        checks += 1
+        return is_infeasible(m.subset(mask), backend, time_limit)
+
+    hard = np.array([(g, lab) in DEFINITIONS for g, lab, _, _ in keys], dtype=bool)
+    if not check(np.ones(len(keys), dtype=bool)):
+        return Diagnosis([], checks, time.perf_counter() - t0)
+
+    def units(key_of):
+        index = {}
+        for r, key in enumerate(keys):
+            if not hard[r]:
+                index.setdefault(key_of(key), []).append(r)
+        out = []
+        for key, rows in index.items():
+            mask = np.zeros(len(keys), dtype=bool)
+            mask[rows] = True
+            out.append((key, mask))
+        return out
+
+    coarse = _deletion_filter(units(lambda k: k[:3]), hard, check)
+    # Narrow every group down to days, the others as already narrowed
+    all_fine = units(lambda k: k)
+    narrowed = [[u for u in all_fine if u[0][:3] == key] for key, _ in coarse]
+    for i, fine in enumerate(narrowed):
+        if len(fine) > 1:
+            others = [mask for j, group in enumerate(narrowed) if j != i for _, mask in group]
+            narrowed[i] = _deletion_filter(fine, np.logical_or.reduce([hard] + others), check)
+    conflicts = []
+    for (group, label, person), fine in zip((key for key, _ in coarse), narrowed):
+        days = [problem.days[key[3]] for key, _ in fine if key[3] >= 0]
+        conflicts.append(Conflict(group, label, person, days, describe(problem, group, label, person, days)))
+    return Diagnosis(conflicts, checks, time.perf_counter() - t0)
@@ -0,0 +1,116 @@
+"""Tables and download files of a solved schedule, built on first use and cached.
+
+    data = export(problem, result, 'pdf')     # bytes, built once per schedule
+    DOWNLOADS['pdf'].file_name                # 'shift.pdf'
+
+Entries are keyed on (problem key, schedule digest, kind), so a rerun of
+the app with the same result reuses them; the least recently used ones are
+dropped beyond EXPORT_CACHE_SIZE.
+"""
+from collections import OrderedDict
+from html import escape
+from dataclasses import dataclass
+from io import BytesIO, StringIO
+
+from .pdf import write_pdf
+from .tables import shift_rows, stats_rows, to_csv
+
+EXPORT_CACHE_SIZE = 24
+_cache = OrderedDict()
+
+
+@dataclass(frozen=True)
+class Download:
+    label: str
+    file_name: str
+    mime: str
+
+
+DOWNLOADS = {
+    'shift_csv': Download("CSV", 'shift.csv', 'text/csv'),
+    'stats_csv': Download("統計CSV", 'stats.csv', 'text/csv'),
+    'pdf': Download("PDF", 'shift.pdf', 'application/pdf'),
+    'pdf_stats': Download("PDF (シフト+統計)", 'shift_stats.pdf', 'application/pdf'),
+}
+
+
+def export_key(problem, result, kind):
+    return (result.key or problem.key(), result.shift.digest(), kind)
+
+
+def cached_export(problem, result, kind):
+    """The cached table/file, or None if it has not been built yet."""
+    key = export_key(problem, result, kind)
+    data = _cache.get(key)
+    if data is not None:
+        _cache.move_to_end(key)
+    return data
+
+
+def export(problem, result, kind):
+    """Table or file `kind` (a BUILDERS key) of a solved result, cached per schedule."""
+    data = cached_export(problem, result, kind)
+    if data is None:
+        data = BUILDERS[kind](problem, result)
+        _cache[export_key(problem, result, kind)] = data
+        while len(_cache) > EXPORT_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return data
+
+
+def clear_exports():
+    _cache.clear()
+
+
+def _shift_html(problem, result):
+    persons, names = problem.persons, problem.roster.names
+    html = """
+    <style>
+    table {{
+      width: 100%;
+      table-layout: fixed;
+      border-collapse: collapse;
+      font-size: 12px;
+    }}
+    th, td {{
+      padding: 2px;
+      text-align: center;
+      border: 1px solid #ddd;
+      width: {width:.2f}%;
+    }}
+    tr {{
+      height: 15px;
+    }}
+    </style>
+    <table><tr><th>日付 (曜日)</th>{heads}<th>出勤人数</th></tr>
+    """.format(width=100 / (len(persons) + 2), heads=''.join(f"<th>{escape(names[p])}</th>" for p in persons))
+    out = StringIO()
+    out.write(html)
+    for row in shift_rows(problem, result):
+        # roster names and shifts come from uploaded files; the app renders this as raw HTML
+        cells = ''.join(f"<td>{escape(str(row[names[p]]))}</td>" for p in persons)
+        out.write(f"<tr><td>{escape(row['日付'])}</td>{cells}<td>{row['人数']}</td></tr>")
+    out.write("</table>")
+    return out.getvalue()
+
+
+def _stats_html(problem, result):
+    import pandas as pd
+
+    return pd.DataFrame(stats_rows(problem, result)).to_html(index=False)
+
+
+def _pdf(problem, result, with_stats=False):
+    out = BytesIO()
+    write_pdf(problem, result, out, with_stats)
+    return out.getvalue()
+
+
+BUILDERS = {
+    'shift_html': _shift_html,
+    'stats_html': _stats_html,
+    'shift_csv': lambda problem, result: to_csv(shift_rows(problem, result)).encode('utf-8-sig'),
+    'stats_csv': lambda problem, result: to_csv(stats_rows(problem, result)).encode('utf-8-sig'),
+    'pdf': _pdf,
+    'pdf_stats': lambda problem, result: _pdf(problem, result, with_stats=True),
+}
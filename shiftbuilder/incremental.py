@@ -0,0 +1,39 @@
+from datetime import timedelta
+
+from .solver import solve
+
+DAY_FIELDS = ('cheer_days', 'campaign_days', 'three_person_priority', 'holidays')
+
+
+def edited_days(old, new):
+    """Dates whose day-level inputs differ, or None if a period-wide input changed."""
+    a, b = old.to_dict(), new.to_dict()
+    for name in a:
+        if name not in DAY_FIELDS + ('must_off', 'start', 'end') and a[name] != b[name]:
+            return None
+    changed = set(new.days) - set(old.days)
+    for name in DAY_FIELDS:
+        changed |= set(getattr(old, name)) ^ set(getattr(new, name))
+    for p in new.staff:
+        changed |= set(old.must_off[p]) ^ set(new.must_off[p])
+    return changed
+
+
+def resolve(problem, previous_problem, previous_result, radius=7, **kwargs):
+    """Re-solve after a small edit, starting from the previous schedule.
+
+    Days more than `radius` days away from every edited date keep their
+    previous shifts, and a schedule that is the best one for the others has
+    status solver.FIXED_OPTIMAL; if that turns out infeasible the whole
+    period is solved again, still warm-started.
+    """
+    if previous_result is None or not previous_result.shift:
+        return solve(problem, **kwargs)
+    changed = edited_days(previous_problem, problem) if previous_problem is not None else None
+    if changed is not None:
+        near = {c + timedelta(days=k) for c in changed for k in range(-radius, radius + 1)}
+        fix_days = [d for d in problem.days if d not in near]
+        result = solve(problem, warm_start=previous_result, fix_days=fix_days, **kwargs)
+        if result.optimal:
+            return result
+    return solve(problem, warm_start=previous_result, **kwargs)
@@ -0,0 +1,342 @@
+"""One queue of solves for every session of a server, run by a bounded pool of processes.
+
+    queue = default_queue()                      # or JobQueue(workers=2, threads=1)
+    ticket = queue.submit(problem, backend='cbc', time_limit=300)
+    while ticket.running:
+        ticket.status, ticket.position           # 'queued' (1 = next) or 'running'
+        print(ticket.latest)                     # Progress, as SolveJob.latest
+        ...                                      # ticket.stop() / ticket.cancel() as SolveJob
+    result = ticket.wait()
+    ticket = queue.call(resolve, problem, old_problem, old_result, backend='cbc')   # any solve function
+    ticket = queue.call(solve_soft, problem, affinity=session_key(problem, 'cbc'))    # see soft.py
+
+At most `workers` solves run at a time, each as a SolveJob in a worker
+process with `threads` solver threads, so a month-end rush queues up
+instead of sharing the cores until every solve hits its time limit.  The
+others wait in submission order.  A scenario already queued or running
+(same problem key and backend) is not solved twice: its submitters share
+one job, and a stop() from any of them ends it for all; cancel() only
+gives up the caller's ticket, and the job with it once nobody waits for
+it.  Finished results are remembered (solver.remember), so with a
+solution store the other server processes see them as well.  The progress
+of the running jobs and the stop/cancel requests go through a
+multiprocessing manager.  call() queues other solve functions the same
+way (resolve, solve_rolling, alternatives, soft.solve_soft); they report
+no progress, cannot be stopped and use the solver's default threads; a
+cancelled one that already runs finishes in its worker and is discarded.
+Every worker is a process of its own, and a call with an `affinity` key
+goes to the worker that ran the last call with that key if it is free,
+so that it finds what that one kept in memory (soft.solve_soft keeps its
+models to re-weight them).
+
+default_queue() reads the pool size from $SHIFTBUILDER_WORKERS (default:
+CPU count / threads) and the threads from $SHIFTBUILDER_THREADS (1).
+"""
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from .anytime import Progress, SolveJob
+from .solver import ShiftResult, cached, remember
+from .store import set_store
+
+WORKERS_ENV = 'SHIFTBUILDER_WORKERS'
+THREADS_ENV = 'SHIFTBUILDER_THREADS'
+POLL_INTERVAL = 0.5  # seconds between progress reports of a worker
+AFFINITY_CACHE = 256  # affinity keys whose worker is remembered
+
+
+def _init_worker():
+    # Only the serving process writes the store; the workers solve and report back.
+    set_store(None)
+
+
+def _work(number, problem, options, board):
+    job = SolveJob(problem, **options).start()
+    while job.running:
+        command = board.get(('command', number))
+        if command == 'stop':
+            job.stop()
+        elif command == 'cancel':
+            job.cancel()
+        board[number] = job.latest
+        job.wait(POLL_INTERVAL)
+    return job.wait()
+
+
+def _call(function, problem, args, kwargs):
+    return function(problem, *args, **kwargs)
+
+
+class _Job:
+    """One solve in the queue, shared by the tickets of everyone who submitted it."""
+
+    def __init__(self, job_id, number, problem, options, task=None, affinity=None):
+        self.id = job_id
+        self.number = number  # the job's entries on the progress board
+        self.problem = problem
+        self.options = options
+        self.task = task  # (function, args, kwargs) of call(), None for a SolveJob
+        self.affinity = affinity
+        self.worker = None  # index of the worker running it
+        self.tickets = 0
+        self.started = None
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class Ticket:
+    """A submitter's handle on a queued job; see the module docstring."""
+
+    def __init__(self, queue, job):
+        self._queue = queue
+        self._job = job
+        self._cancelled = False
+        job.tickets += 1
+
+    @property
+    def problem(self):
+        return self._job.problem
+
+    @property
+    def backend(self):
+        return self._job.options['backend']
+
+    @property
+    def time_limit(self):
+        return self._job.options['time_limit']
+
+    @property
+    def stoppable(self):
+        """False for call() jobs, which have no progress and no stop()."""
+        return self._job.task is None
+
+    @property
+    def status(self):
+        """'queued', 'running', 'done' or 'cancelled' (this ticket only)."""
+        if self._cancelled:
+            return 'cancelled'
+        if self._job.done.is_set():
+            return 'done'
+        return 'running' if self._job.started is not None else 'queued'
+
+    @property
+    def running(self):
+        return self.status in ('queued', 'running')
+
+    @property
+    def position(self):
+        """1 for the next job to start, ...; 0 once it runs."""
+        return self._queue.position(self._job)
+
+    @property
+    def elapsed(self):
+        """Seconds since the job started (0 while queued)."""
+        return time.perf_counter() - self._job.started if self._job.started is not None else 0.0
+
+    @property
+    def latest(self):
+        return self._queue.progress(self._job) or Progress(self.elapsed)
+
+    def stop(self):
+        """Finish now with the best schedule found so far (for everyone waiting for it)."""
+        self._queue.command(self._job, 'stop')
+
+    def cancel(self):
+        """Give up this ticket; the job is cancelled once no other ticket waits for it."""
+        if self.running:
+            self._cancelled = True
+            self._queue.release(self._job)
+
+    def wait(self, timeout=None):
+        if self._cancelled:
+            return ShiftResult(status='Cancelled', days=self.problem.days, key=self._job.id[0])
+        self._job.done.wait(timeout)
+        if self._job.error is not None:
+            raise self._job.error
+        return self._job.result
+
+
+class JobQueue:
+    """Solves submitted from any thread, run `workers` at a time in processes; see the module docstring."""
+
+    def __init__(self, workers=None, threads=1):
+        self.threads = threads
+        self.workers = workers or max((os.cpu_count() or 1) // (threads or 1), 1)
+        # spawn: a server's threads and the solver libraries do not survive a fork
+        self._context = multiprocessing.get_context('spawn')
+        self._pools = [None] * self.workers  # one process each
+        self._busy = [None] * self.workers  # the _Job each worker runs
+        self._homes = OrderedDict()  # affinity key -> worker of its last call
+        self._manager = None
+        self._board = None
+        self._lock = threading.RLock()  # a job that fails at once finishes inside _dispatch
+        self._pending = deque()
+        self._jobs = {}  # (problem key, backend) -> _Job queued or running, and not cancelled
+        self._numbers = itertools.count()
+
+    def submit(self, problem, backend='cbc', time_limit=300, gap=None, profile=False):
+        """Ticket for solving problem; identical scenarios queued or running share one job."""
+        job_id = (problem.key(), backend)
+        hit = cached(*job_id)
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                options = dict(backend=backend, time_limit=time_limit, gap=gap, profile=profile,
+                               threads=self.threads)
+                job = _Job(job_id, next(self._numbers), problem, options)
+                if hit is not None:
+                    job.result = hit
+                    job.done.set()
+                else:
+                    self._jobs[job_id] = job
+                    self._pending.append(job)
+            ticket = Ticket(self, job)
+        self._dispatch()
+        return ticket
+
+    def call(self, function, problem, *args, affinity=None, **kwargs):
+        """Ticket for function(problem, *args, **kwargs) run in a worker; never shared with other calls.
+
+        function must be importable by the workers (a module-level function);
+        kwargs' backend and time_limit show on the ticket.  Calls with the
+        same affinity key (hashable) prefer the worker of the last one.
+        """
+        options = dict(backend=kwargs.get('backend', 'cbc'), time_limit=kwargs.get('time_limit', 300))
+        with self._lock:
+            number = next(self._numbers)
+            job = _Job(('call', number), number, problem, options, (function, args, kwargs), affinity)
+            self._jobs[job.id] = job
+            self._pending.append(job)
+            ticket = Ticket(self, job)
+        self._dispatch()
+        return ticket
+
+    def __len__(self):
+        """Jobs queued or running (without the cancelled ones still stopping)."""
+        return len(self._jobs)
+
+    def position(self, job):
+        with self._lock:
+            return self._pending.index(job) + 1 if job in self._pending else 0
+
+    def progress(self, job):
+        if job.started is None or job.done.is_set() or self._board is None:
+            return None
+        return self._board.get(job.number)
+
+    def command(self, job, command):
+        with self._lock:
+            if job.started is not None and not job.done.is_set() and self._board is not None:
+                self._board[('command', job.number)] = command
+
+    def release(self, job):
+        """One ticket less for job; without tickets it leaves the queue or is cancelled."""
+        with self._lock:
+            job.tickets -= 1
+            if job.tickets > 0 or job.done.is_set():
+                return
+            # The scenario submitted again starts a new job instead of joining this one
+            del self._jobs[job.id]
+            if job in self._pending:
+                self._pending.remove(job)
+                job.result = ShiftResult(status='Cancelled', days=job.problem.days, key=job.id[0])
+                job.done.set()
+            elif self._board is not None:
+                self._board[('command', job.number)] = 'cancel'
+
+    def shutdown(self):
+        """Stop the workers; running jobs are cancelled and queued ones dropped."""
+        with self._lock:
+            pending, self._pending = list(self._pending), deque()
+            for job in pending:
+                del self._jobs[job.id]
+            for job in self._jobs.values():
+                if job.started is not None:
+                    self._board[('command', job.number)] = 'cancel'
+        for job in pending:
+            job.result = ShiftResult(status='Cancelled', days=job.problem.days, key=job.id[0])
+            job.done.set()
+        for pool in self._pools:
+            if pool is not None:
+                pool.shutdown(wait=True)  # the finished callbacks of the running jobs still use the board
+        with self._lock:
+            manager = self._manager
+            self._pools = [None] * self.workers
+            self._homes.clear()
+            self._manager = self._board = None
+        if manager is not None:
+            manager.shutdown()
+
+    def _dispatch(self):
+        with self._lock:
+            while self._pending and None in self._busy:
+                if self._manager is None:
+                    self._manager = self._context.Manager()
+                    self._board = self._manager.dict()
+                job = self._pending.popleft()
+                home = self._homes.get(job.affinity) if job.affinity is not None else None
+                worker = home if home is not None and self._busy[home] is None else self._busy.index(None)
+                if job.affinity is not None:
+                    self._homes[job.affinity] = worker
+                    self._homes.move_to_end(job.affinity)
+                    while len(self._homes) > AFFINITY_CACHE:
+                        self._homes.popitem(last=False)
+                if self._pools[worker] is None:
+                    self._pools[worker] = ProcessPoolExecutor(1, mp_context=self._context, initializer=_init_worker)
+                job.worker = worker
+                job.started = time.perf_counter()
+                self._busy[worker] = job
+                pool = self._pools[worker]
+                if job.task is None:
+                    future = pool.submit(_work, job.number, job.problem, job.options, self._board)
+                else:
+                    function, args, kwargs = job.task
+                    future = pool.submit(_call, function, job.problem, args, kwargs)
+                future.add_done_callback(lambda future, job=job: self._finished(job, future))
+
+    def _finished(self, job, future):
+        error = future.exception()
+        with self._lock:
+            self._busy[job.worker] = None
+            if self._jobs.get(job.id) is job:
+                del self._jobs[job.id]
+            if self._board is not None:  # None once shutdown() ended the manager
+                self._board.pop(job.number, None)
+                self._board.pop(('command', job.number), None)
+            if isinstance(error, BrokenProcessPool) and self._pools[job.worker] is not None:
+                # The worker died (e.g. out of memory); the next job gets a new one, which keeps nothing
+                self._pools[job.worker].shutdown(wait=False)
+                self._pools[job.worker] = None
+                for key in [key for key, worker in self._homes.items() if worker == job.worker]:
+                    del self._homes[key]
+        if error is None:
+            job.result = future.result()
+            if getattr(job.result, 'profile', None) is not None:
+                job.result.profile.log()  # logged where the server's handlers are
+            if job.task is None:
+                remember(job.result, job.options['backend'], job.problem)
+        else:
+            job.error = error
+        job.done.set()
+        self._dispatch()
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def default_queue():
+    """The process-wide JobQueue, sized from $SHIFTBUILDER_WORKERS / $SHIFTBUILDER_THREADS."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            threads = int(os.environ.get(THREADS_ENV) or 1)
+            _queue = JobQueue(int(os.environ.get(WORKERS_ENV) or 0) or None, threads)
+        return _queue
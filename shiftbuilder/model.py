@@ -0,0 +1,516 @@
+import math
+import time
+
+import numpy as np
+
+from .roster import NORMAL_LATE, SHIFT_KINDS, SPECIAL_LATE
+
+INF = float('inf')
+
+
+class MatrixModel:
+    """Binary program kept as a sparse row-wise matrix.
+
+    Constraints are added as blocks of rows that share a group name
+    (e.g. 'max_work'); every block is a (rows x nonzeros) array of column
+    indices with matching coefficients, so one call adds a whole family of
+    sliding-window constraints without touching Python objects per row.
+    """
+
+    def __init__(self, sense=-1):
+        self.sense = sense  # -1 maximize, 1 minimize (HiGHS convention)
+        self.col_names = []
+        self.integer = []
+        self.upper = []
+        self.objective = []
+        self.blocks = []
+        self.fixed = []
+        self.x = {}  # person -> shift -> column per day
+        self.X = {}  # shift -> (persons x days) columns, -1 where the person lacks the shift
+        self.ids = []
+        self.col_groups = []  # (group, number of columns) per add_cols()
+        self.slack = []  # (rule, (group, label), columns, person, day, side) per softened block, see soften()
+        self.build_times = {}  # group -> seconds spent since the block before
+        self._clock = time.perf_counter()
+
+    def _tick(self, group):
+        now = time.perf_counter()
+        self.build_times[group] = self.build_times.get(group, 0.0) + now - self._clock
+        self._clock = now
+
+    @property
+    def num_cols(self):
+        return len(self.col_names)
+
+    @property
+    def num_rows(self):
+        return sum(len(b['lo']) for b in self.blocks)
+
+    def add_cols(self, names, integer=True, group='shift', upper=1.0):
+        """Columns in [0, upper]; binary unless integer=False (or upper > 1: general integers)."""
+        start = len(self.col_names)
+        self.col_names.extend(names)
+        self.integer.extend([integer] * (len(self.col_names) - start))
+        self.upper.extend(np.broadcast_to(np.asarray(upper, dtype=float), (len(self.col_names) - start,)).tolist())
+        self.col_groups.append((group, len(self.col_names) - start))
+        self._tick(group)
+        return np.arange(start, len(self.col_names))
+
+    def integrality(self):
+        return np.array(self.integer, dtype=bool)
+
+    def add_objective(self, cols, coefs=1.0):
+        self._tick('objective')
+        cols = np.asarray(cols, dtype=np.int64)
+        self.objective.append((cols, np.broadcast_to(np.asarray(coefs, dtype=float), cols.shape)))
+
+    def cost(self):
+        cost = np.zeros(self.num_cols)
+        for cols, coefs in self.objective:
+            np.add.at(cost, cols, coefs)
+        return cost
+
+    def fix(self, cols, values):
+        cols = np.asarray(cols, dtype=np.int64)
+        self.fixed.append((cols, np.broadcast_to(np.asarray(values, dtype=float), cols.shape)))
+
+    def bounds(self):
+        lower = np.zeros(self.num_cols)
+        upper = np.array(self.upper, dtype=float)
+        for cols, values in self.fixed:
+            lower[cols] = values
+            upper[cols] = values
+        return lower, upper
+
+    def add_rows(self, group, cols, coefs=1.0, lo=-INF, hi=INF, person=None, day=None, label=None):
+        self._tick(group)
+        cols = np.atleast_2d(np.asarray(cols, dtype=np.int64))
+        rows = cols.shape[0]
+        if rows == 0:
+            return
+        coefs = np.broadcast_to(np.asarray(coefs, dtype=float), cols.shape)
+        self.blocks.append({
+            'group': group,
+            'label': label,
+            'person': np.broadcast_to(np.asarray(person, dtype=object), (rows,)),
+            'day': np.broadcast_to(np.asarray(-1 if day is None else day), (rows,)),
+            'cols': cols,
+            'coefs': coefs,
+            'lo': np.broadcast_to(np.asarray(lo, dtype=float), (rows,)),
+            'hi': np.broadcast_to(np.asarray(hi, dtype=float), (rows,)),
+        })
+
+    def soften(self, rule, keys, weight):
+        """Let the rows of the (group, label) keys be violated at `weight` per unit.
+
+        Every such row gets a continuous slack column per finite side, as
+        large as the row can be violated at all, and the slacks are charged
+        against the objective.  Recorded in self.slack under `rule`.
+        """
+        self._tick('soft')
+        upper = np.array(self.upper, dtype=float)
+        for b in self.blocks:
+            if (b['group'], b['label']) not in keys:
+                continue
+            cols, coefs = b['cols'], b['coefs']
+            valid = cols >= 0
+            reach = np.where(valid, coefs, 0.0) * np.where(valid, upper[cols], 0.0)
+            low, high = np.minimum(reach, 0).sum(axis=1), np.maximum(reach, 0).sum(axis=1)
+            extra_cols, extra_coefs = [], []
+            for side, need, sign in (('lo', b['lo'] - low, 1.0), ('hi', high - b['hi'], -1.0)):
+                need = np.where(np.isfinite(need), np.maximum(need, 0.0), 0.0)
+                rows = np.flatnonzero(need > 0)
+                column = np.full(len(need), -1, dtype=np.int64)
+                if len(rows):
+                    names = [f"slack_{rule}_{side}_{len(self.col_names) + i}" for i in range(len(rows))]
+                    column[rows] = self.add_cols(names, integer=False, group='soft', upper=need[rows])
+                    self.add_objective(column[rows], self.sense * weight)
+                    key = (b['group'], b['label'])
+                    self.slack.append((rule, key, column[rows], b['person'][rows], b['day'][rows], side))
+                extra_cols.append(column)
+                extra_coefs.append(np.full(len(need), sign))
+            b['cols'] = np.column_stack([cols] + extra_cols)
+            b['coefs'] = np.column_stack([np.broadcast_to(coefs, cols.shape)] + extra_coefs)
+
+    def group_stats(self):
+        """{group: rows, cols, nonzeros and build seconds} in the order the groups were built."""
+        stats = {}
+
+        def entry(group):
+            return stats.setdefault(group, {'rows': 0, 'cols': 0, 'nnz': 0, 'time': 0.0})
+
+        for group, seconds in self.build_times.items():
+            entry(group)['time'] = round(seconds, 6)
+        for group, n in self.col_groups:
+            entry(group)['cols'] += n
+        for b in self.blocks:
+            e = entry(b['group'])
+            e['rows'] += len(b['lo'])
+            e['nnz'] += int(np.count_nonzero((b['cols'] >= 0) & (b['coefs'] != 0)))
+        return stats
+
+    def csr(self):
+        """Return (indptr, indices, values, lo, hi) for all rows."""
+        if not self.blocks:
+            empty = np.zeros(0)
+            return np.zeros(1, dtype=np.int64), empty.astype(np.int64), empty, empty, empty
+        cols = np.concatenate([b['cols'].ravel() for b in self.blocks])
+        vals = np.concatenate([b['coefs'].ravel() for b in self.blocks])
+        row_of = np.concatenate([np.repeat(np.arange(b['cols'].shape[0]), b['cols'].shape[1]) + off
+                                 for b, off in zip(self.blocks, self._row_offsets())])
+        keep = (vals != 0) & (cols >= 0)
+        cols, vals, row_of = cols[keep], vals[keep], row_of[keep]
+        indptr = np.zeros(self.num_rows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(row_of, minlength=self.num_rows), out=indptr[1:])
+        lo = np.concatenate([b['lo'] for b in self.blocks])
+        hi = np.concatenate([b['hi'] for b in self.blocks])
+        return indptr, cols, vals, lo, hi
+
+    def _row_offsets(self):
+        offsets = np.cumsum([0] + [len(b['lo']) for b in self.blocks])
+        return offsets[:-1]
+
+    def row_keys(self):
+        """(group, label, person, day) of every row, day -1 for rows over the whole period."""
+        keys = []
+        for b in self.blocks:
+            keys.extend((b['group'], b['label'], p, d) for p, d in zip(b['person'].tolist(), b['day'].tolist()))
+        return keys
+
+    def subset(self, rows):
+        """Copy without objective that keeps only the rows where the boolean mask is set."""
+        sub = MatrixModel(self.sense)
+        sub.col_names, sub.integer, sub.upper, sub.fixed = self.col_names, self.integer, self.upper, self.fixed
+        sub.slack = self.slack
+        sub.x, sub.X, sub.ids = self.x, self.X, self.ids
+        for b, off in zip(self.blocks, self._row_offsets()):
+            keep = rows[off:off + len(b['lo'])]
+            if keep.any():
+                sub.blocks.append({k: v[keep] if isinstance(v, np.ndarray) else v for k, v in b.items()})
+        return sub
+
+    def row_names(self):
+        names = []
+        for b in self.blocks:
+            prefix = b['group'] if b['label'] is None else f"{b['group']}_{b['label']}"
+            for r, (p, d) in enumerate(zip(b['person'].tolist(), b['day'].tolist())):
+                names.append(f"{prefix}_{p}_{d if d >= 0 else r}" if p is not None else f"{prefix}_{d if d >= 0 else r}")
+        return names
+
+
+# Rules ShiftProblem.soft can turn into preferences: rule -> (group, label) of their rows
+SOFT_RULES = {
+    'early': {('balance', 'early'), ('commit', 'early')},
+    'late': {('balance', 'late'), ('commit', 'late')},
+    'mid': {('balance', 'mid'), ('commit', 'mid')},
+    'one_kin': {('one_kin', 'total'), ('commit', 'one_kin')},
+    'campaign': {('campaign', 'late'), ('campaign', 'early')},
+}
+
+
+def build_matrix(problem):
+    roster = problem.roster
+    D = problem.days_count
+    days_idx = np.arange(D)
+    holidays = problem.indices(problem.holidays)
+    weekday = np.array([d.weekday() for d in problem.days], dtype=np.int64)
+    is_special_late = (weekday == 6) | np.isin(days_idx, holidays)
+    cheer = np.array(problem.indices(problem.cheer_days), dtype=np.int64)
+    is_cheer = np.isin(days_idx, cheer)
+    campaign = np.array(problem.indices(problem.campaign_days), dtype=np.int64)
+    priority = np.array(problem.indices(problem.three_person_priority), dtype=np.int64)
+
+    m = MatrixModel(sense=-1)
+    strong = problem.strengthen
+
+    # X[s][i, d]: person i works shift s on day d (-1: shift not allowed for i)
+    persons = roster.persons
+    ids = np.array(roster.ids, dtype=object)
+    P = len(persons)
+    codes = [s for s in SHIFT_KINDS if any(s in person.shifts for person in persons)]
+    X = {s: np.full((P, D), -1, dtype=np.int64) for s in codes}
+    for i, person in enumerate(persons):
+        m.x[person.id] = {}
+        for s in person.shifts:
+            X[s][i] = m.x[person.id][s] = m.add_cols([f"v_{d}_{person.id}_{s}" for d in range(D)])
+    m.X = X
+    m.ids = roster.ids
+
+    def kind(k, rows=slice(None)):
+        """(persons x days x codes) columns of every shift of kind k."""
+        cols = [X[s][rows] for s in codes if SHIFT_KINDS[s] == k]
+        return np.stack(cols, axis=-1) if cols else np.full(np.empty((P, D))[rows].shape + (0,), -1, dtype=np.int64)
+
+    def per_day(cols):
+        """(persons x days x codes) -> one row per day over all persons."""
+        return cols.transpose(1, 0, 2).reshape(cols.shape[1], cols.shape[0] * cols.shape[2])
+
+    def index(pred):
+        return np.array([i for i, person in enumerate(persons) if pred(person)], dtype=np.int64)
+
+    staff = index(lambda person: person.role == 'staff')
+    support = index(lambda person: person.role == 'support')
+    pool = index(lambda person: person.cheer_pool)
+    S = len(staff)
+    work = np.concatenate([kind('early'), kind('mid'), kind('late')], axis=-1)
+    off = X['off'][staff]
+
+    # Objective: maximize workers on priority days
+    m.add_objective(work[:, priority].ravel()[work[:, priority].ravel() >= 0])
+
+    # Each person each day one shift
+    m.add_rows('one_shift', np.stack([X[s] for s in codes], axis=-1).reshape(P * D, -1), lo=1, hi=1,
+               person=np.repeat(ids, D), day=np.tile(days_idx, P))
+
+    # Specific offs
+    who = np.concatenate([np.full(len(problem.must_off[ids[i]]), i, dtype=np.int64) for i in staff] + [np.zeros(0, np.int64)])
+    when = np.array([d for i in staff for d in problem.indices(problem.must_off[ids[i]])], dtype=np.int64)
+    m.add_rows('must_off', X['off'][who, when][:, None], lo=1, hi=1, person=ids[who], day=when)
+
+    # Total offs
+    rest = np.array([problem.rest_days[p] for p in ids[staff]])
+    m.add_rows('total_off', off, lo=rest, hi=rest, person=ids[staff])
+
+    # Cheer configuration: support works exactly on 応援 days, with a fixed number of 'D'
+    if len(support):
+        not_cheer = days_idx[~is_cheer]
+        m.add_rows('cheer', _rows(work[support][:, cheer], len(support) * len(cheer)), lo=1, hi=1,
+                   person=np.repeat(ids[support], len(cheer)), day=np.tile(cheer, len(support)), label='on')
+        m.add_rows('cheer', X['off'][support][:, not_cheer].reshape(-1, 1), lo=1, hi=1,
+                   person=np.repeat(ids[support], len(not_cheer)), day=np.tile(not_cheer, len(support)), label='off')
+        sup_d = X['D'][support] if 'D' in X else np.full((len(support), D), -1, dtype=np.int64)
+        m.add_rows('support_d', sup_d.reshape(1, -1), lo=problem.support_d_days, hi=problem.support_d_days)
+
+    # Fixed shift on cheer days (小野: As)
+    for s in codes:
+        fixed = index(lambda person: person.cheer_shift == s)
+        cells = X[s][fixed][:, cheer]
+        m.add_rows('cheer', cells.reshape(-1, 1), lo=1, hi=1,
+                   person=np.repeat(ids[fixed], len(cheer)), day=np.tile(cheer, len(fixed)), label='fixed')
+
+    # Late type: E only on Sundays/holidays, F on other days
+    for s, days in ((SPECIAL_LATE, days_idx[~is_special_late]), (NORMAL_LATE, days_idx[is_special_late])):
+        if s in X:
+            p_idx, d_idx = np.nonzero(X[s][:, days] >= 0)
+            m.add_rows('late_type', X[s][p_idx, days[d_idx]][:, None], lo=0, hi=0,
+                       person=ids[p_idx], day=days[d_idx], label=s)
+
+    # Cheer day configuration: the pool (宮村/廣内) works on 応援 days only opposite a support 'D',
+    # and never early/mid on a day the support takes 'D'
+    if len(pool) and len(support) and 'D' in X:
+        pool_work = per_day(work[pool][:, cheer])
+        m.add_rows('cheer', np.column_stack([pool_work, X['D'][support][:, cheer].T]),
+                   np.r_[np.ones(pool_work.shape[1]), -np.ones(len(support))], lo=0, hi=0, day=cheer, label='staff')
+        early_mid = _rows(np.concatenate([kind('early', pool), kind('mid', pool)], axis=-1), len(pool) * D)
+        for j in support:
+            m.add_rows('cheer', np.column_stack([early_mid, np.tile(X['D'][j], len(pool))]), hi=1,
+                       person=np.repeat(ids[pool], D), day=np.tile(days_idx, len(pool)),
+                       label='no_mid' if len(support) == 1 else f'no_mid_{ids[j]}')
+
+    # Early, mid, late constraints
+    for k in ('early', 'late', 'mid'):
+        lo, hi = getattr(roster, k)
+        m.add_rows('daily', per_day(kind(k)), lo=lo, hi=hi, day=days_idx, label=k)
+    m.add_rows('daily', per_day(work), lo=roster.workers[0], hi=roster.workers[1], day=days_idx, label='workers')
+
+    # Balance
+    def person_values(name, rows):
+        return np.array([getattr(problem, name)[p] for p in ids[rows]])
+
+    has_mid = index(lambda person: person.role == 'staff' and bool(person.codes('mid')))
+    balance = {
+        'early': (staff, kind('early', staff)),
+        'late': (staff, kind('late', staff)),
+        'mid': (has_mid, kind('mid', has_mid)),
+    }
+    for label, (rows, cols) in balance.items():
+        m.add_rows('balance', _rows(cols, len(rows)), lo=person_values(f'{label}_min', rows),
+                   hi=person_values(f'{label}_max', rows), person=ids[rows], label=label)
+
+    # Rolling horizon: the committed head of a block also gets its pro-rata share
+    # of the totals, so that a block cannot use up the budget of its look-ahead.
+    C = problem.commit_days
+    if 0 < C < D:
+        m.add_rows('commit', off[:, :C], lo=np.floor(rest * C / D), hi=np.ceil(rest * C / D),
+                   person=ids[staff], label='off')
+        for label, (rows, cols) in balance.items():
+            m.add_rows('commit', _rows(cols[:, :C], len(rows)),
+                       lo=np.floor(person_values(f'{label}_min', rows) * C / D),
+                       hi=np.ceil(person_values(f'{label}_max', rows) * C / D), person=ids[rows], label=label)
+        if len(cheer) and len(support) and 'D' in X:
+            head_cheer = int(np.sum(cheer < C))
+            m.add_rows('commit', X['D'][support][:, :C].reshape(1, -1),
+                       lo=math.floor(problem.support_d_days * head_cheer / len(cheer)),
+                       hi=math.ceil(problem.support_d_days * head_cheer / len(cheer)), label='D')
+
+    # Continuous constraints
+    staff_ids = ids[staff]
+    prev_off = np.array([problem.prev_off[p] for p in staff_ids])
+    prev_early = np.array([problem.prev_early[p] for p in staff_ids])
+    prev_late = np.array([problem.prev_late[p] for p in staff_ids])
+    has_prev = np.array([problem.prev_shift[p] != '' for p in staff_ids], dtype=bool)
+    consec_work = np.array([problem.prev_consec_work[p] for p in staff_ids], dtype=np.int64)
+    consec_rest = np.array([problem.prev_consec_rest[p] for p in staff_ids], dtype=np.int64)
+
+    # Max work (prevent max_consec_work + 1 consecutive work)
+    W = roster.max_consec_work + 1
+    for i in np.flatnonzero(consec_work >= W):
+        raise ValueError(f"{staff_ids[i]}の前日連続勤務が{W}以上です。ルール違反。")
+    init = np.minimum(D, W - consec_work)
+    rows = np.flatnonzero((consec_work > 0) & (D > 0))
+    m.add_rows('max_work', _head(off[rows], init[rows]), lo=1, person=staff_ids[rows], day=0, label='init')
+    if D >= W:
+        m.add_rows('max_work', _windows(off, W).reshape(-1, W), lo=1,
+                   person=np.repeat(staff_ids, D - W + 1), day=np.tile(days_idx[:D - W + 1], S))
+
+    # Chained periods: the last work streak stops end_slack days short of the maximum,
+    # the last rest streak one day short
+    E = problem.end_slack
+    if E > 0:
+        t = roster.max_consec_work - E
+        if 0 <= t < D:
+            m.add_rows('end', off[:, D - t - 1:], lo=1, person=staff_ids, day=D - 1, label='work')
+        t = roster.max_consec_rest - 1
+        if 0 <= t < D:
+            m.add_rows('end', off[:, D - t - 1:], hi=t, person=staff_ids, day=D - 1, label='rest')
+
+    # Max rest (prevent max_consec_rest + 1 consecutive rest)
+    R = roster.max_consec_rest + 1
+    for i in np.flatnonzero(consec_rest >= R):
+        raise ValueError(f"{staff_ids[i]}の前日連続休みが{R}以上です。ルール違反。")
+    init = np.minimum(D, R - consec_rest)
+    rows = np.flatnonzero((consec_rest > 0) & (D > 0))
+    m.add_rows('max_rest', _head(off[rows], init[rows]), hi=init[rows] - 1, person=staff_ids[rows], day=0, label='init')
+    if D >= R:
+        m.add_rows('max_rest', _windows(off, R).reshape(-1, R), hi=R - 1,
+                   person=np.repeat(staff_ids, D - R + 1), day=np.tile(days_idx[:D - R + 1], S))
+
+    # Mix for 3+ duty: every 3-day stretch of work has an early (and a late unless mix_late is off)
+    mix_late = np.array([persons[i].mix_late for i in staff], dtype=bool)
+    for label, cols, rows, prev in (('early', kind('early', staff), np.arange(S), prev_early),
+                                    ('late', kind('late', staff), np.flatnonzero(mix_late), prev_late)):
+        if D >= 2:
+            first = rows[prev_off[rows] == 0]
+            m.add_rows('mix', np.concatenate([_rows(cols[first, :2], len(first)), off[first, :2]], axis=1),
+                       lo=1 - prev[first], person=staff_ids[first], day=0, label=f'init_{label}')
+        if D >= 3:
+            k = cols.shape[-1]
+            windows = _windows(cols[rows], 3).transpose(0, 1, 3, 2).reshape(len(rows) * (D - 2), 3 * k)
+            m.add_rows('mix', np.concatenate([windows, _windows(off[rows], 3).reshape(-1, 3)], axis=1), lo=1,
+                       person=np.repeat(staff_ids[rows], D - 2), day=np.tile(days_idx[:D - 2], len(rows)), label=label)
+
+    # 1kin: k[i] == work[i] and off[i-1] and off[i+1]; the end day is not counted.
+    # Strengthened: only the total is limited, so k >= work[i] + off[i-1] + off[i+1] - 2
+    # (the 'link' rows) is enough and k need not be binary.
+    if D > 1:
+        k = m.add_cols([f"is_1kin_{p}_{i}" for p in staff_ids for i in range(D - 1)],
+                       integer=not strong, group='one_kin').reshape(S, D - 1)
+        first = np.arange(D - 1)
+        middle = np.arange(1, D - 1)
+
+        def rows_of(*cols):
+            return np.stack([c.reshape(-1) for c in cols], axis=1)
+
+        person_first = np.repeat(staff_ids, D - 1)
+        person_middle = np.repeat(staff_ids, D - 2)
+        if not strong:
+            m.add_rows('one_kin', rows_of(k, off[:, :D - 1]), hi=1, person=person_first, day=np.tile(first, S), label='work')
+            m.add_rows('one_kin', rows_of(k, off[:, 1:]), [1, -1], hi=0, person=person_first, day=np.tile(first, S),
+                       label='next_off')
+            m.add_rows('one_kin', rows_of(k[:, 1:], off[:, :D - 2]), [1, -1], hi=0,
+                       person=person_middle, day=np.tile(middle, S), label='prev_off')
+        m.add_rows('one_kin', rows_of(k[:, 1:], off[:, 1:D - 1], off[:, :D - 2], off[:, 2:]), [1, 1, -1, -1], lo=-1,
+                   person=person_middle, day=np.tile(middle, S), label='link')
+        # Start: prev_off考慮（入力時のみ）
+        if not strong:
+            m.add_rows('one_kin', k[has_prev, :1], hi=prev_off[has_prev], person=staff_ids[has_prev], day=0,
+                       label='prev_off')
+        m.add_rows('one_kin', rows_of(k[:, 0], off[:, 0], off[:, 1]), [1, 1, -1],
+                   lo=np.where(has_prev, prev_off - 1, 0), person=staff_ids, day=0, label='link')
+        onekin = np.array([problem.onekin_max[p] for p in staff_ids])
+        m.add_rows('one_kin', k, hi=onekin, person=staff_ids, label='total')
+        if 0 < C < D:
+            m.add_rows('commit', k[:, :C], hi=np.ceil(onekin * C / (D - 1)), person=staff_ids, label='one_kin')
+
+    # Campaign Saturday constraints: on a short-staffed day the 'late' person takes F
+    # and the 'early' persons work early if at all
+    if len(campaign):
+        # t >= workers_min + 1 - workers is 0 or 1 already, so t can be continuous
+        t = m.add_cols([f"is_two_{d}" for d in campaign], integer=not strong, group='campaign')
+        m.add_rows('campaign', np.column_stack([t, per_day(work)[campaign]]), lo=roster.workers[0] + 1,
+                   day=campaign, label='two')
+        late = index(lambda person: person.campaign == 'late')
+        for i in late:
+            m.add_rows('campaign', np.column_stack([X[NORMAL_LATE][i, campaign], t]), [1, -1], lo=0,
+                       person=ids[i], day=campaign, label='late')
+        early = index(lambda person: person.campaign == 'early')
+        if len(early):
+            other = np.concatenate([kind('mid', early), kind('late', early)], axis=-1)[:, campaign]
+            m.add_rows('campaign', np.column_stack([_rows(other, len(early) * len(campaign)),
+                                                    np.tile(t, len(early))]),
+                       hi=1, person=np.repeat(ids[early], len(campaign)), day=np.tile(campaign, len(early)),
+                       label='early')
+
+    # Symmetry breaking: staff with identical rules and inputs can swap schedules,
+    # so order them by the position-weighted sum of their offs.
+    if strong:
+        groups = {}
+        for i in staff:
+            groups.setdefault(_signature(problem, persons[i]), []).append(i)
+        weights = np.arange(1, D + 1, dtype=float)
+        for group in groups.values():
+            for a, b in zip(group, group[1:]):
+                m.add_rows('symmetry', np.concatenate([X['off'][a], X['off'][b]]), np.r_[weights, -weights], lo=0,
+                           person=ids[a], label='order')
+
+    # Preferences instead of rules: violations cost problem.soft[rule] each
+    for rule, weight in problem.soft.items():
+        m.soften(rule, SOFT_RULES[rule], weight)
+
+    return m
+
+
+def _signature(problem, person):
+    """Everything that tells a staff member apart in the model, except the id."""
+    rules = {k: v for k, v in vars(person).items() if k not in ('id', 'name')}
+    inputs = [getattr(problem, name)[person.id] for name in (
+        'prev_shift', 'prev_consec_work', 'prev_consec_rest', 'rest_days', 'onekin_max', 'must_off',
+        'early_min', 'early_max', 'late_min', 'late_max', 'mid_min', 'mid_max')]
+    return repr((sorted(rules.items()), inputs))
+
+
+def _rows(cols, n):
+    """cols as n constraint rows (also when n == 0)."""
+    return cols.reshape(n, -1) if n else cols.reshape(0, 0)
+
+
+def _head(cols, lengths):
+    """First lengths[i] columns of every row i, padded with -1."""
+    width = int(lengths.max()) if len(lengths) else 0
+    head = cols[:, :width]
+    return np.where(np.arange(width) < lengths[:, None], head, -1)
+
+
+def _windows(cols, width):
+    """Sliding windows of `width` days along the day axis (axis 1)."""
+    return np.lib.stride_tricks.sliding_window_view(cols, width, axis=1)
+
+
+def shift_values(m, problem, shift_by_date, dates=None):
+    """Column indices/values that reproduce a known schedule on the given dates.
+
+    shift_by_date maps date -> {person: code} ('' for off); dates missing from
+    it are skipped, so a schedule of a neighbouring period can be used too.
+    """
+    cols, values = [], []
+    for d, day in enumerate(problem.days):
+        if day not in shift_by_date or (dates is not None and day not in dates):
+            continue
+        for p, shifts in problem.shifts.items():
+            chosen = shift_by_date[day].get(p, '') or 'off'
+            if chosen not in shifts:
+                continue
+            for s in shifts:
+                cols.append(m.x[p][s][d])
+                values.append(1.0 if s == chosen else 0.0)
+    return np.asarray(cols, dtype=np.int64), np.asarray(values)
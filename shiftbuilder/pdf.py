@@ -0,0 +1,126 @@
+"""Shift and stats tables as a PDF (fpdf2) with the bundled DejaVuSans.ttf.
+
+    with open('shift.pdf', 'wb') as f:
+        write_pdf(problem, result, f, with_stats=True)
+
+The font is embedded once and subset to the glyphs used, so a file is a few
+KB instead of carrying the 720 KB font.  DejaVu Sans has no Japanese
+glyphs: pass font= or set SHIFTBUILDER_PDF_FONT to a Japanese TTF (IPAex
+Gothic, Noto Sans JP, ...) and it is used for them.  Without one, names and
+headers the fonts cannot show are written as person id / English header
+instead of vanishing.
+
+Long periods continue on further pages and wide rosters are split into
+groups of columns; every page repeats the header row and the date column.
+"""
+import os
+
+from .tables import shift_rows, stats_rows
+
+FONT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'DejaVuSans.ttf')
+FONT_ENV = 'SHIFTBUILDER_PDF_FONT'
+FONT_SIZE = 6
+ROW_HEIGHT = 5.5
+MIN_WIDTH, MAX_WIDTH = 8, 30  # mm per column
+
+# Stand-ins for fonts without Japanese glyphs
+ASCII_LABELS = {
+    '日付': 'Date', '人数': 'Num', '人': 'Staff', '休日数': 'Off', '最大連続休み': 'Max off', '最大連続勤務': 'Max work',
+    '早番数': 'Early', '遅番数': 'Late', '中番数': 'Mid', '4連勤数': '4-day work', '3連休数': '3-day off',
+    '1勤数': '1-kin', '休み前シフト (早番率%)': 'Early before off %', '休み後シフト (遅番率%)': 'Late after off %',
+}
+
+
+def pdf_available():
+    """True if fpdf2 (Unicode TrueType fonts) is installed; PyFPDF 1.x is not enough."""
+    try:
+        from fpdf import FPDF_VERSION
+    except ImportError:
+        return False
+    return int(FPDF_VERSION.split('.')[0]) >= 2
+
+
+class _Document:
+    def __init__(self, font=None):
+        from fpdf import FPDF
+
+        self.pdf = pdf = FPDF()
+        pdf.set_auto_page_break(False)
+        pdf.add_font('dejavu', fname=FONT_PATH)
+        families = ['dejavu']
+        font = font or os.environ.get(FONT_ENV)
+        if font:
+            pdf.add_font('extra', fname=font)
+            pdf.set_fallback_fonts(['extra'])
+            families.append('extra')
+        self.cmaps = [pdf.fonts[f].cmap for f in families]
+        pdf.set_font('dejavu', size=FONT_SIZE)
+        pdf.add_page()
+
+    def text(self, value, alternative=None):
+        """value, or the alternative if some character of value has no glyph in the fonts."""
+        value = str(value)
+        if alternative is None or all(any(ord(c) in cmap for cmap in self.cmaps) for c in value):
+            return value
+        return alternative
+
+    def width(self, *texts):
+        widest = max(self.pdf.get_string_width(t) for t in texts) + 2
+        return min(max(widest, MIN_WIDTH), MAX_WIDTH)
+
+    def table(self, columns, rows, fixed=1):
+        """columns: [(header text, row key, width)]; the first `fixed` columns are on every page."""
+        pdf = self.pdf
+        head, rest = columns[:fixed], columns[fixed:]
+        room = pdf.epw - sum(w for _, _, w in head)
+        groups, group, used = [], [], 0.0
+        for column in rest:
+            if group and used + column[2] > room:
+                groups.append(group)
+                group, used = [], 0.0
+            group.append(column)
+            used += column[2]
+        groups.append(group)
+
+        bottom = pdf.h - pdf.b_margin
+        for group in groups:
+            shown = head + group
+            if pdf.get_y() + 2 * ROW_HEIGHT > bottom:
+                pdf.add_page()
+            self._row([h for h, _, _ in shown], shown)
+            for row in rows:
+                if pdf.get_y() + ROW_HEIGHT > bottom:
+                    pdf.add_page()
+                    self._row([h for h, _, _ in shown], shown)
+                self._row([row[key] for _, key, _ in shown], shown)
+            pdf.ln(5)
+
+    def _row(self, texts, columns):
+        for text, (_, _, width) in zip(texts, columns):
+            self.pdf.cell(width, ROW_HEIGHT, str(text), border=1, align='C')
+        self.pdf.ln(ROW_HEIGHT)
+
+
+def write_pdf(problem, result, stream, with_stats=False, font=None):
+    """Write the shift table (and the stats table) of a solved result to a binary stream; returns the page count."""
+    doc = _Document(font)
+    names = problem.roster.names
+    rows = shift_rows(problem, result)
+
+    def label(text):
+        return doc.text(text, ASCII_LABELS.get(text, text))
+
+    columns = [(label('日付'), '日付', doc.width(label('日付'), *(r['日付'] for r in rows[:1])))]
+    for p in problem.persons:
+        header = doc.text(names[p], p)
+        columns.append((header, names[p], doc.width(header)))
+    columns.append((label('人数'), '人数', doc.width(label('人数'))))
+    doc.table(columns, rows)
+
+    if with_stats:
+        stats = stats_rows(problem, result)
+        if stats:
+            columns = [(label(key), key, doc.width(label(key), *(str(r[key]) for r in stats))) for key in stats[0]]
+            doc.table(columns, stats)
+    doc.pdf.output(stream)
+    return doc.pdf.pages_count
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, timedelta
+
+from .model import SOFT_RULES
+from .roster import SHIFT_KINDS, Roster, default_roster, load_roster
+
+# The default 新宿店 roster, kept for callers that predate Roster
+_DEFAULT = default_roster()
+STAFF = _DEFAULT.staff
+PERSONS = _DEFAULT.ids
+SHIFTS = _DEFAULT.shifts
+PERSON_FIELDS = ('rest_days', 'onekin_max', 'early_min', 'early_max', 'late_min', 'late_max', 'mid_min', 'mid_max')
+
+
+def to_date(d):
+    if isinstance(d, datetime):
+        return d.date()
+    if isinstance(d, date):
+        return d
+    return datetime.strptime(str(d).strip(), '%Y-%m-%d').date()
+
+
+def parse_dates(value):
+    """Accept "YYYY-MM-DD,YYYY-MM-DD" strings or any iterable of dates."""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    return [to_date(d) for d in value if str(d).strip()]
+
+
+@dataclass
+class ShiftProblem:
+    start: date
+    end: date
+    roster: Roster = field(default_factory=default_roster)
+    prev_shift: dict = field(default_factory=dict)
+    prev_consec_work: dict = field(default_factory=dict)
+    prev_consec_rest: dict = field(default_factory=dict)
+    # Per-person numbers: None takes the roster's value, an int applies to
+    # everybody, a dict overrides single persons.
+    rest_days: dict = None
+    onekin_max: dict = None
+    must_off: dict = field(default_factory=dict)
+    cheer_days: list = field(default_factory=list)
+    campaign_days: list = field(default_factory=list)
+    three_person_priority: list = field(default_factory=list)
+    holidays: list = field(default_factory=list)
+    early_min: int = None
+    early_max: int = None
+    late_min: int = None
+    late_max: int = None
+    mid_min: int = None
+    mid_max: int = None
+    support_d_days: int = 8
+    # > 0: totals also hold pro-rata on the first commit_days days (rolling horizon blocks)
+    commit_days: int = 0
+    # > 0: the period ends this many days short of the longest allowed work
+    # streak (and a rest streak one day short), so that the next period has
+    # room to start (chained periods)
+    end_slack: int = 0
+    # Rules (model.SOFT_RULES) that may be violated, each unit of violation
+    # costing this many of the objective's priority-day workers
+    soft: dict = field(default_factory=dict)
+    # Strengthened formulation: symmetry breaking, continuous 1kin/is_two auxiliaries
+    strengthen: bool = False
+
+    def __post_init__(self):
+        # Normalize so that equivalent inputs produce the same key():
+        # dates outside the period are dropped (the model ignores them anyway),
+        # the prev-day streak that does not match prev_shift is zeroed.
+        self.start = to_date(self.start)
+        self.end = to_date(self.end)
+        if (self.end - self.start).days < 0:
+            raise ValueError("終了日が開始日より前です。")
+        if isinstance(self.roster, dict):
+            self.roster = Roster.from_dict(self.roster)
+        staff = self.staff
+        self.prev_shift = {p: self.prev_shift.get(p, '') or '' for p in staff}
+        self.prev_consec_work = {p: int(self.prev_consec_work.get(p, 0)) if self.prev_shift[p] != '' else 0 for p in staff}
+        self.prev_consec_rest = {p: int(self.prev_consec_rest.get(p, 0)) if self.prev_shift[p] == '' else 0 for p in staff}
+        for name in PERSON_FIELDS:
+            value = getattr(self, name)
+            if not isinstance(value, dict):
+                value = {} if value is None else {p: value for p in staff}
+            setattr(self, name, {p: int(value.get(p, getattr(self.roster[p], name))) for p in staff})
+        self.must_off = {p: self._in_period(self.must_off.get(p, self.roster[p].must_off)) for p in staff}
+        self.cheer_days = self._in_period(self.cheer_days)
+        self.campaign_days = self._in_period(self.campaign_days)
+        self.three_person_priority = self._in_period(self.three_person_priority)
+        self.holidays = self._in_period(self.holidays)
+        for rule, weight in self.soft.items():
+            if rule not in SOFT_RULES:
+                raise ValueError(f"緩和できないルールです: {rule}")
+            if weight < 0:
+                raise ValueError(f"{rule}の重みが負です。")
+        self.soft = {rule: float(self.soft[rule]) for rule in sorted(self.soft)}
+
+    def _in_period(self, value):
+        return sorted({d for d in parse_dates(value) if self.start <= d <= self.end})
+
+    @property
+    def staff(self):
+        return self.roster.staff
+
+    @property
+    def persons(self):
+        return self.roster.ids
+
+    @property
+    def shifts(self):
+        return self.roster.shifts
+
+    @property
+    def days_count(self):
+        return (self.end - self.start).days + 1
+
+    @property
+    def days(self):
+        return [self.start + timedelta(days=i) for i in range(self.days_count)]
+
+    def indices(self, dates):
+        return [(d - self.start).days for d in dates]
+
+    @property
+    def prev_off(self):
+        return {p: 1 if self.prev_shift[p] == '' else 0 for p in self.staff}
+
+    @property
+    def prev_early(self):
+        return {p: 1 if SHIFT_KINDS.get(self.prev_shift[p]) == 'early' else 0 for p in self.staff}
+
+    @property
+    def prev_late(self):
+        return {p: 1 if SHIFT_KINDS.get(self.prev_shift[p]) == 'late' else 0 for p in self.staff}
+
+    def to_dict(self):
+        return json.loads(json.dumps(asdict(self), default=str))
+
+    @classmethod
+    def from_dict(cls, data, base_dir=''):
+        """Inverse of to_dict(); "roster" may also be the path of a roster CSV/JSON (relative to base_dir)."""
+        data = dict(data)
+        if isinstance(data.get('roster'), str):
+            data['roster'] = load_roster(os.path.join(base_dir, data['roster']))
+        return cls(**data)
+
+    def key(self):
+        payload = json.dumps(self.to_dict(), sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
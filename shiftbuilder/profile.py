@@ -0,0 +1,97 @@
+"""Where the time of a solve goes: model size and build time per rule group, solver statistics.
+
+    result = solve(problem, profile=True)
+    result.profile.groups     # {'max_work': {'rows': 217, 'cols': 0, 'nnz': 1519, 'time': 0.0003}, ...}
+    result.profile.nodes, result.profile.lp_iterations, result.profile.root_gap, result.profile.first_incumbent
+
+Build time per group is the time since the previous block of rows or
+columns was added, i.e. computing and adding that rule family.  The root
+gap compares the bound after the root node with the final objective.
+Every profiled solve is also logged as one JSON line on the
+'shiftbuilder.profile' logger (INFO).
+"""
+import json
+import logging
+import re
+from dataclasses import asdict, dataclass, field, fields
+
+import numpy as np
+
+log = logging.getLogger('shiftbuilder.profile')
+
+
+@dataclass
+class Profile:
+    backend: str
+    groups: dict = field(default_factory=dict)
+    build_time: float = 0.0
+    solve_time: float = 0.0
+    status: str = ''
+    objective: float = None
+    nodes: int = None
+    lp_iterations: int = None
+    root_bound: float = None  # objective bound after the root node
+    first_incumbent: float = None  # seconds from the solver start to the first schedule
+
+    @property
+    def root_gap(self):
+        if self.root_bound is None or self.objective is None:
+            return None
+        return abs(self.root_bound - self.objective) / max(abs(self.objective), 1.0)
+
+    def to_dict(self):
+        return {**asdict(self), 'root_gap': self.root_gap}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Inverse of to_dict(); computed keys such as root_gap are ignored."""
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in names})
+
+    def observe_highs(self, callback_type, out, data_in=None):
+        """Feed a HiGHS MIP callback (improving solution / interrupt)."""
+        import highspy
+
+        kind = highspy.cb.HighsCallbackType
+        if callback_type == kind.kCallbackMipImprovingSolution and self.first_incumbent is None:
+            self.first_incumbent = out.running_time
+        if out.mip_node_count == 0 and np.isfinite(out.mip_dual_bound):
+            self.root_bound = out.mip_dual_bound
+
+    def read_highs(self, h):
+        info = h.getInfo()
+        self.nodes = int(info.mip_node_count)
+        self.lp_iterations = int(info.simplex_iteration_count)
+
+    def observe_cpsat(self, callback):
+        """Feed a CP-SAT solution callback."""
+        if self.first_incumbent is None:
+            self.first_incumbent = callback.wall_time
+
+    def read_cpsat(self, solver):
+        self.nodes = int(solver.num_branches)
+        self.lp_iterations = int(solver.response_proto.num_lp_iterations)
+
+    def read_cbc(self, lines, sign=1):
+        """Statistics from a CBC log; sign -1 for maximization (CBC logs the minimized objective)."""
+        for line in lines:
+            if self.first_incumbent is None:
+                found = _CBC_INCUMBENT.search(line)
+                if found:
+                    self.first_incumbent = float(found.group(1))
+            for pattern, name in ((_CBC_NODES, 'nodes'), (_CBC_ITERATIONS, 'lp_iterations')):
+                found = pattern.search(line)
+                if found:
+                    setattr(self, name, int(found.group(1)))
+            found = _CBC_ROOT.search(line)
+            if found:
+                self.root_bound = sign * float(found.group(1))
+
+    def log(self):
+        log.info(json.dumps({'event': 'solve', **self.to_dict()}, ensure_ascii=False, default=str))
+
+
+_CBC_INCUMBENT = re.compile(r'Cbc00(?:04|12)I Integer solution of .*\(([\d.]+) seconds\)')
+_CBC_NODES = re.compile(r'Enumerated nodes:\s+(\d+)')
+_CBC_ITERATIONS = re.compile(r'Total iterations:\s+(\d+)')
+_CBC_ROOT = re.compile(r'Cuts at root node changed objective from \S+ to (\S+)')
@@ -0,0 +1,131 @@
+import dataclasses
+import math
+import time
+
+import numpy as np
+
+from .roster import SHIFT_KINDS
+from .schedule import Schedule
+from .solver import ShiftResult, solve
+
+
+def _floor_share(total, part, whole):
+    return max(0, math.floor(total * part / whole))
+
+
+def _ceil_share(total, part, whole):
+    return max(0, math.ceil(total * part / whole))
+
+
+def _round_share(total, part, whole):
+    return max(0, round(total * part / whole))
+
+
+def _carry(state, codes):
+    """Advance prev_shift / prev_consec_* of one person over committed shift codes."""
+    shift, work, rest = state
+    for s in codes:
+        if s == '':
+            work, rest = 0, rest + 1
+        else:
+            work, rest = work + 1, 0
+        shift = s
+    return shift, work, rest
+
+
+def _block(problem, days, i, end, last, commit_days, state, used, used_d):
+    """Sub-problem for days[i..end] with the carried state and its share of the totals."""
+    length, remaining = end - i + 1, len(days) - i
+    cheer = set(problem.cheer_days)
+    block_cheer = sum(1 for d in days[i:end + 1] if d in cheer)
+    remaining_cheer = sum(1 for d in days[i:] if d in cheer)
+
+    def split(total, key, share):
+        return {p: total[p] - used[p][key] if last else share(total[p] - used[p][key], length, remaining)
+                for p in total}
+
+    staff = problem.staff
+    return dataclasses.replace(
+        problem,
+        start=days[i],
+        end=days[end],
+        commit_days=0 if last else commit_days,
+        prev_shift={p: state[p][0] for p in staff},
+        prev_consec_work={p: state[p][1] for p in staff},
+        prev_consec_rest={p: state[p][2] for p in staff},
+        rest_days=split(problem.rest_days, 'off', _round_share),
+        onekin_max=split(problem.onekin_max, 'one_kin', _ceil_share),
+        early_min=split(problem.early_min, 'early', _round_share),
+        early_max=split(problem.early_max, 'early', _round_share),
+        late_min=split(problem.late_min, 'late', _round_share),
+        late_max=split(problem.late_max, 'late', _round_share),
+        mid_min=split(problem.mid_min, 'mid', _round_share),
+        mid_max=split(problem.mid_max, 'mid', _round_share),
+        support_d_days=(problem.support_d_days - used_d if last or not remaining_cheer
+                        else _round_share(problem.support_d_days - used_d, block_cheer, remaining_cheer)),
+    )
+
+
+def solve_rolling(problem, commit_days=14, lookahead=7, **kwargs):
+    """Solve a long period as overlapping blocks of commit_days + lookahead days.
+
+    Each block starts from the state left by the committed days before it
+    (same information as the prev_* inputs); period totals are shared out
+    in proportion to the block length, and the last block gets exactly what
+    is left.  Blocks are cached/solved through solve(), kwargs go there.
+    """
+    if problem.days_count <= commit_days + lookahead:
+        return solve(problem, **kwargs)
+
+    days = problem.days
+    staff = problem.staff
+    support = problem.roster.support
+    state = {p: (problem.prev_shift[p], problem.prev_consec_work[p], problem.prev_consec_rest[p]) for p in staff}
+    used = {p: {'off': 0, 'early': 0, 'late': 0, 'mid': 0, 'one_kin': 0} for p in staff}
+    used_d = 0
+    pieces = []
+    result = ShiftResult(status="Optimal", days=days)
+    t0 = time.perf_counter()
+    i = 0
+    while i < len(days):
+        ahead = lookahead
+        while True:
+            # The last block takes the exact remaining totals; never leave it shorter than one block.
+            last = len(days) - (i + commit_days) < commit_days + ahead
+            end = len(days) - 1 if last else i + commit_days + ahead - 1
+            block = solve(_block(problem, days, i, end, last, commit_days, state, used, used_d), **kwargs)
+            if block.optimal or last:
+                break
+            # Rounded shares can be too tight for a block; look further ahead.
+            ahead *= 2
+        result.solve_time = time.perf_counter() - t0
+        if not block.optimal:
+            result.status = block.status
+            return result
+
+        commit = end - i + 1 if last else commit_days
+        length = end - i + 1
+        pieces.append(block.shift.codes[:, :commit])
+        for p in staff:
+            row = block.shift.person(p)
+            codes = row[:commit]
+            kinds = [SHIFT_KINDS[s or 'off'] for s in codes]
+            u = used[p]
+            for kind in ('off', 'early', 'late', 'mid'):
+                u[kind] += kinds.count(kind)
+            # 1勤: worked with an off (or no input, as in the model) on both sides
+            before = state[p][0] == ''
+            for d in range(commit):
+                after = d + 1 < length and row[d + 1] == ''
+                if codes[d] != '' and before and after and i + d < len(days) - 1:
+                    u['one_kin'] += 1
+                before = codes[d] == ''
+            state[p] = _carry(state[p], codes)
+        used_d += sum(block.shift.person(p)[:commit].count('D') for p in support)
+        i += commit
+
+    result.shift = Schedule(np.concatenate(pieces, axis=1), block.shift.persons)
+    priority = sorted(set(problem.indices(problem.three_person_priority)))
+    result.objective = float((result.shift.codes[:, priority] != 0).sum())
+    result.key = problem.key()
+    return result
@@ -0,0 +1,157 @@
+import csv
+import json
+from dataclasses import asdict, dataclass, field, fields
+
+# What every shift code means for the daily coverage and balance rules
+SHIFT_KINDS = {'As': 'early', 'A': 'early', 'C': 'mid', 'D': 'mid', 'E': 'late', 'F': 'late', 'off': 'off'}
+SPECIAL_LATE = 'E'  # late shift on Sundays/holidays
+NORMAL_LATE = 'F'   # late shift on all other days
+
+
+@dataclass
+class Person:
+    id: str
+    name: str = ''
+    shifts: list = field(default_factory=lambda: ['A', 'C', 'E', 'F', 'off'])
+    role: str = 'staff'  # 'support': 応援 pseudo-person, works on 応援 days only
+    rest_days: int = 9
+    onekin_max: int = 2
+    must_off: list = field(default_factory=list)
+    early_min: int = 8
+    early_max: int = 13
+    late_min: int = 8
+    late_max: int = 13
+    mid_min: int = 2
+    mid_max: int = 4
+    cheer_shift: str = ''  # shift fixed on 応援 days (小野: 'As')
+    cheer_pool: bool = False  # on 応援 days works only opposite a support 'D' (宮村/廣内)
+    mix_late: bool = True  # 3 consecutive work days also need a late shift
+    campaign: str = ''  # on two-person キャンペーン days: 'late' takes F, 'early' works early
+
+    def __post_init__(self):
+        self.id = str(self.id)
+        self.name = self.name or self.id
+        self.shifts = list(self.shifts)
+        if 'off' not in self.shifts:
+            self.shifts.append('off')
+        unknown = [s for s in self.shifts if s not in SHIFT_KINDS]
+        if unknown:
+            raise ValueError(f"{self.id}: 不明なシフト {unknown}")
+        if self.cheer_shift and self.cheer_shift not in self.shifts:
+            raise ValueError(f"{self.id}: 応援日シフト {self.cheer_shift} が勤務可能シフトにありません")
+        if self.campaign == 'late' and NORMAL_LATE not in self.shifts:
+            raise ValueError(f"{self.id}: キャンペーン遅番には {NORMAL_LATE} が必要です")
+        if self.role not in ('staff', 'support'):
+            raise ValueError(f"{self.id}: role は staff か support です")
+
+    def codes(self, kind):
+        return [s for s in self.shifts if SHIFT_KINDS[s] == kind]
+
+
+@dataclass
+class Roster:
+    persons: list
+    # Daily coverage (min, max) per shift kind and for all workers
+    early: tuple = (1, 1)
+    late: tuple = (1, 1)
+    mid: tuple = (0, 1)
+    workers: tuple = (2, 3)
+    max_consec_work: int = 4
+    max_consec_rest: int = 3
+
+    def __post_init__(self):
+        self.persons = [p if isinstance(p, Person) else Person(**p) for p in self.persons]
+        for name in ('early', 'late', 'mid', 'workers'):
+            setattr(self, name, tuple(int(v) for v in getattr(self, name)))
+        ids = self.ids
+        if len(set(ids)) != len(ids):
+            raise ValueError("スタッフIDが重複しています")
+
+    @property
+    def ids(self):
+        return [p.id for p in self.persons]
+
+    @property
+    def staff(self):
+        return [p.id for p in self.persons if p.role == 'staff']
+
+    @property
+    def support(self):
+        return [p.id for p in self.persons if p.role == 'support']
+
+    @property
+    def shifts(self):
+        return {p.id: p.shifts for p in self.persons}
+
+    @property
+    def names(self):
+        return {p.id: p.name for p in self.persons}
+
+    def __getitem__(self, pid):
+        for p in self.persons:
+            if p.id == pid:
+                return p
+        raise KeyError(pid)
+
+    def to_dict(self):
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+
+def default_roster():
+    """The 新宿店 team the app was written for."""
+    return Roster(persons=[
+        Person('ono', '小野', ['As', 'E', 'F', 'off'], onekin_max=0, mid_min=0, mid_max=0,
+               cheer_shift='As', mix_late=False, campaign='late'),
+        Person('miya', '宮村', ['A', 'C', 'E', 'F', 'off'], cheer_pool=True, campaign='early'),
+        Person('hiro', '廣内', ['A', 'C', 'E', 'F', 'off'], cheer_pool=True, campaign='early'),
+        Person('support', '応援', ['D', 'E', 'F', 'off'], role='support'),
+    ])
+
+
+_BOOL = {'1': True, 'true': True, 'yes': True, 'y': True, '0': False, 'false': False, 'no': False, 'n': False, '': False}
+
+
+def _person_from_row(row):
+    types = {f.name: f.type for f in fields(Person)}
+    kwargs = {}
+    for key, value in row.items():
+        if key is None or value is None or key not in types or value.strip() == '':
+            continue
+        value = value.strip()
+        if key in ('shifts', 'must_off'):
+            kwargs[key] = value.replace(';', ' ').replace('|', ' ').replace(',', ' ').split()
+        elif types[key] in (int, 'int'):
+            kwargs[key] = int(value)
+        elif types[key] in (bool, 'bool'):
+            kwargs[key] = _BOOL[value.lower()]
+        else:
+            kwargs[key] = value
+    return Person(**kwargs)
+
+
+def load_roster(path_or_file, fmt=None):
+    """Load a roster from JSON ({"persons": [...], rules...}) or CSV (one person per row).
+
+    CSV columns are the Person fields; list columns (shifts, must_off) are
+    separated by spaces, ';' or '|'. Daily rules keep their defaults for CSV.
+    """
+    if hasattr(path_or_file, 'read'):
+        text = path_or_file.read()
+        name = getattr(path_or_file, 'name', '')
+    else:
+        name = str(path_or_file)
+        with open(name, encoding='utf-8-sig') as f:
+            text = f.read()
+    if isinstance(text, bytes):
+        text = text.decode('utf-8-sig')
+    fmt = fmt or ('json' if name.lower().endswith('.json') or text.lstrip().startswith(('{', '[')) else 'csv')
+    if fmt == 'json':
+        data = json.loads(text)
+        if isinstance(data, list):
+            data = {'persons': data}
+        return Roster.from_dict(data)
+    return Roster(persons=[_person_from_row(row) for row in csv.DictReader(text.splitlines())])
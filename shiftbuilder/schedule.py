@@ -0,0 +1,75 @@
+"""Compact schedule: one int8 shift code per person and day.
+
+    schedule.codes           # persons x days, indices into CODES (0 = off)
+    schedule[d]              # {person: code} of day d, '' for off
+    schedule.person(p)       # [code, ...] of p over the period
+
+A month for the default roster is 124 bytes instead of 31 dicts of
+strings; tables, stats and exports read the array directly.
+"""
+import hashlib
+
+import numpy as np
+
+from .roster import SHIFT_KINDS
+
+CODES = [''] + [s for s in SHIFT_KINDS if s != 'off']
+_LABELS = np.array(CODES, dtype=object)
+
+
+class Schedule:
+    def __init__(self, codes, persons):
+        self.codes = np.asarray(codes, dtype=np.int8)
+        self.persons = list(persons)
+        self._row = {p: i for i, p in enumerate(self.persons)}
+        self._digest = None
+
+    @classmethod
+    def from_dict(cls, shift, days_count, persons):
+        """From the {day index: {person: code}} form ('' or missing for off)."""
+        index = {s: i for i, s in enumerate(CODES)}
+        index['off'] = 0
+        values = (index[shift[d].get(p, '')] for p in persons for d in range(days_count))
+        return cls(np.fromiter(values, np.int8, len(persons) * days_count).reshape(len(persons), days_count), persons)
+
+    @property
+    def days_count(self):
+        return self.codes.shape[1]
+
+    def __len__(self):
+        return self.days_count
+
+    def __getitem__(self, d):
+        return dict(zip(self.persons, _LABELS[self.codes[:, d]].tolist()))
+
+    def __eq__(self, other):
+        return (isinstance(other, Schedule) and self.persons == other.persons
+                and np.array_equal(self.codes, other.codes))
+
+    def __repr__(self):
+        return f"Schedule({len(self.persons)} persons x {self.days_count} days)"
+
+    def digest(self):
+        """sha256 of the persons and codes; equal schedules have equal digests."""
+        if self._digest is None:
+            h = hashlib.sha256('\t'.join(self.persons).encode('utf-8'))
+            h.update(np.asarray(self.codes.shape, dtype=np.int64).tobytes())
+            h.update(self.codes.tobytes())
+            self._digest = h.hexdigest()
+        return self._digest
+
+    def rows(self, persons):
+        """codes of the given persons, in that order."""
+        return self.codes[[self._row[p] for p in persons]]
+
+    def labels(self, persons=None):
+        """persons x days array of code strings."""
+        codes = self.codes if persons is None else self.rows(persons)
+        return _LABELS[codes]
+
+    def person(self, p):
+        return self.labels([p])[0].tolist()
+
+    def to_dict(self):
+        labels = self.labels().T.tolist()
+        return {d: dict(zip(self.persons, labels[d])) for d in range(self.days_count)}
@@ -0,0 +1,260 @@
+"""Schedule several stores/departments that share one support pool.
+
+    python -m shiftbuilder sites sites.json [--workers 4] [--out shifts.csv]
+
+sites.json holds the common inputs, one entry per site with its name and
+the ShiftProblem fields it changes, and the pool's capacity:
+
+    {"base": {"start": "2025-08-16", "end": "2025-09-15", ...},
+     "capacity": 2,
+     "sites": [{"name": "新宿店", "roster": "shinjuku_roster.csv"},
+               {"name": "池袋店", "cheer_days": [...], "support_d_days": 6}]}
+
+Every site keeps its own support pseudo-person and rules.  The pool has
+`capacity` people for the support 'D' shift a day (an int, or
+{date: int} where unlisted dates are unlimited), so the sites' 'D' days
+are what they compete for.
+
+The sites are solved separately, in parallel processes.  The capacity
+rows are the only link between them and are priced in (Lagrangian
+relaxation): a site pays prices[date] of its objective for a 'D' on
+that date, and prices rise on the dates the sites overbook (subgradient
+steps).  Whenever the sites' 'D' days fit the pool the schedules are a
+solution; otherwise the sites that overbook a date are closed for it and
+re-solved until they fit.  The prices also give an upper bound on the
+joint objective, so result.gap says how far the best solution can be
+from the optimum.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from .batch import scenario_problems
+from .model import build_matrix
+from .problem import ShiftProblem, to_date
+from .roster import load_roster
+from .schedule import CODES
+from .solver import BACKENDS, available_backends
+from .tables import shift_rows, to_csv
+
+D = CODES.index('D')
+
+
+@dataclass
+class SitesResult:
+    status: str
+    results: dict = field(default_factory=dict)  # site -> ShiftResult
+    objective: float = None  # sum of the sites' objectives
+    bound: float = None  # no joint schedule does better (None: a site was not solved to optimality)
+    prices: dict = field(default_factory=dict)  # date -> price of a 'D' on that date
+    usage: dict = field(default_factory=dict)  # date -> support 'D' shifts over all sites
+    iterations: int = 0
+    solves: int = 0  # site solves, repairs included
+    solve_time: float = 0.0
+
+    @property
+    def optimal(self):
+        return self.status == 'Optimal'
+
+    @property
+    def gap(self):
+        if self.objective is None or self.bound is None:
+            return None
+        return max(self.bound - self.objective, 0.0) / max(abs(self.objective), 1.0)
+
+
+def d_days(problem, result):
+    """{date: support 'D' count} of one site's schedule."""
+    support = problem.roster.support
+    if not result.shift or not support:
+        return {}
+    counts = (result.shift.rows(support) == D).sum(axis=0).tolist()
+    return {day: n for day, n in zip(result.days, counts) if n}
+
+
+def _usage(results):
+    usage = {}
+    for problem, result in results.values():
+        for day, n in d_days(problem, result).items():
+            usage[day] = usage.get(day, 0) + n
+    return usage
+
+
+def _solve_site(problem, prices, closed, backend, time_limit):
+    """One site with a price per 'D' date and no 'D' at all on the closed dates."""
+    m = build_matrix(problem)
+    support = [i for i, p in enumerate(m.ids) if p in problem.roster.support]
+    if support and 'D' in m.X:
+        cols = m.X['D'][support]
+        days = {day: d for d, day in enumerate(problem.days)}
+        for day, price in prices.items():
+            if day in days and price:
+                m.add_objective(cols[:, days[day]], -price)
+        shut = [days[day] for day in closed if day in days]
+        if shut:
+            m.fix(cols[:, shut].ravel(), 0)
+    result = BACKENDS[backend](problem, m, time_limit)
+    if result.objective is not None:
+        # the objective without the price of its 'D' days
+        result.objective = round(result.objective + sum(prices.get(day, 0) * n
+                                                        for day, n in d_days(problem, result).items()), 6)
+    return result
+
+
+def solve_sites(sites, capacity, backend='cbc', time_limit=300, workers=None, iterations=20, step=1.0, gap=1e-6):
+    """Solve {name: ShiftProblem} with at most capacity 'D' shifts a day over all sites.
+
+    capacity is an int for every day or {date: int}.  At most `iterations`
+    price updates; the run stops early once result.gap <= gap.  step scales
+    the subgradient steps (step / iteration per overbooked 'D').  A site is
+    only solved again when the prices of its 応援 days changed.  workers
+    defaults to the number of CPUs; workers=1 solves in this process.
+    """
+    if isinstance(capacity, dict):
+        capacity = {to_date(day): int(n) for day, n in capacity.items()}
+
+    def limit(day):
+        return capacity.get(day) if isinstance(capacity, dict) else int(capacity)
+
+    names = list(sites)
+    t0 = time.perf_counter()
+    result = SitesResult(status='Not Solved')
+    prices = {}
+    workers = min(workers or os.cpu_count() or 1, len(names)) or 1
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+    def site_prices(name):
+        return {day: prices[day] for day in sites[name].cheer_days if day in prices}
+
+    def run(todo, closed):
+        """Solve the named sites at the current prices; {name: (problem, ShiftResult)}."""
+        args = {n: (sites[n], site_prices(n), sorted(closed.get(n, ())), backend, time_limit) for n in todo}
+        result.solves += len(args)
+        if pool is None:
+            return {n: (sites[n], _solve_site(*a)) for n, a in args.items()}
+        futures = {n: pool.submit(_solve_site, *a) for n, a in args.items()}
+        return {n: (sites[n], f.result()) for n, f in futures.items()}
+
+    solved, seen = {}, {}
+    try:
+        for k in range(1, iterations + 1):
+            result.iterations = k
+            todo = [n for n in names if n not in solved or seen[n] != site_prices(n)]
+            solved.update(run(todo, {}))
+            seen.update({n: site_prices(n) for n in todo})
+            failed = [n for n, (_, r) in solved.items() if not r.optimal]
+            if failed:
+                # A site without a schedule has none at any price either.
+                result.status = solved[failed[0]][1].status
+                result.results = {n: r for n, (_, r) in solved.items()}
+                break
+            if all(r.proven for _, r in solved.values()):
+                bound = sum(r.objective - sum(prices.get(day, 0) * n for day, n in d_days(p, r).items())
+                            for p, r in solved.values())
+                bound += sum(price * limit(day) for day, price in prices.items())
+                # objectives count workers, so whole numbers
+                bound = float(math.floor(bound + 1e-6))
+                result.bound = bound if result.bound is None else min(result.bound, bound)
+
+            usage = _usage(solved)
+            over = [day for day, n in usage.items() if limit(day) is not None and n > limit(day)]
+            candidate = _repair(solved, run, limit) if over else solved
+            if candidate is not None:
+                objective = sum(r.objective for _, r in candidate.values())
+                if result.objective is None or objective > result.objective:
+                    result.status = 'Optimal'
+                    result.objective = objective
+                    result.results = {n: r for n, (_, r) in candidate.items()}
+                    result.usage = _usage(candidate)
+            if result.gap is not None and result.gap <= gap:
+                break
+
+            # subgradient step: up where overbooked, down (to 0) where the pool is idle
+            for day in set(prices) | set(usage):
+                if limit(day) is not None:
+                    move = step / k * (usage.get(day, 0) - limit(day))
+                    prices[day] = max(prices.get(day, 0.0) + move, 0.0)
+            prices = {day: price for day, price in prices.items() if price > 0}
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    result.prices = prices
+    result.solve_time = time.perf_counter() - t0
+    return result
+
+
+def _repair(solved, run, limit):
+    """Close overbooked dates for all but the first sites using them until the pool suffices (None: no fit)."""
+    solved = dict(solved)
+    closed = {}
+    while True:
+        taken = {}
+        reopen = set()
+        for name, (problem, result) in solved.items():
+            for day, n in d_days(problem, result).items():
+                cap = limit(day)
+                if cap is None:
+                    continue
+                if taken.get(day, 0) + n > cap:
+                    closed.setdefault(name, set()).add(day)
+                    reopen.add(name)
+                else:
+                    taken[day] = taken.get(day, 0) + n
+        if not reopen:
+            return solved
+        solved.update(run(sorted(reopen), closed))
+        if not all(r.optimal for _, r in solved.values()):
+            return None
+
+
+def load_sites(path):
+    """({name: ShiftProblem}, capacity) from a sites JSON file; a site's "roster" may be a file path."""
+    with open(path, encoding='utf-8') as f:
+        config = json.load(f)
+    base_dir = os.path.dirname(path)
+    base = ShiftProblem.from_dict(config.get('base', {}), base_dir)
+    sites = []
+    for site in config.get('sites', []):
+        site = dict(site)
+        if isinstance(site.get('roster'), str):
+            site['roster'] = load_roster(os.path.join(base_dir, site['roster']))
+        sites.append(site)
+    return dict(scenario_problems(base, sites)), config.get('capacity', 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m shiftbuilder sites', description="複数店舗を共有応援枠で計算")
+    parser.add_argument('config', help="sites JSON")
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: CPU count)")
+    parser.add_argument('--backend', default='cbc', choices=available_backends())
+    parser.add_argument('--time-limit', type=int, default=300)
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--out', help="write all sites' shift tables as one CSV (default: stdout)")
+    args = parser.parse_args(argv)
+
+    sites, capacity = load_sites(args.config)
+    result = solve_sites(sites, capacity, backend=args.backend, time_limit=args.time_limit, workers=args.workers,
+                         iterations=args.iterations)
+    if not result.optimal:
+        print(f"シフト作成不可 ({result.status})", file=sys.stderr)
+        return 1
+    rows = [{'店舗': name, **row} for name, r in result.results.items() for row in shift_rows(sites[name], r)]
+    text = to_csv(rows)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8-sig', newline='') as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text)
+    gap = f", gap {result.gap:.2%}" if result.gap is not None else ''
+    print(f"{result.status}: objective {result.objective}{gap}, {result.iterations} iterations, "
+          f"{result.solve_time:.2f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""Rules as weighted preferences, re-weighted without building the model again.
+
+    session = SoftSession(problem, {'mid': 2, 'one_kin': 1}, backend='highs')
+    result = session.solve()
+    session.violations()                        # [{'ルール': '中番数の範囲', '人': ..., '違反': 1.0}, ...]
+    result = session.solve({'mid': 0.5, 'one_kin': 1})
+
+The weights are ShiftProblem.soft: every unit a rule of model.SOFT_RULES
+is violated by costs that many workers on a priority day, so solve() of
+the problem with those weights gives the same schedules.  The session
+builds the model and the solver's copy of it once, with slack columns
+for the rules of the first weights.  New weights only change the costs
+of the slack columns, and the solver restarts from the last schedule.
+A rule can be weighted 0 but not added later (that needs a new session).
+
+solve_soft(problem) keeps the last few sessions of the process.  Through
+the job queue, JobQueue.call(solve_soft, problem, ...,
+affinity=session_key(problem, backend)) sends the new weights to the
+worker that built the model, when it is free (see shiftbuilder.jobs);
+another worker builds the model again.
+"""
+import dataclasses
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pulp as lp
+
+from .model import build_matrix
+from .solver import cbc_result, cpsat_result, highs_model, highs_result, remember, to_pulp
+
+RULE_TITLES = {
+    'early': '早番数の範囲',
+    'late': '遅番数の範囲',
+    'mid': '中番数の範囲',
+    'one_kin': '1勤の上限',
+    'campaign': 'キャンペーン土曜',
+}
+SESSION_CACHE = 4
+_sessions = OrderedDict()
+
+
+class _Cbc:
+    def __init__(self, problem, m):
+        self.prob, self.cols = to_pulp(m, "Soft")
+        self.integer = m.integrality()
+
+    def set_cost(self, cost):
+        self.prob.setObjective(lp.LpAffineExpression([(self.cols[j], float(cost[j]))
+                                                      for j in np.flatnonzero(cost).tolist()]))
+
+    def solve(self, problem, m, time_limit, start):
+        if start is not None:
+            # Integer columns only: with the slacks in the MIP start CBC can stop at a worse schedule
+            for col, v, integer in zip(self.cols, start.tolist(), self.integer.tolist()):
+                col.varValue = v if integer else None
+        t0 = time.perf_counter()
+        status = self.prob.solve(lp.PULP_CBC_CMD(msg=0, timeLimit=time_limit, warmStart=start is not None))
+        result = cbc_result(problem, m, self.prob, self.cols, status, time.perf_counter() - t0)
+        return result, np.array([v.varValue or 0.0 for v in self.cols])
+
+
+class _Highs:
+    def __init__(self, problem, m):
+        self.h = highs_model(m)
+
+    def set_cost(self, cost):
+        self.h.changeColsCost(len(cost), np.arange(len(cost), dtype=np.int32), cost.astype(float))
+
+    def solve(self, problem, m, time_limit, start):
+        self.h.setOptionValue('time_limit', float(time_limit))
+        if start is not None:
+            self.h.setSolution(len(start), np.arange(len(start), dtype=np.int32), start)
+        t0 = time.perf_counter()
+        self.h.run()
+        result = highs_result(problem, m, self.h, time.perf_counter() - t0)
+        return result, np.asarray(self.h.getSolution().col_value)
+
+
+class _Cpsat:
+    def __init__(self, problem, m, automata=True):
+        from .cpsat import cpsat_model
+
+        self.model, self.var = cpsat_model(problem, m, automata=automata)
+        self.sense = m.sense
+
+    def _col(self, j):
+        return self.model.get_int_var_from_proto_index(int(self.var[j]))
+
+    def set_cost(self, cost):
+        from .cpsat import load_cp_model
+
+        cp_model = load_cp_model()
+
+        objective = [j for j in np.flatnonzero(cost).tolist() if self.var[j] >= 0]
+        expr = cp_model.LinearExpr.weighted_sum([self._col(j) for j in objective], cost[objective].tolist())
+        if self.sense < 0:
+            self.model.maximize(expr)
+        else:
+            self.model.minimize(expr)
+
+    def solve(self, problem, m, time_limit, start):
+        from .cpsat import load_cp_model
+
+        cp_model = load_cp_model()
+
+        used = np.flatnonzero(self.var >= 0).tolist()
+        if start is not None:
+            self.model.clear_hints()
+            for j in used:
+                self.model.add_hint(self._col(j), int(round(start[j])))
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = float(time_limit)
+        t0 = time.perf_counter()
+        status = solver.solve(self.model)
+        result = cpsat_result(problem, m, solver, status, self.var, time.perf_counter() - t0)
+        values = np.zeros(m.num_cols)
+        if result.shift:
+            values[used] = [solver.value(self._col(j)) for j in used]
+        return result, values
+
+
+SESSIONS = {'cbc': _Cbc, 'highs': _Highs, 'cpsat': _Cpsat,
+            'cpsat_rows': lambda problem, m: _Cpsat(problem, m, automata=False)}
+
+
+class SoftSession:
+    """One model of problem with the rules of `weights` soft; see the module docstring."""
+
+    def __init__(self, problem, weights=None, backend='cbc', time_limit=300):
+        self.problem = problem if weights is None else dataclasses.replace(problem, soft=weights)
+        self.backend = backend
+        self.time_limit = time_limit
+        self.m = build_matrix(self.problem)
+        self.slack = {}
+        for rule, _, cols, *_ in self.m.slack:
+            self.slack[rule] = np.concatenate([self.slack.get(rule, np.zeros(0, np.int64)), cols])
+        self.base = self.m.cost()
+        for cols in self.slack.values():
+            self.base[cols] = 0.0
+        self.solver = SESSIONS[backend](self.problem, self.m)
+        self.values = None
+        self.result = None
+
+    @property
+    def rules(self):
+        return list(self.problem.soft)
+
+    def solve(self, weights=None, time_limit=None):
+        """Solve with new weights ({rule: weight}; rules left out keep theirs), from the last schedule."""
+        if weights is not None:
+            unknown = set(weights) - set(self.problem.soft)
+            if unknown:
+                raise ValueError(f"このセッションで緩和していないルールです: {', '.join(sorted(unknown))}")
+            self.problem = dataclasses.replace(self.problem, soft={**self.problem.soft, **weights})
+            cost = self.base.copy()
+            for rule, cols in self.slack.items():
+                cost[cols] = self.m.sense * self.problem.soft[rule]
+            self.solver.set_cost(cost)
+        result, values = self.solver.solve(self.problem, self.m, time_limit or self.time_limit,
+                                           self.values if self.result is not None and self.result.shift else None)
+        result.key = self.problem.key()
+        remember(result, self.backend, self.problem)
+        if result.shift:
+            self.values = values
+        self.result = result
+        return result
+
+    def violations(self):
+        """One dict per violated soft row of the last schedule: ルール, 人, 日付, 不足/超過 and 違反 (amount)."""
+        if self.result is None or not self.result.shift:
+            return []
+        names = self.problem.roster.names
+        rows = []
+        for rule, _, cols, persons, days, side in self.m.slack:
+            for j, p, d in zip(cols.tolist(), persons.tolist(), days.tolist()):
+                amount = round(float(self.values[j]), 3)
+                if amount > 1e-6:
+                    rows.append({'ルール': RULE_TITLES[rule], '人': names.get(p, '') if p is not None else '',
+                                 '日付': self.problem.days[d].strftime('%m/%d') if d >= 0 else '',
+                                 '向き': '不足' if side == 'lo' else '超過', '違反': amount})
+        return rows
+
+
+def session_key(problem, backend='cbc'):
+    """The same for problems whose SoftSession is the same: equal but for the weights of the same rules."""
+    return dataclasses.replace(problem, soft={}).key(), backend, tuple(problem.soft)
+
+
+def solve_soft(problem, backend='cbc', time_limit=300):
+    """(result, violations()) of problem with its soft weights, from a kept session when only the weights changed."""
+    key = session_key(problem, backend)
+    session = _sessions.pop(key, None)
+    if session is None:
+        session = SoftSession(problem, backend=backend, time_limit=time_limit)
+    _sessions[key] = session
+    while len(_sessions) > SESSION_CACHE:
+        _sessions.popitem(last=False)
+    result = session.solve(problem.soft, time_limit=time_limit)
+    return result, session.violations()
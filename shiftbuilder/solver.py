@@ -0,0 +1,328 @@
+import importlib.util
+import math
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import partial
+
+import numpy as np
+import pulp as lp
+
+from .model import build_matrix, shift_values
+from .profile import Profile
+from .schedule import CODES, Schedule
+from .store import default_store
+
+CACHE_SIZE = 32
+FIXED_OPTIMAL = 'Optimal (fixed days)'  # proven optimal for the days solve(..., fix_days=...) left free
+_cache = OrderedDict()
+
+
+@dataclass
+class ShiftResult:
+    status: str
+    shift: Schedule = None
+    days: list = field(default_factory=list)
+    objective: float = None
+    solve_time: float = 0.0
+    proven: bool = False
+    key: str = ''
+    profile: Profile = None  # solve(..., profile=True)
+
+    @property
+    def optimal(self):
+        """A schedule that keeps every rule; proven tells if no better one exists."""
+        return self.status in (lp.LpStatus[lp.LpStatusOptimal], FIXED_OPTIMAL)
+
+    def by_date(self):
+        return {day: self.shift[d] for d, day in enumerate(self.days)} if self.shift else {}
+
+
+def to_pulp(m, name="Shift"):
+    """Turn a MatrixModel into an LpProblem, one LpAffineExpression per row."""
+    cols = [lp.LpVariable(n, cat='Binary') if integer and upper == 1 else
+            lp.LpVariable(n, 0, upper, cat='Integer' if integer else 'Continuous')
+            for n, integer, upper in zip(m.col_names, m.integer, m.upper)]
+    for fixed, values in m.fixed:
+        for j, v in zip(fixed.tolist(), values.tolist()):
+            cols[j].lowBound = cols[j].upBound = v
+    prob = lp.LpProblem(name, lp.LpMaximize if m.sense < 0 else lp.LpMinimize)
+    cost = m.cost()
+    prob += lp.LpAffineExpression([(cols[j], float(cost[j])) for j in np.flatnonzero(cost).tolist()])
+    indptr, index, value, lo, hi = m.csr()
+    indptr, index, value, lo, hi = indptr.tolist(), index.tolist(), value.tolist(), lo.tolist(), hi.tolist()
+    for r, row_name in enumerate(m.row_names()):
+        start, end = indptr[r], indptr[r + 1]
+        expr = [(cols[j], v) for j, v in zip(index[start:end], value[start:end])]
+        if lo[r] == hi[r]:
+            prob.addConstraint(lp.LpConstraint(expr, lp.LpConstraintEQ, row_name, lo[r]))
+            continue
+        bounded = math.isfinite(lo[r]) and math.isfinite(hi[r])
+        if math.isfinite(lo[r]):
+            prob.addConstraint(lp.LpConstraint(expr, lp.LpConstraintGE, row_name + ('_lo' if bounded else ''), lo[r]))
+        if math.isfinite(hi[r]):
+            prob.addConstraint(lp.LpConstraint(expr, lp.LpConstraintLE, row_name + ('_hi' if bounded else ''), hi[r]))
+    return prob, cols
+
+
+def decode(m, values):
+    """Schedule of the chosen shift of every person/day in a column value vector."""
+    codes = list(m.X)
+    X = np.stack([m.X[s] for s in codes])
+    chosen = np.argmax(np.where(X >= 0, np.asarray(values)[X], -np.inf), axis=0)
+    lookup = np.array([CODES.index('' if s == 'off' else s) for s in codes], dtype=np.int8)
+    return Schedule(lookup[chosen], m.ids)
+
+
+def _solve_cbc(problem, m, time_limit, start=None, gap=None, probe=None):
+    prob, cols = to_pulp(m)
+    if start is not None:
+        for j, v in zip(start[0].tolist(), start[1].tolist()):
+            cols[j].setInitialValue(v)
+    t0 = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, 'cbc.log') if probe is not None else None
+        status = prob.solve(lp.PULP_CBC_CMD(msg=0, timeLimit=time_limit, warmStart=start is not None, gapRel=gap,
+                                            logPath=log_path))
+        if probe is not None and os.path.exists(log_path):
+            with open(log_path) as f:
+                probe.read_cbc(f, -1 if m.sense < 0 else 1)
+    return cbc_result(problem, m, prob, cols, status, time.perf_counter() - t0, gap)
+
+
+def cbc_result(problem, m, prob, cols, status, solve_time, gap=None):
+    """ShiftResult of a finished prob.solve() with CBC."""
+    result = ShiftResult(status=lp.LpStatus[status], days=problem.days, solve_time=solve_time,
+                         proven=prob.sol_status == lp.LpSolutionInfeasible
+                         or prob.sol_status == lp.LpSolutionOptimal and not gap)
+    if status == lp.LpStatusOptimal:
+        result.shift = decode(m, [v.varValue or 0.0 for v in cols])
+        result.objective = lp.value(prob.objective) or 0.0
+    return result
+
+
+def highs_model(m):
+    import highspy
+
+    indptr, index, value, lo, hi = m.csr()
+    model = highspy.HighsLp()
+    model.num_col_ = m.num_cols
+    model.num_row_ = m.num_rows
+    model.sense_ = highspy.ObjSense.kMaximize if m.sense < 0 else highspy.ObjSense.kMinimize
+    model.col_cost_ = m.cost()
+    model.col_lower_, model.col_upper_ = m.bounds()
+    model.row_lower_ = np.where(np.isfinite(lo), lo, -highspy.kHighsInf)
+    model.row_upper_ = np.where(np.isfinite(hi), hi, highspy.kHighsInf)
+    model.a_matrix_.format_ = highspy.MatrixFormat.kRowwise
+    model.a_matrix_.num_col_ = m.num_cols
+    model.a_matrix_.num_row_ = m.num_rows
+    model.a_matrix_.start_ = indptr
+    model.a_matrix_.index_ = index
+    model.a_matrix_.value_ = value
+    model.integrality_ = [highspy.HighsVarType.kInteger if integer else highspy.HighsVarType.kContinuous
+                          for integer in m.integer]
+    h = highspy.Highs()
+    h.setOptionValue('output_flag', False)
+    h.passModel(model)
+    return h
+
+
+def _solve_highs(problem, m, time_limit, start=None, gap=None, probe=None):
+    h = highs_model(m)
+    h.setOptionValue('time_limit', float(time_limit))
+    if gap is not None:
+        h.setOptionValue('mip_rel_gap', float(gap))
+    if start is not None and len(start[0]):
+        h.setSolution(len(start[0]), start[0].astype(np.int32), start[1])
+    if probe is not None:
+        watch_highs(h, probe.observe_highs)
+    t0 = time.perf_counter()
+    h.run()
+    if probe is not None:
+        probe.read_highs(h)
+    return highs_result(problem, m, h, time.perf_counter() - t0, gap)
+
+
+def watch_highs(h, callback):
+    """Call callback(callback_type, out) on every improving solution and MIP interrupt check."""
+    import highspy
+
+    kind = highspy.cb.HighsCallbackType
+    h.setCallback(lambda callback_type, message, out, data_in, user_data: callback(callback_type, out, data_in), None)
+    h.startCallback(kind.kCallbackMipImprovingSolution)
+    h.startCallback(kind.kCallbackMipInterrupt)
+
+
+def highs_result(problem, m, h, solve_time, gap=None):
+    """ShiftResult of a finished (or interrupted) Highs run."""
+    import highspy
+
+    model_status = h.getModelStatus()
+    has_solution = h.getInfo().primal_solution_status == 2  # kSolutionStatusFeasible
+    infeasible = model_status == highspy.HighsModelStatus.kInfeasible
+    result = ShiftResult(status='Not Solved', days=problem.days, solve_time=solve_time,
+                         proven=infeasible or model_status == highspy.HighsModelStatus.kOptimal and not gap)
+    if infeasible:
+        result.status = 'Infeasible'
+    elif has_solution:
+        # Same convention as PuLP/CBC: a feasible schedule found before the time limit counts as 'Optimal'
+        result.status = 'Optimal'
+        values = np.asarray(h.getSolution().col_value)
+        result.shift = decode(m, values)
+        result.objective = round(h.getInfo().objective_function_value, 6)
+    return result
+
+
+def _solve_cpsat(problem, m, time_limit, start=None, gap=None, probe=None, automata=True):
+    from .cpsat import cpsat_model, load_cp_model
+
+    cp_model = load_cp_model()
+
+    model, var = cpsat_model(problem, m, start, automata)
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = float(time_limit)
+    if gap is not None:
+        solver.parameters.relative_gap_limit = float(gap)
+    t0 = time.perf_counter()
+    status = solver.solve(model, watch_cpsat(probe.observe_cpsat) if probe is not None else None)
+    if probe is not None:
+        probe.read_cpsat(solver)
+    return cpsat_result(problem, m, solver, status, var, time.perf_counter() - t0, gap)
+
+
+def watch_cpsat(callback):
+    """CP-SAT solution callback that calls callback(solution callback) on every improving solution."""
+    from .cpsat import load_cp_model
+
+    cp_model = load_cp_model()
+
+    class Watch(cp_model.CpSolverSolutionCallback):
+        def on_solution_callback(self):
+            callback(self)
+
+    return Watch()
+
+
+def cpsat_result(problem, m, solver, status, var, solve_time, gap=None):
+    """ShiftResult of a finished (or stopped) CP-SAT run; var maps matrix columns to CP-SAT variables."""
+    from .cpsat import load_cp_model
+
+    cp_model = load_cp_model()
+
+    infeasible = status == cp_model.INFEASIBLE
+    result = ShiftResult(status='Not Solved', days=problem.days, solve_time=solve_time,
+                         proven=infeasible or status == cp_model.OPTIMAL and not gap)
+    if infeasible:
+        result.status = 'Infeasible'
+    elif status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        result.status = 'Optimal'
+        values = np.zeros(m.num_cols)
+        used = var >= 0
+        values[used] = np.asarray(solver.response_proto.solution)[var[used]]
+        result.shift = decode(m, values)
+        result.objective = round(solver.objective_value, 6)
+    return result
+
+
+BACKENDS = {'cbc': _solve_cbc, 'highs': _solve_highs, 'cpsat': _solve_cpsat,
+            'cpsat_rows': partial(_solve_cpsat, automata=False)}
+
+
+def available_backends():
+    """The BACKENDS whose solver is installed, for choice lists.
+
+    Only looked up, not imported: OR-Tools alone takes longer to load than
+    a small solve.  requirements.txt pins a highspy and ortools that load
+    in one process; with others cpsat.load_cp_model() says so.
+    """
+    solvers = {'highs': 'highspy', 'cpsat': 'ortools', 'cpsat_rows': 'ortools'}
+    return [b for b in BACKENDS if b not in solvers or importlib.util.find_spec(solvers[b]) is not None]
+
+
+def solve(problem, time_limit=300, use_cache=True, backend='cbc', warm_start=None, fix_days=(), gap=None,
+          profile=False):
+    """Solve a ShiftProblem; identical inputs are answered from an in-process cache
+    and, when one is set up, the on-disk store (see shiftbuilder.store).
+
+    backend is 'cbc' (PuLP + CBC), 'highs' (the matrix passed straight to highspy)
+    'cpsat' (OR-Tools CP-SAT with the streak rules as automata, see shiftbuilder.cpsat)
+    or 'cpsat_rows' (CP-SAT with the matrix rows only).
+    warm_start is a previous ShiftResult used as MIP start; its assignments on
+    fix_days (dates) are fixed, which only searches the remaining days: the
+    result is then never proven, and status FIXED_OPTIMAL if it is the best
+    schedule with those days fixed.
+    gap stops at that relative MIP gap (e.g. 0.01) instead of proving optimality.
+    profile=True fills result.profile (see shiftbuilder.profile) and logs it;
+    a cached result keeps the profile of the run that produced it.
+    """
+    key = problem.key()
+    hit = cached(key, backend) if use_cache else None
+    if hit is not None:
+        return hit
+    t0 = time.perf_counter()
+    m = build_matrix(problem)
+    probe = Profile(backend, build_time=time.perf_counter() - t0) if profile else None
+    start = None
+    if warm_start is not None and warm_start.shift:
+        previous = warm_start.by_date()
+        start = shift_values(m, problem, previous)
+        if fix_days:
+            m.fix(*shift_values(m, problem, previous, set(fix_days)))
+    result = BACKENDS[backend](problem, m, time_limit, start, gap, probe)
+    result.key = key
+    if m.fixed:
+        # Optimal only for the free days; the full problem may do better.
+        if result.optimal and result.proven:
+            result.status = FIXED_OPTIMAL
+        result.proven = False
+    if probe is not None:
+        finish_profile(probe, m, result)
+    if use_cache:
+        remember(result, backend, problem)
+    return result
+
+
+def finish_profile(probe, m, result):
+    probe.groups = m.group_stats()
+    probe.solve_time, probe.status, probe.objective = result.solve_time, result.status, result.objective
+    result.profile = probe
+    probe.log()
+
+
+def cached(key, backend='cbc'):
+    """The cached result for a problem key, or None; misses are looked up in the store."""
+    result = _cache.get((key, backend))
+    if result is not None:
+        _cache.move_to_end((key, backend))
+        return result
+    store = default_store()
+    result = store.get(key, backend) if store is not None else None
+    if result is not None:
+        _put(result, backend)
+    return result
+
+
+def remember(result, backend='cbc', problem=None):
+    """Put a result solved elsewhere (e.g. in a worker process) into the cache.
+
+    With its problem the result is also written to the store.
+    """
+    # A time-limited run without a proof is not reproducible, so it is not cached.
+    if not result.proven or not result.key:
+        return
+    _put(result, backend)
+    store = default_store()
+    if store is not None and problem is not None:
+        store.put(problem, result, backend)
+
+
+def _put(result, backend):
+    _cache[(result.key, backend)] = result
+    while len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+
+
+def clear_cache():
+    _cache.clear()
@@ -0,0 +1,72 @@
+import numpy as np
+
+from .roster import SHIFT_KINDS
+from .schedule import CODES, Schedule
+
+KINDS = ['off', 'early', 'mid', 'late']  # index in the kind array, 0 = 休み
+STAT_NAMES = ['休日数', '最大連続休み', '最大連続勤務', '早番数', '遅番数', '中番数', '4連勤数', '3連休数', '1勤数',
+              '休み前シフト (早番率%)', '休み後シフト (遅番率%)']
+
+
+def kind_array(shift, days_count, persons):
+    """persons x days int8 array of KINDS indices ('' -> 0)."""
+    if isinstance(shift, Schedule):
+        lookup = np.array([KINDS.index(SHIFT_KINDS[s]) if s else 0 for s in CODES], dtype=np.int8)
+        return lookup[shift.rows(persons)[:, :days_count]]
+    index = {'': 0, **{s: KINDS.index(kind) for s, kind in SHIFT_KINDS.items()}}
+    values = (index[shift[d][p]] for p in persons for d in range(days_count))
+    return np.fromiter(values, np.int8, len(persons) * days_count).reshape(len(persons), days_count)
+
+
+def _runs(work):
+    """(row, value, length) of every run of equal values in the rows of a 0/1 array."""
+    n, days_count = work.shape
+    # a separator column (2) ends every row's last run
+    flat = np.concatenate([work.astype(np.int8), np.full((n, 1), 2, dtype=np.int8)], axis=1).ravel()
+    starts = np.concatenate([[0], np.flatnonzero(np.diff(flat)) + 1])
+    lengths = np.diff(np.append(starts, flat.size))
+    values = flat[starts]
+    real = values < 2
+    return starts[real] // (days_count + 1), values[real], lengths[real]
+
+
+def _percent(part, whole):
+    # int(part / whole * 100) per person, 0 without any case
+    rate = np.divide(part, whole, out=np.zeros(len(whole)), where=whole > 0) * 100
+    return rate.astype(int)
+
+
+def kind_stats(kinds):
+    """get_stats metrics for a persons x days kind array, one array per STAT_NAMES entry."""
+    n = kinds.shape[0]
+    work = kinds != 0
+    off = ~work
+
+    # 期間内だけの連続 (前日の連続は無視)
+    rows, values, lengths = _runs(work)
+    max_rest = np.zeros(n, dtype=int)
+    max_duty = np.zeros(n, dtype=int)
+    np.maximum.at(max_rest, rows[values == 0], lengths[values == 0])
+    np.maximum.at(max_duty, rows[values == 1], lengths[values == 1])
+    four_work = np.bincount(rows[(values == 1) & (lengths >= 4)], minlength=n)
+    three_rest = np.bincount(rows[(values == 0) & (lengths >= 3)], minlength=n)
+
+    # 1勤: 前後とも休み、開始日の前日・終了日の翌日は考慮しない
+    one_kin = (work[:, 1:-1] & off[:, :-2] & off[:, 2:]).sum(axis=1)
+
+    # 休み前/後: 期間内だけ（小数点以下切り捨て）
+    before = off[:, 1:] & work[:, :-1]
+    after = off[:, :-1] & work[:, 1:]
+    before_rate = _percent((before & (kinds[:, :-1] == 1)).sum(axis=1), before.sum(axis=1))
+    after_rate = _percent((after & (kinds[:, 1:] == 3)).sum(axis=1), after.sum(axis=1))
+
+    return [off.sum(axis=1), max_rest, max_duty, (kinds == 1).sum(axis=1), (kinds == 3).sum(axis=1),
+            (kinds == 2).sum(axis=1), four_work, three_rest, one_kin, before_rate, after_rate]
+
+
+def get_stats(shift, days_count, persons, prev_off, prev_early, prev_late):
+    staff = [p for p in persons if p in prev_off]  # staff only, not the support pseudo-person
+    if not staff:
+        return {}
+    columns = [column.tolist() for column in kind_stats(kind_array(shift, days_count, staff))]
+    return {p: {name: column[i] for name, column in zip(STAT_NAMES, columns)} for i, p in enumerate(staff)}
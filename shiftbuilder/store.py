@@ -0,0 +1,211 @@
+"""Solved schedules on disk, shared by every session, process and server worker.
+
+    set_store('shifts.db')                  # or SHIFTBUILDER_STORE=shifts.db
+    solve(problem)                          # answered from the store if any worker solved it before
+    store = default_store()
+    store.stats(problem.key())              # get_stats rows of the stored schedule
+    solve(problem, warm_start=store.seed(problem))   # start from the stored previous period
+
+One SQLite file, one row per (problem key, backend): the schedule codes as
+bytes, the stats rows, the solve metadata and the problem itself.  Only
+proven results are stored (see solver.remember), so a hit is the answer
+the solver would give again.  Rows are dropped least recently used first
+once the file holds more than max_bytes of them (or max_entries rows).
+SQLite serializes the writers, so any number of processes may share the
+file; each call opens its own connection, which also makes a store safe
+to use from threads.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+from dataclasses import asdict
+from datetime import timedelta
+
+import numpy as np
+
+from .problem import ShiftProblem, to_date
+from .profile import Profile
+from .schedule import Schedule
+
+STORE_ENV = 'SHIFTBUILDER_STORE'
+STORE_MAX_BYTES = 256 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT NOT NULL,
+    backend TEXT NOT NULL,
+    roster TEXT NOT NULL,
+    start TEXT NOT NULL,
+    end TEXT NOT NULL,
+    status TEXT NOT NULL,
+    objective REAL,
+    solve_time REAL NOT NULL,
+    proven INTEGER NOT NULL,
+    persons TEXT NOT NULL,
+    codes BLOB NOT NULL,
+    problem TEXT NOT NULL,
+    stats TEXT NOT NULL,
+    profile TEXT,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    used REAL NOT NULL,
+    PRIMARY KEY (key, backend)
+);
+CREATE INDEX IF NOT EXISTS results_used ON results (used);
+CREATE INDEX IF NOT EXISTS results_period ON results (roster, end);
+"""
+
+
+def roster_key(problem):
+    """sha256 of the roster alone: the periods of one store/team share it."""
+    payload = json.dumps(problem.to_dict()['roster'], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class SolutionStore:
+    def __init__(self, path, max_bytes=STORE_MAX_BYTES, max_entries=None):
+        self.path = os.fspath(path)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        with closing(self._connect()) as db, db:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.executescript(_SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, key, backend='cbc'):
+        """The stored ShiftResult of a problem key, or None."""
+        from .solver import ShiftResult
+
+        with closing(self._connect()) as db, db:
+            row = db.execute('SELECT start, end, status, objective, solve_time, proven, persons, codes, profile '
+                             'FROM results WHERE key = ? AND backend = ?', (key, backend)).fetchone()
+            if row is None:
+                return None
+            db.execute('UPDATE results SET used = ? WHERE key = ? AND backend = ?', (time.time(), key, backend))
+        start, end, status, objective, solve_time, proven, persons, codes, profile = row
+        problem_days = _days(start, end)
+        persons = persons.split('\t')
+        shift = Schedule(np.frombuffer(codes, dtype=np.int8).reshape(len(persons), len(problem_days)), persons)
+        return ShiftResult(status=status, shift=shift, days=problem_days, objective=objective,
+                           solve_time=solve_time, proven=bool(proven), key=key,
+                           profile=Profile.from_dict(json.loads(profile)) if profile else None)
+
+    def put(self, problem, result, backend='cbc'):
+        """Store a solved result of problem (replacing an earlier one) and evict down to the limits.
+
+        Results without a schedule (proven infeasible) are not stored.
+        """
+        from .tables import stats_rows
+
+        if not result.shift:
+            return
+        codes = result.shift.codes.tobytes()
+        text = json.dumps(problem.to_dict(), ensure_ascii=False, sort_keys=True)
+        stats = json.dumps(stats_rows(problem, result), ensure_ascii=False, default=float)
+        profile = json.dumps(asdict(result.profile), default=str) if result.profile is not None else None
+        size = len(codes) + len(text) + len(stats) + len(profile or '')
+        now = time.time()
+        with closing(self._connect()) as db, db:
+            db.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                       (result.key or problem.key(), backend, roster_key(problem), str(problem.days[0]),
+                        str(problem.days[-1]), result.status, result.objective, result.solve_time,
+                        int(result.proven), '\t'.join(result.shift.persons), codes, text, stats, profile, size,
+                        now, now))
+            self._evict(db)
+
+    def _evict(self, db):
+        count, total = db.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results').fetchone()
+        drop = 0
+        for (size,) in db.execute('SELECT size FROM results ORDER BY used'):
+            if total <= self.max_bytes and (self.max_entries is None or count - drop <= self.max_entries):
+                break
+            total -= size
+            drop += 1
+        if drop:
+            db.execute('DELETE FROM results WHERE rowid IN (SELECT rowid FROM results ORDER BY used LIMIT ?)',
+                       (drop,))
+
+    def stats(self, key, backend='cbc'):
+        """The stored get_stats rows (as tables.stats_rows), or None."""
+        with closing(self._connect()) as db:
+            row = db.execute('SELECT stats FROM results WHERE key = ? AND backend = ?', (key, backend)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def previous(self, problem):
+        """(ShiftProblem, ShiftResult) of the stored period of the same roster that ends the day before
+        problem starts, the most recently solved one if several do; None if there is none."""
+        end = str(problem.days[0] - timedelta(days=1))
+        with closing(self._connect()) as db:
+            row = db.execute('SELECT key, backend, problem FROM results WHERE roster = ? AND end = ? '
+                             'ORDER BY created DESC LIMIT 1', (roster_key(problem), end)).fetchone()
+        if row is None:
+            return None
+        key, backend, text = row
+        result = self.get(key, backend)
+        return (ShiftProblem.from_dict(json.loads(text)), result) if result is not None else None
+
+    def seed(self, problem):
+        """weekly_seed() of the stored previous period, None if there is none."""
+        found = self.previous(problem)
+        return weekly_seed(problem, found[1]) if found is not None else None
+
+    def __len__(self):
+        with closing(self._connect()) as db:
+            return db.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    @property
+    def size(self):
+        """Bytes of stored rows (the file itself is somewhat larger)."""
+        with closing(self._connect()) as db:
+            return db.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+
+    def clear(self):
+        with closing(self._connect()) as db, db:
+            db.execute('DELETE FROM results')
+
+
+def weekly_seed(problem, result):
+    """Warm start for problem from the period before it: each day takes the shifts
+    of the latest day of result on the same weekday."""
+    from .solver import ShiftResult
+
+    by_date, last = result.by_date(), result.days[-1]
+    days, shifts = [], []
+    for day in problem.days:
+        source = by_date.get(day - timedelta(weeks=-(-(day - last).days // 7)))
+        if source is not None:
+            days.append(day)
+            shifts.append(source)
+    persons = [p for p in problem.persons if p in result.shift.persons]
+    return ShiftResult(status=result.status, shift=Schedule.from_dict(shifts, len(days), persons), days=days)
+
+
+def _days(start, end):
+    first, last = to_date(start), to_date(end)
+    return [first + timedelta(days=d) for d in range((last - first).days + 1)]
+
+
+_store = None
+_store_path = None
+
+
+def set_store(store):
+    """Use a SolutionStore (or the path of one) for solve()'s cache; None turns it off."""
+    global _store, _store_path
+    if store is not None and not isinstance(store, SolutionStore):
+        store = SolutionStore(store)
+    _store, _store_path = store, store.path if store is not None else ''
+
+
+def default_store():
+    """The store set with set_store(), else one at $SHIFTBUILDER_STORE, else None."""
+    global _store, _store_path
+    if _store_path is None:
+        path = os.environ.get(STORE_ENV)
+        _store, _store_path = (SolutionStore(path) if path else None), path or ''
+    return _store
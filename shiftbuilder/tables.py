@@ -0,0 +1,35 @@
+"""The shift and stats tables shown by the app, as plain rows (no pandas)."""
+import csv
+import io
+
+from .stats import get_stats
+
+DAYS_ABBR = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+
+
+def shift_rows(problem, result):
+    """One dict per day: 日付, every person's shift under their name, 人数."""
+    names = [problem.roster.names[p] for p in problem.persons]
+    schedule = result.shift
+    labels = schedule.labels(problem.persons).T.tolist()
+    workers = (schedule.rows(problem.persons) != 0).sum(axis=0).tolist()
+    return [{'日付': f"{day.strftime('%m/%d')} ({DAYS_ABBR[day.weekday()]})", **dict(zip(names, labels[d])),
+             '人数': workers[d]}
+            for d, day in enumerate(result.days)]
+
+
+def stats_rows(problem, result):
+    """One dict per staff member: 人 and the get_stats metrics."""
+    stats = get_stats(result.shift, problem.days_count, problem.persons,
+                      problem.prev_off, problem.prev_early, problem.prev_late)
+    return [{'人': p, **values} for p, values in stats.items()]
+
+
+def to_csv(rows):
+    """CSV text of a list of dicts (UTF-8 with BOM when encoded, as the app's downloads)."""
+    out = io.StringIO()
+    if rows:
+        writer = csv.DictWriter(out, fieldnames=list(rows[0]), lineterminator='\n')
+        writer.writeheader()
+        writer.writerows(rows)
+    return out.getvalue()
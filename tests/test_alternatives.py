@@ -0,0 +1,34 @@
+import itertools
+
+import pytest
+
+from benchmarks.scenarios import default_problem
+from shiftbuilder import alternatives, solve
+
+
+def distance(a, b):
+    return int((a.shift.codes != b.shift.codes).sum())
+
+
+@pytest.mark.parametrize('backend', ['cbc', 'highs'])
+@pytest.mark.parametrize('min_distance', [1, 10])
+def test_alternatives_are_optimal_and_apart(backend, min_distance):
+    if backend == 'highs':
+        pytest.importorskip('highspy')
+    problem = default_problem()
+    results = alternatives(problem, k=3, min_distance=min_distance, backend=backend)
+    assert len(results) == 3
+    best = solve(problem, use_cache=False).objective
+    for result in results:
+        assert result.optimal
+        assert result.objective == pytest.approx(best)
+    for a, b in itertools.combinations(results, 2):
+        assert distance(a, b) >= min_distance
+
+
+def test_proven_first_is_kept():
+    problem = default_problem()
+    first = solve(problem, use_cache=False)
+    results = alternatives(problem, k=2, first=first)
+    assert results[0].shift == first.shift
+    assert distance(results[0], results[1]) >= problem.days_count
@@ -0,0 +1,23 @@
+import dataclasses
+
+import pytest
+
+from benchmarks.scenarios import default_problem
+from shiftbuilder import solve
+
+pytest.importorskip('ortools')
+
+
+@pytest.mark.parametrize('commit_days', [7, 14])
+@pytest.mark.parametrize('onekin_max', [0, 1])
+def test_soft_one_kin_with_commit_rows_matches_cbc(commit_days, onekin_max):
+    # A rolling block: the soft 'commit' one_kin rows next to the 'total' ones the automaton replaces
+    base = default_problem()
+    problem = dataclasses.replace(base, commit_days=commit_days, onekin_max=dict.fromkeys(base.onekin_max, onekin_max),
+                                  soft={'one_kin': 1.0})
+    cbc = solve(problem, use_cache=False)
+    assert cbc.proven
+    for backend in ('cpsat', 'cpsat_rows'):
+        result = solve(problem, backend=backend, use_cache=False)
+        assert result.proven
+        assert result.objective == pytest.approx(cbc.objective)
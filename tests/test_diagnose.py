@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from benchmarks.scenarios import default_problem
+from shiftbuilder import diagnose
+from shiftbuilder.diagnose import DEFINITIONS, is_infeasible
+from shiftbuilder.model import build_matrix
+
+INFEASIBLE = {
+    'must_off': default_problem(must_off={p: ['2025-08-16'] for p in ['ono', 'miya', 'hiro']}),
+    'early_min': default_problem(early_min=20),
+}
+
+
+def conflict_rows(problem, keys, conflict):
+    """Row mask of a Conflict: its group's rows on its days (all of them for a whole-period rule)."""
+    days = {problem.days.index(day) for day in conflict.days}
+    return np.array([key[:3] == (conflict.group, conflict.label, conflict.person) and (not days or key[3] in days)
+                     for key in keys], dtype=bool)
+
+
+@pytest.mark.parametrize('name', INFEASIBLE)
+def test_conflicts_are_minimal(name):
+    problem = INFEASIBLE[name]
+    diagnosis = diagnose(problem)
+    assert diagnosis.infeasible
+    m = build_matrix(problem)
+    keys = m.row_keys()
+    definitions = np.array([key[:2] in DEFINITIONS for key in keys], dtype=bool)
+    masks = [conflict_rows(problem, keys, c) for c in diagnosis.conflicts]
+    assert all(mask.any() for mask in masks)
+    assert is_infeasible(m.subset(np.logical_or.reduce([definitions] + masks)))
+    for i in range(len(masks)):
+        others = [mask for j, mask in enumerate(masks) if j != i]
+        assert not is_infeasible(m.subset(np.logical_or.reduce([definitions] + others)))
+
+
+def test_feasible_problem_has_no_conflicts():
+    assert not diagnose(default_problem()).infeasible
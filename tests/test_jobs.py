@@ -0,0 +1,43 @@
+import pytest
+
+from benchmarks.scenarios import default_problem, make_team_problem
+from shiftbuilder import JobQueue, clear_cache, solve
+
+
+@pytest.fixture
+def queue():
+    clear_cache()
+    queue = JobQueue(workers=1)
+    yield queue
+    queue.shutdown()
+    clear_cache()
+
+
+def test_same_scenario_shares_one_job(queue):
+    problem = make_team_problem(10)
+    first, second = queue.submit(problem), queue.submit(problem)
+    assert first._job is second._job
+    assert len(queue) == 1
+    assert queue.submit(problem, backend='highs')._job is not first._job
+    result = first.wait()
+    assert second.wait() is result
+    assert result.objective == pytest.approx(solve(problem, use_cache=False).objective)
+    # solved: the next submission is a cache hit, not a job
+    assert queue.submit(problem).status == 'done'
+
+
+def test_cancel_while_queued_and_submit_again(queue):
+    running = queue.submit(make_team_problem(10))  # keeps the only worker busy
+    problem = default_problem()
+    first, second = queue.submit(problem), queue.submit(problem)
+    assert first.status == second.status == 'queued'
+    assert first.position == 1
+    first.cancel()
+    assert first.status == 'cancelled' and first.wait().status == 'Cancelled'
+    assert second.status == 'queued'  # another ticket still waits for the job
+    second.cancel()
+    assert len(queue) == 1 and second.position == 0
+    again = queue.submit(problem)
+    assert again._job is not first._job and again.status == 'queued'
+    assert again.wait().proven
+    assert running.wait().proven
@@ -0,0 +1,32 @@
+import dataclasses
+
+import pulp as lp
+import pytest
+
+from benchmarks.baseline import build_model
+from benchmarks.scenarios import default_problem, make_problem
+from shiftbuilder import solve
+
+CASES = {
+    'default': default_problem(),
+    **{f'1 m seed {k}': make_problem(1, seed=k) for k in range(4)},
+    '3 m': make_problem(3),
+    'prev': dataclasses.replace(default_problem(), prev_shift={'ono': 'As', 'miya': '', 'hiro': 'E'},
+                                prev_consec_work={'ono': 3, 'hiro': 2}, prev_consec_rest={'miya': 2}),
+    'rest days': dataclasses.replace(default_problem(), rest_days={'ono': 20}),
+}
+
+
+@pytest.mark.parametrize('backend', ['cbc', 'highs'])
+@pytest.mark.parametrize('name', CASES)
+def test_build_matrix_matches_the_app_model(name, backend):
+    if backend == 'highs':
+        pytest.importorskip('highspy')
+    problem = CASES[name]
+    prob, *_ = build_model(problem)
+    status = prob.solve(lp.PULP_CBC_CMD(msg=0, timeLimit=300))
+    result = solve(problem, backend=backend, use_cache=False)
+    assert result.status == lp.LpStatus[status]
+    if status == lp.LpStatusOptimal:
+        assert result.proven
+        assert result.objective == pytest.approx(lp.value(prob.objective))
@@ -0,0 +1,32 @@
+import pytest
+
+from benchmarks import baseline
+from benchmarks.bench_stats import random_schedule
+from benchmarks.scenarios import default_problem
+from shiftbuilder import get_stats, solve
+from shiftbuilder.schedule import Schedule
+
+
+def both(shift, days_count, persons):
+    prev = {p: 0 for p in persons if p != 'support'}
+    return (baseline.get_stats(shift, days_count, persons, prev, prev, prev),
+            get_stats(shift, days_count, persons, prev, prev, prev))
+
+
+@pytest.mark.parametrize('days_count', [1, 2, 31, 365])
+@pytest.mark.parametrize('seed', range(5))
+def test_random_schedules_match_the_loop(days_count, seed):
+    shift, persons = random_schedule(days_count, seed)
+    expected, stats = both(shift, days_count, persons)
+    assert stats == expected
+    schedule = Schedule.from_dict(shift, days_count, persons)
+    assert both(schedule, days_count, persons)[1] == expected
+
+
+def test_solved_schedule_matches_the_loop():
+    problem = default_problem()
+    result = solve(problem, use_cache=False)
+    assert result.proven
+    expected, stats = both(result.shift.to_dict(), problem.days_count, problem.persons)
+    assert stats == expected
+    assert both(result.shift, problem.days_count, problem.persons)[1] == expected
@@ -0,0 +1,57 @@
+import dataclasses
+from datetime import timedelta
+
+import pytest
+
+from benchmarks.scenarios import default_problem
+from shiftbuilder import SolutionStore, clear_cache, get_stats, set_store, solve
+from shiftbuilder.tables import stats_rows
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SolutionStore(tmp_path / 'shifts.db')
+    yield store
+    set_store(None)
+    clear_cache()
+
+
+def test_round_trip(store):
+    problem = default_problem()
+    result = solve(problem, use_cache=False, profile=True)
+    store.put(problem, result)
+    stored = SolutionStore(store.path).get(problem.key())
+    assert stored.shift == result.shift
+    assert stored.days == result.days
+    for name in ('status', 'objective', 'solve_time', 'proven', 'key'):
+        assert getattr(stored, name) == getattr(result, name)
+    assert stored.profile.to_dict() == result.profile.to_dict()
+    assert store.stats(problem.key()) == stats_rows(problem, result)
+    persons = problem.persons
+    assert (get_stats(stored.shift, problem.days_count, persons, problem.prev_off, problem.prev_early,
+                      problem.prev_late)
+            == get_stats(result.shift, problem.days_count, persons, problem.prev_off, problem.prev_early,
+                         problem.prev_late))
+    assert store.get(problem.key(), 'highs') is None
+
+
+def test_solve_answers_from_the_store(store):
+    problem = default_problem()
+    set_store(store)
+    clear_cache()
+    first = solve(problem)
+    assert len(store) == 1
+    clear_cache()  # a fresh process: only the store knows the result
+    again = solve(problem)
+    assert again is not first
+    assert again.shift == first.shift and again.objective == first.objective
+
+
+def test_previous_period(store):
+    problem = default_problem()
+    store.put(problem, solve(problem, use_cache=False))
+    last = problem.days[-1]
+    following = dataclasses.replace(problem, start=last + timedelta(days=1), end=last + timedelta(days=31))
+    previous, result = store.previous(following)
+    assert previous.key() == problem.key()
+    assert result.shift == solve(problem).shift